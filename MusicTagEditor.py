@@ -1,18 +1,2514 @@
 import os
 import re
+import sys
+import ctypes
+import ctypes.util
+import select
+import struct
 import shutil
 import mutagen
 from mutagen.easyid3 import EasyID3
+from mutagen.id3 import ID3, ID3NoHeaderError
+from mutagen.asf import ASFTags
+from mutagen.apev2 import APEv2
+from mutagen.easymp4 import EasyMP4Tags
+from mutagen._vorbis import VCommentDict
 import tkinter as tk
 from tkinter import messagebox, scrolledtext, ttk, simpledialog
 import musicbrainzngs 
 import threading
+import queue
+import time
+import bisect
+import multiprocessing
+import functools
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
 import regex as regex
 from datetime import datetime
 import requests  # 추가: 이미지 다운로드용
 from PIL import Image, ImageTk  # 추가: 이미지 처리용
 from io import BytesIO
 import xml.etree.ElementTree as ET
+import sqlite3
+import json
+
+# 프로세스 시작 시각 (시작 → 첫 화면 표시 시간 측정용)
+APP_START = time.perf_counter()
+
+
+# 그리드·일괄 도구가 공통으로 사용하는 태그 필드 (EasyID3 키 기준)
+TAG_FIELDS = ('title', 'artist', 'albumartist', 'album', 'tracknumber', 'date', 'genre')
+
+# EasyID3 스타일 매핑이 없는 포맷용 키 변환표
+# WMA(ASF)는 자체 속성명을, WAV는 RIFF 안의 ID3 프레임을 직접 사용한다.
+ASF_TAG_KEYS = {'title': 'Title', 'artist': 'Author', 'albumartist': 'WM/AlbumArtist', 'album': 'WM/AlbumTitle',
+                'tracknumber': 'WM/TrackNumber', 'date': 'WM/Year', 'genre': 'WM/Genre'}
+ID3_FRAME_KEYS = {'title': 'TIT2', 'artist': 'TPE1', 'albumartist': 'TPE2', 'album': 'TALB',
+                  'tracknumber': 'TRCK', 'date': 'TDRC', 'genre': 'TCON'}
+
+
+def _tag_text(tags, field):
+    """태그 객체 종류에 맞는 키로 필드 값을 찾아 첫 번째 값을 문자열로 돌려준다. 없으면 ''"""
+    if tags is None:
+        return ""
+    try:
+        if isinstance(tags, ID3):
+            frame = tags.get(ID3_FRAME_KEYS[field])
+            if frame is None:
+                return ""
+            # TCON은 '(17)' 같은 숫자 장르 표기를 해석한 값을 사용
+            vals = frame.genres if field == 'genre' else frame.text
+            return str(vals[0]) if vals else ""
+        key = ASF_TAG_KEYS[field] if isinstance(tags, ASFTags) else field
+        vals = tags.get(key)
+        return str(vals[0]) if vals else ""
+    except Exception:
+        return ""
+
+
+def extract_track_info(audio):
+    """이미 열린 mutagen 객체에서 태그와 스트림 정보를 함께 뽑아낸다.
+
+    반환 dict: TAG_FIELDS 각 키(str) + bitrate(bps) / length(초) / sample_rate / channels
+    """
+    data = {field: _tag_text(audio.tags, field) for field in TAG_FIELDS}
+    data.update(stream_info(audio.info))
+    return data
+
+
+def stream_info(info):
+    """mutagen .info 객체에서 bitrate(bps) / length(초) / sample_rate / channels 만 뽑는다"""
+    return {'bitrate': int(getattr(info, 'bitrate', 0) or 0),
+            'length': float(getattr(info, 'length', 0.0) or 0.0),
+            'sample_rate': int(getattr(info, 'sample_rate', 0) or 0),
+            'channels': int(getattr(info, 'channels', 0) or 0)}
+
+
+def read_track_info(fp):
+    """파일을 한 번만 열어(easy=True) 태그와 스트림 정보를 함께 읽는다.
+
+    easy=True 로 열어도 MP3/MP4 객체는 .info 를 그대로 제공하므로
+    mutagen.File() 을 두 번 호출할 필요가 없다. 인식 불가 파일은 None.
+    """
+    audio = mutagen.File(fp, easy=True)
+    if audio is None:
+        return None
+    return extract_track_info(audio)
+
+
+def read_track_tags(fp):
+    """태그 블록만 읽는 빠른 스캔용 (스트림 정보 키가 없는 dict 반환).
+
+    MP3 는 ID3 헤더만 읽고 프레임 스캔(VBR 비트레이트/길이 추정)을 건너뛴다.
+    다른 형식은 스트림 정보가 헤더에 있어 추가 비용이 작으므로 read_track_info 와 같다.
+    """
+    if not fp.lower().endswith('.mp3'):
+        return read_track_info(fp)
+    try:
+        tags = ID3(fp)
+    except ID3NoHeaderError:
+        tags = None
+    return {field: _tag_text(tags, field) for field in TAG_FIELDS}
+
+
+def read_stream_info(fp):
+    """지연 계산용: 스트림 정보(비트레이트·길이 등)만 돌려준다. 인식 불가 파일은 None"""
+    audio = mutagen.File(fp)
+    if audio is None:
+        return None
+    return stream_info(audio.info)
+
+
+def path_key(path):
+    """대소문자/구분자 차이를 없앤 경로 키 (윈도우 경로는 대소문자 무시)"""
+    return os.path.normcase(os.path.abspath(path))
+
+
+def rebase_path(path, old_root, new_root):
+    """path 가 old_root 자신이거나 그 하위이면 new_root 기준으로 바꾼 경로, 아니면 None (폴더 이름 변경용)"""
+    key, old_key = path_key(path), path_key(old_root)
+    if key == old_key:
+        return new_root
+    prefix = os.path.join(old_key, "")
+    if key.startswith(prefix):
+        # normcase 는 길이를 바꾸지 않으므로 원래 대소문자를 유지한 채 접두어만 잘라낸다
+        return os.path.join(new_root, os.path.abspath(path)[len(prefix):])
+    return None
+
+
+def folder_depth(path, root):
+    """path 가 root 아래 몇 단계 폴더인지 (root 자신은 0). root 밖이면 None"""
+    key, root_key = path_key(path), path_key(root)
+    if key == root_key:
+        return 0
+    prefix = os.path.join(root_key, "")
+    if not key.startswith(prefix):
+        return None
+    return key[len(prefix):].count(os.sep) + 1
+
+
+# 그리드 스캔 범위: (표시 이름, 내려갈 하위 폴더 단계 수). None 은 전체 하위 폴더
+SCAN_SCOPES = (("이 폴더만", 0), ("하위 1단계", 1), ("하위 2단계", 2), ("하위 3단계", 3), ("전체 하위 폴더", None))
+
+# file_grid 컬럼 (Track.display_values() 순서와 같아야 함)
+GRID_COLUMNS = ("파일명", "트랙", "제목", "가수", "앨범음악가", "앨범", "연도", "장르", "비트전송률")
+# 컬럼별 정렬에 쓰는 Track 속성 (연도·비트전송률은 숫자, 나머지는 natural_key 로 비교)
+GRID_SORT_FIELDS = {"파일명": 'filename', "트랙": 'track_text', "제목": 'title', "가수": 'artist', "앨범음악가": 'albumartist',
+                    "앨범": 'album', "연도": 'year', "장르": 'genre', "비트전송률": 'bitrate'}
+
+_NATURAL_SPLIT = re.compile(r'(\d+)')
+
+
+def natural_key(text):
+    """숫자 부분을 정수로 비교하는 정렬 키 ("Track 9" < "Track 10", "1-03" < "2-01").
+
+    re.split 결과는 항상 [문자, 숫자, 문자, ...] 순서이므로 같은 위치끼리는 타입이 같아 비교가 안전하다.
+    """
+    parts = _NATURAL_SPLIT.split(text.casefold())
+    parts[1::2] = map(int, parts[1::2])
+    return tuple(parts)
+
+
+class Track:
+    """그리드 한 행(= 음악 파일 하나)의 상태. 트랙·연도·비트레이트·길이는 숫자로 보관한다
+
+    has_info 가 False 이면 태그만 읽은 행(빠른 스캔)으로, 비트레이트·길이는 아직 모른다.
+    """
+
+    __slots__ = ('rid', 'path', 'title', 'artist', 'albumartist', 'album', 'track_text', 'track',
+                 'date', 'year', 'genre', 'bitrate', 'length', 'sample_rate', 'channels', 'has_info', 'tags', '_sort_keys')
+
+    def __init__(self, rid, path, data):
+        self.rid = rid
+        self.path = path
+        self.title = self.artist = self.albumartist = self.album = self.genre = ""
+        self.track_text = self.date = ""
+        self.track = self.year = self.bitrate = self.sample_rate = self.channels = 0
+        self.length = 0.0
+        self.has_info = False
+        self.tags = ()
+        self._sort_keys = None
+        self.apply(data)
+
+    def apply(self, data):
+        """read_track_info() 형식의 dict (일부 키만 있어도 됨) 를 반영"""
+        self._sort_keys = None
+        for field in ('title', 'artist', 'albumartist', 'album', 'genre'):
+            if field in data:
+                setattr(self, field, data[field] or "")
+        if 'tracknumber' in data:
+            raw = data['tracknumber'] or ""
+            self.track_text = raw.split('/')[0].strip()  # '3/12' → '3'
+            m = re.match(r'\d+', self.track_text)
+            self.track = int(m.group()) if m else 0
+        if 'date' in data:
+            self.date = data['date'] or ""
+            m = re.search(r'\d{4}', self.date)
+            self.year = int(m.group()) if m else 0
+        for field in ('bitrate', 'sample_rate', 'channels'):
+            if field in data:
+                setattr(self, field, int(data[field] or 0))
+        if 'length' in data:
+            self.length = float(data['length'] or 0.0)
+        if 'bitrate' in data:
+            self.has_info = True
+
+    def sort_key(self, field):
+        """GRID_SORT_FIELDS 속성의 정렬 키. 값이 바뀔 때(apply / 경로 변경)까지 캐시한다"""
+        keys = self._sort_keys
+        if keys is None:
+            keys = self._sort_keys = {}
+        try:
+            return keys[field]
+        except KeyError:
+            val = getattr(self, field)
+            key = keys[field] = natural_key(val) if isinstance(val, str) else val
+            return key
+
+    @property
+    def filename(self):
+        return os.path.basename(self.path)
+
+    @property
+    def folder(self):
+        return os.path.dirname(self.path)
+
+    def display_values(self):
+        """file_grid 한 행의 표시 문자열 (GRID_COLUMNS 순서)"""
+        return (self.filename, self.track_text or '-', self.title or '-', self.artist or '-',
+                self.albumartist or '-', self.album or '-', self.date or '-', self.genre or '-',
+                f"{int(self.bitrate/1000)}k" if self.has_info else "…")
+
+    def to_data(self):
+        """read_track_info() 와 같은 형식의 dict (스냅샷·색인 저장용). 스트림 정보가 없으면 태그만"""
+        data = {'title': self.title, 'artist': self.artist, 'albumartist': self.albumartist, 'album': self.album,
+                'tracknumber': self.track_text, 'date': self.date, 'genre': self.genre}
+        if self.has_info:
+            data.update(bitrate=self.bitrate, length=self.length, sample_rate=self.sample_rate, channels=self.channels)
+        return data
+
+
+class TrackStore:
+    """그리드에 올라온 모든 Track 을 보관하는 모델 (VirtualGrid 의 데이터 원본).
+
+    - 행 id → Track, 경로 → 행 id 조회는 O(1)
+    - 앨범 / 가수 / 폴더별 보조 색인 (행 id 집합)
+    - order(표시 순서)와 selected(선택)는 VirtualGrid 가 그대로 사용한다
+    - 컬럼별 정렬 순위(sort_ranks)는 한 번 만들면 캐시하고, 행 추가·변경은 그 행의 순위만 이분 탐색으로 끼워 넣는다
+    """
+
+    def __init__(self):
+        self.tracks = {}
+        self.order = []
+        self.selected = set()
+        self.by_path = {}
+        self.by_album = {}
+        self.by_artist = {}
+        self.by_folder = {}
+        self._ranks = {}
+        self._rank_keys = {}   # 컬럼 → (정렬된 고유 키 목록, 같은 위치의 순위 값 목록)
+        self._next_id = 0
+
+    def __len__(self):
+        return len(self.order)
+
+    def __iter__(self):
+        """표시 순서대로 Track 을 돌려준다"""
+        return (self.tracks[rid] for rid in self.order)
+
+    # ── 조회 ─────────────────────────────────────────────────
+    def get(self, rid):
+        return self.tracks.get(rid)
+
+    def find(self, path):
+        """경로로 행 id 찾기. 없으면 None"""
+        return self.by_path.get(path_key(path))
+
+    def rids_by_album(self, album):
+        return set(self.by_album.get(album, ()))
+
+    def rids_by_artist(self, artist):
+        return set(self.by_artist.get(artist, ()))
+
+    def rids_in_folder(self, folder):
+        return set(self.by_folder.get(path_key(folder), ()))
+
+    def rids_without_info(self, rids=None):
+        """스트림 정보(비트레이트·길이)를 아직 읽지 않은 행 id 목록 (rids 생략 시 표시 순서 전체)"""
+        tracks = self.tracks
+        return [rid for rid in (self.order if rids is None else rids) if rid in tracks and not tracks[rid].has_info]
+
+    def sort_ranks(self, field):
+        """field(Track 속성) 기준 정렬 순위 {행 id: 숫자}. 같은 값은 같은 순위
+
+        한 번 만들면 order.sort(key=ranks.__getitem__) 로 재정렬이 C 수준 숫자 비교만으로 끝난다.
+        """
+        ranks = self._ranks.get(field)
+        if ranks is None:
+            keys = {rid: t.sort_key(field) for rid, t in self.tracks.items()}
+            ranks, rank, prev = {}, -1, None
+            distinct, values = [], []
+            for rid in sorted(keys, key=keys.__getitem__):
+                key = keys[rid]
+                if rank < 0 or key != prev:
+                    rank, prev = rank + 1, key
+                    distinct.append(key)
+                    values.append(rank)
+                ranks[rid] = rank
+            self._ranks[field] = ranks
+            self._rank_keys[field] = (distinct, values)
+        return ranks
+
+    def _rerank(self, t, fields):
+        """캐시된 fields 순위에 행 t 를 끼워 넣는다 (전체 재계산 없이 O(log n) 비교).
+
+        처음 보는 값은 이웃 순위의 중간값(실수)을 받는다. 같은 자리에 거듭 끼워 넣어 중간값이 더 나뉘지 않으면
+        그 컬럼만 버려 다음 정렬 때 다시 만든다. 삭제된 행의 값은 목록에 남아도 순서에 영향이 없다.
+        """
+        for field in fields:
+            distinct, values = self._rank_keys[field]
+            key = t.sort_key(field)
+            i = bisect.bisect_left(distinct, key)
+            if i < len(distinct) and distinct[i] == key:
+                self._ranks[field][t.rid] = values[i]
+                continue
+            if not values:
+                rank = 0
+            elif i == 0:
+                rank = values[0] - 1
+            elif i == len(values):
+                rank = values[-1] + 1
+            else:
+                rank = (values[i - 1] + values[i]) / 2
+                if not values[i - 1] < rank < values[i]:
+                    del self._ranks[field], self._rank_keys[field]
+                    continue
+            distinct.insert(i, key)
+            values.insert(i, rank)
+            self._ranks[field][t.rid] = rank
+
+    # ── 변경 ─────────────────────────────────────────────────
+    def _index(self, t):
+        self.by_path[path_key(t.path)] = t.rid
+        self.by_album.setdefault(t.album, set()).add(t.rid)
+        self.by_artist.setdefault(t.artist, set()).add(t.rid)
+        self.by_folder.setdefault(path_key(t.folder), set()).add(t.rid)
+
+    def _unindex(self, t):
+        self.by_path.pop(path_key(t.path), None)
+        for table, key in ((self.by_album, t.album), (self.by_artist, t.artist), (self.by_folder, path_key(t.folder))):
+            rids = table.get(key)
+            if rids is not None:
+                rids.discard(t.rid)
+                if not rids:
+                    del table[key]
+
+    def add(self, path, data, index="end"):
+        self._next_id += 1
+        t = Track(f"R{self._next_id}", path, data)
+        self.tracks[t.rid] = t
+        self._rerank(t, list(self._ranks))
+        self._index(t)
+        if index == "end":
+            self.order.append(t.rid)
+        else:
+            self.order.insert(int(index), t.rid)
+        return t.rid
+
+    def update(self, rid, path=None, data=None):
+        """경로 및/또는 태그 값 갱신. 보조 색인도 함께 고친다
+
+        정렬 순위는 값이 실제로 바뀐 컬럼에서 이 행의 순위만 다시 끼워 넣는다 (스트림 정보만 채워지면 비트전송률만).
+        """
+        t = self.tracks[rid]
+        self._unindex(t)
+        before = {field: getattr(t, field) for field in self._ranks}
+        if path is not None:
+            t.path = path
+            t._sort_keys = None
+        if data:
+            t.apply(data)
+        self._rerank(t, [field for field, val in before.items() if getattr(t, field) != val])
+        self._index(t)
+        return t
+
+    def rename_tree(self, old_folder, new_folder):
+        """폴더 이름 변경: old_folder 하위 모든 행의 경로를 접두어 치환 (디스크 재스캔 없음). 바뀐 행 수 반환"""
+        count = 0
+        for t in list(self.tracks.values()):
+            new_path = rebase_path(t.path, old_folder, new_folder)
+            if new_path is not None:
+                self.update(t.rid, path=new_path)
+                count += 1
+        return count
+
+    def remove(self, rids):
+        rids = set(rids) & self.tracks.keys()
+        if not rids:
+            return
+        if len(rids) == len(self.tracks):
+            self.clear()
+            return
+        for rid in rids:
+            self._unindex(self.tracks.pop(rid))
+            for ranks in self._ranks.values():
+                ranks.pop(rid, None)
+        self.order = [r for r in self.order if r not in rids]
+        self.selected -= rids
+
+    def clear(self):
+        for table in (self.tracks, self.by_path, self.by_album, self.by_artist, self.by_folder, self._ranks,
+                      self._rank_keys):
+            table.clear()
+        self.order.clear()
+        self.selected.clear()
+
+    # ── VirtualGrid 모델 인터페이스 ─────────────────────────
+    def contains(self, rid):
+        return rid in self.tracks
+
+    def row_values(self, rid):
+        return self.tracks[rid].display_values()
+
+    def row_tags(self, rid):
+        return self.tracks[rid].tags
+
+    def set_tags(self, rid, tags):
+        self.tracks[rid].tags = tuple(tags)
+
+    def index(self, rid):
+        return self.order.index(rid)
+
+    def move(self, rid, index):
+        """rid 를 index 로 옮긴다. 사이의 행만 한 칸씩 밀어 remove + insert 의 두 번 이동을 한 번으로"""
+        order = self.order
+        cur = order.index(rid)
+        index = max(0, min(int(index), len(order) - 1))
+        if index < cur:
+            order[index + 1:cur + 1] = order[index:cur]
+        elif index > cur:
+            order[cur:index] = order[cur + 1:index + 1]
+        order[index] = rid
+
+    def reorder(self, rids):
+        """정렬 결과 등 새 표시 순서를 통째로 적용 (항목 수는 같아야 함)"""
+        rids = list(rids)
+        if len(rids) != len(self.order):
+            raise ValueError("reorder: 행 수가 일치하지 않습니다")
+        self.order = rids
+
+    def selection_in_order(self):
+        if not self.selected:
+            return ()
+        if len(self.selected) == 1:
+            return tuple(self.selected)
+        return tuple(r for r in self.order if r in self.selected)
+
+
+def parse_track_batch(paths, tags_only=False):
+    """여러 파일을 순서대로 파싱한다. 풀 작업 단위 (프로세스 풀에서 pickle 가능하도록 모듈 함수)"""
+    read = read_track_tags if tags_only else read_track_info
+    out = []
+    for fp in paths:
+        try:
+            out.append(read(fp))
+        except Exception:
+            out.append(None)
+    return out
+
+
+class ScanEngine:
+    """파일 파싱을 스레드/프로세스 풀로 분산하고 결과는 입력(os.walk) 순서 그대로 내보내는 엔진.
+
+    workers <= 1 이면 풀 없이 현재 스레드에서 순차 파싱한다.
+    풀은 처음 사용할 때 만들어 재사용하며, 동시에 제출되는 작업은 workers*4 묶음으로 제한한다.
+    parse(..., workers=n) 은 풀을 그대로 두고 동시에 처리 중인 묶음을 n 개로 줄인다 (HDD·네트워크 공유용).
+    """
+
+    POOL_KINDS = ('thread', 'process')
+
+    def __init__(self, workers=1, kind='thread', chunk_size=None):
+        self.workers = max(1, int(workers))
+        self.kind = kind if kind in self.POOL_KINDS else 'thread'
+        # 프로세스 풀은 IPC 비용을 줄이기 위해 큰 묶음으로 보낸다
+        self.chunk_size = chunk_size or (64 if self.kind == 'process' else 8)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                if self.kind == 'process':
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                else:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="scan")
+            return self._executor
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def parse(self, files, cancel_event=None, tags_only=False, workers=None):
+        """files 를 파싱하여 (경로, data) 를 입력 순서대로 yield 한다. data 가 None 이면 인식 불가 파일
+
+        tags_only=True 이면 태그 블록만 읽는다 (read_track_tags)
+        workers 를 주면 동시 읽기 수를 min(workers, self.workers) 로 제한한다 (장치별 제한)
+        """
+        limit = min(self.workers, max(1, int(workers))) if workers else None
+        if self.workers <= 1 or limit == 1:
+            for fp in files:
+                if cancel_event is not None and cancel_event.is_set():
+                    return
+                yield fp, parse_track_batch([fp], tags_only)[0]
+            return
+
+        executor = self._get_executor()
+        chunks = [files[i:i + self.chunk_size] for i in range(0, len(files), self.chunk_size)]
+        pending = []  # 제출 순서대로 (묶음, future) 를 보관 → 순서 보장
+        next_chunk = 0
+        max_in_flight = self.workers * 4 if limit is None else limit
+        try:
+            while next_chunk < len(chunks) or pending:
+                while next_chunk < len(chunks) and len(pending) < max_in_flight:
+                    if cancel_event is not None and cancel_event.is_set():
+                        return
+                    chunk = chunks[next_chunk]
+                    pending.append((chunk, executor.submit(parse_track_batch, chunk, tags_only)))
+                    next_chunk += 1
+                chunk, fut = pending.pop(0)
+                results = fut.result()
+                for fp, data in zip(chunk, results):
+                    if cancel_event is not None and cancel_event.is_set():
+                        return
+                    yield fp, data
+        finally:
+            for _, fut in pending:
+                fut.cancel()
+
+
+class TagIndex:
+    """파일별 파싱 결과(태그 + 스트림 정보)를 저장하는 SQLite 색인.
+
+    각 행은 (size, mtime_ns) 와 함께 저장되며, 조회 시 현재 파일의 stat 과 일치할 때만 유효하다.
+    빠른 스캔(태그만)으로 저장된 행은 스트림 정보 컬럼이 NULL 이며, 조회 결과 dict 에서 해당 키가 빠진다.
+    folders 테이블에는 폴더별 직속 음악 파일의 곡 수·크기·길이를 두고, 하위 합계는 범위 조회로 구한다.
+    DB 를 열 수 없으면 모든 메서드가 아무 일도 하지 않으므로 호출부는 실패를 신경 쓸 필요가 없다.
+    여러 스레드(스캔 워커, UI)에서 함께 사용하므로 연결 하나를 잠금으로 보호한다.
+    """
+
+    SCHEMA_VERSION = 1
+    INFO_COLUMNS = ('bitrate', 'length', 'sample_rate', 'channels')
+    DATA_COLUMNS = TAG_FIELDS + INFO_COLUMNS
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._lock = threading.RLock()
+        self.conn = None
+        try:
+            self.conn = sqlite3.connect(db_path, check_same_thread=False)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            if self.conn.execute("PRAGMA user_version").fetchone()[0] != self.SCHEMA_VERSION:
+                self.conn.execute("DROP TABLE IF EXISTS tracks")
+            cols = ", ".join(f"{c} {'TEXT' if c in TAG_FIELDS else 'REAL' if c == 'length' else 'INTEGER'}"
+                             for c in self.DATA_COLUMNS)
+            self.conn.execute(f"CREATE TABLE IF NOT EXISTS tracks (path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, {cols})")
+            # 폴더별 직속 파일 집계 (탐색기 배지). mtime_ns 는 폴더 목록이 바뀌었는지 판단용
+            self.conn.execute("CREATE TABLE IF NOT EXISTS folders "
+                              "(path TEXT PRIMARY KEY, mtime_ns INTEGER, count INTEGER, size INTEGER, length REAL)")
+            self.conn.execute(f"PRAGMA user_version={self.SCHEMA_VERSION}")
+            self.conn.commit()
+        except Exception as e:
+            print(f"TagIndex 초기화 실패: {e}")
+            self.conn = None
+
+    key = staticmethod(path_key)
+
+    def _execute(self, sql, params=(), many=False):
+        if self.conn is None:
+            return None
+        with self._lock:
+            try:
+                cur = self.conn.executemany(sql, params) if many else self.conn.execute(sql, params)
+                self.conn.commit()
+                return cur
+            except Exception as e:
+                print(f"TagIndex 오류: {e}")
+                return None
+
+    def _query_one(self, sql, params=()):
+        if self.conn is None:
+            return None
+        with self._lock:
+            try:
+                return self.conn.execute(sql, params).fetchone()
+            except Exception as e:
+                print(f"TagIndex 조회 오류: {e}")
+                return None
+
+    def lookup_many(self, stats):
+        """{경로: os.stat_result} 중 색인이 유효한 항목만 {경로: data} 로 돌려준다"""
+        found = {}
+        if self.conn is None or not stats:
+            return found
+        by_key = {self.key(fp): fp for fp in stats}
+        keys = list(by_key)
+        cols = ", ".join(self.DATA_COLUMNS)
+        with self._lock:
+            for i in range(0, len(keys), 500):  # SQLite 변수 개수 제한 대비
+                chunk = keys[i:i + 500]
+                sql = f"SELECT path, size, mtime_ns, {cols} FROM tracks WHERE path IN ({','.join('?' * len(chunk))})"
+                try:
+                    rows = self.conn.execute(sql, chunk).fetchall()
+                except Exception as e:
+                    print(f"TagIndex 조회 오류: {e}")
+                    return found
+                for row in rows:
+                    fp = by_key[row[0]]
+                    st = stats[fp]
+                    if row[1] == st.st_size and row[2] == st.st_mtime_ns:
+                        found[fp] = {c: v for c, v in zip(self.DATA_COLUMNS, row[3:]) if v is not None}
+        return found
+
+    def store_many(self, rows):
+        """[(경로, os.stat_result, data), ...] 를 저장(덮어쓰기)"""
+        if not rows:
+            return
+        cols = ", ".join(self.DATA_COLUMNS)
+        sql = f"INSERT OR REPLACE INTO tracks (path, size, mtime_ns, {cols}) VALUES ({','.join('?' * (len(self.DATA_COLUMNS) + 3))})"
+        params = [(self.key(fp), st.st_size, st.st_mtime_ns) + tuple(data.get(c) for c in self.DATA_COLUMNS)
+                  for fp, st, data in rows]
+        self._execute(sql, params, many=True)
+
+    def store(self, path, data):
+        """쓰기 작업 직후 현재 stat 으로 한 파일의 색인을 갱신"""
+        try:
+            st = os.stat(path)
+        except OSError:
+            self.remove(path)
+            return
+        self.store_many([(path, st, data)])
+
+    def store_info(self, path, info):
+        """지연 계산한 스트림 정보만 기존 행에 채운다 (태그 컬럼은 그대로)"""
+        sets = ", ".join(f"{c} = ?" for c in self.INFO_COLUMNS)
+        self._execute(f"UPDATE tracks SET {sets} WHERE path = ?",
+                      tuple(info[c] for c in self.INFO_COLUMNS) + (self.key(path),))
+
+    def remove(self, path):
+        self._execute("DELETE FROM tracks WHERE path = ?", (self.key(path),))
+
+    def remove_tree(self, folder):
+        prefix = os.path.join(self.key(folder), "")
+        self._execute("DELETE FROM tracks WHERE substr(path, 1, ?) = ?", (len(prefix), prefix))
+        self._execute("DELETE FROM folders WHERE path = ? OR substr(path, 1, ?) = ?",
+                      (self.key(folder), len(prefix), prefix))
+
+    def rename(self, old_path, new_path):
+        """옛 경로의 행을 새 경로로 옮긴다. 옛 행이 없으면(이미 반영된 자체 이름 변경의 감시 이벤트 등) 아무것도 하지 않는다"""
+        if self.key(old_path) == self.key(new_path):
+            return
+        self._execute("UPDATE OR REPLACE tracks SET path = ? WHERE path = ?", (self.key(new_path), self.key(old_path)))
+
+    def rename_tree(self, old_folder, new_folder):
+        """폴더 이름 변경 시 하위 모든 파일의 키를 접두어 치환"""
+        old_prefix = os.path.join(self.key(old_folder), "")
+        new_prefix = os.path.join(self.key(new_folder), "")
+        self._execute("UPDATE OR REPLACE tracks SET path = ? || substr(path, ?) WHERE substr(path, 1, ?) = ?",
+                      (new_prefix, len(old_prefix) + 1, len(old_prefix), old_prefix))
+        self._execute("UPDATE OR REPLACE folders SET path = ? || substr(path, ?) WHERE substr(path, 1, ?) = ?",
+                      (new_prefix, len(old_prefix) + 1, len(old_prefix), old_prefix))
+        self._execute("UPDATE OR REPLACE folders SET path = ? WHERE path = ?", (self.key(new_folder), self.key(old_folder)))
+
+    # ── 폴더 집계 (탐색기 배지) ───────────────────────────
+    def folder_mtime(self, folder):
+        """저장된 폴더 집계의 mtime_ns. 없으면 None"""
+        row = self._query_one("SELECT mtime_ns FROM folders WHERE path = ?", (self.key(folder),))
+        return row[0] if row else None
+
+    def store_folders(self, rows):
+        """[(폴더, mtime_ns, 곡 수, 크기, 길이), ...] 를 저장(덮어쓰기)"""
+        if rows:
+            self._execute("INSERT OR REPLACE INTO folders (path, mtime_ns, count, size, length) VALUES (?, ?, ?, ?, ?)",
+                          [(self.key(d),) + tuple(r) for d, *r in rows], many=True)
+
+    def folder_totals(self, folder):
+        """folder 와 모든 하위 폴더의 (곡 수, 크기, 길이) 합계. folder 자체 집계가 아직 없으면 None
+
+        경로 키의 사전순 범위(prefix ≤ path < prefix 의 마지막 구분자 + 1)로 조회하므로 PRIMARY KEY 색인을 탄다.
+        """
+        key = self.key(folder)
+        prefix = os.path.join(key, "")
+        upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        row = self._query_one("SELECT SUM(path = ?), SUM(count), SUM(size), SUM(length) FROM folders "
+                              "WHERE path = ? OR (path >= ? AND path < ?)", (key, key, prefix, upper))
+        if not row or not row[0]:
+            return None
+        return int(row[1] or 0), int(row[2] or 0), float(row[3] or 0.0)
+
+    def folder_count(self, folder, max_depth=None):
+        """folder 이하(max_depth 단계까지) 곡 수 추정치. folder 집계가 아직 없으면 None (스캔 전 확인용)"""
+        if max_depth is None:
+            totals = self.folder_totals(folder)
+            return totals[0] if totals is not None else None
+        key = self.key(folder)
+        prefix = os.path.join(key, "")
+        upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        if self.conn is None:
+            return None
+        with self._lock:
+            try:
+                rows = self.conn.execute("SELECT path, count FROM folders WHERE path = ? OR (path >= ? AND path < ?)",
+                                         (key, prefix, upper)).fetchall()
+            except Exception as e:
+                print(f"TagIndex 조회 오류: {e}")
+                return None
+        if not any(path == key for path, _ in rows):
+            return None
+        return sum(count for path, count in rows if path == key or path[len(prefix):].count(os.sep) < max_depth)
+
+    def close(self):
+        with self._lock:
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
+
+
+class FolderScanJob:
+    """폴더를 백그라운드 스레드에서 스캔하여 파싱 결과를 큐로 흘려보내는 작업 단위.
+
+    Tk 위젯에 직접 접근하지 않는다. 결과는 out_queue 에 아래 메시지로 전달되며
+    UI 쪽에서 root.after 로 큐를 비우며 그리드에 반영한다.
+      ('total', job, 파일수)                 : 파일 목록 수집 완료
+      ('confirm', job, 파일수)               : 파일 수가 confirm_limit 초과. UI 가 job.confirm() 으로 답할 때까지 대기
+      ('names', job, [경로, ...])             : (tags_only) 태그를 읽기 전에 파일명부터 표시할 목록
+      ('rows',  job, [(경로, data), ...])     : 파싱 결과 묶음 (data 는 read_track_info / read_track_tags 결과)
+      ('done',  job, None)                   : 종료 (취소 포함)
+
+    tags_only=True 이면 태그 블록만 읽는다. 비트레이트·길이는 UI 가 StreamInfoLoader 로 나중에 채운다.
+    max_depth 는 내려갈 하위 폴더 단계 수 (0 = 이 폴더만, None = 전체).
+    io_workers 는 장치별 동시 읽기 제한 (ScanEngine.parse 의 workers), inode_order=True 이면 (HDD)
+    파일을 inode 순으로 읽어 디스크 헤드 이동을 줄인다. 이때 결과도 inode 순서로 나온다.
+    """
+
+    def __init__(self, path, supported_ext, out_queue, engine=None, index=None, batch_size=200, batch_interval=0.1,
+                 tags_only=False, dir_cache=None, max_depth=None, confirm_limit=None, io_workers=None,
+                 inode_order=False):
+        self.path = path
+        self.io_workers = io_workers
+        self.inode_order = inode_order
+        self.max_depth = max_depth
+        self.confirm_limit = confirm_limit
+        self._answered = threading.Event()
+        self.dir_cache = dir_cache
+        self.engine = engine or ScanEngine()
+        self.index = index
+        self.tags_only = tags_only
+        self.supported_ext = supported_ext
+        self.out_queue = out_queue
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self.cancel_event = threading.Event()
+        self.total = 0
+        self.parsed = 0
+        self.cached = 0     # 색인에서 바로 채운 파일 수
+        self.patched = 0    # 검증(patch) 스캔에서 값이 바뀌어 갱신된 행 수 (UI 가 집계)
+        self.placeholders = set()  # 'names' 로 파일명만 먼저 올린 행 id (UI 가 관리)
+        self.dirs = []             # collect_files 가 방문한 폴더 (폴더 집계 저장용)
+        self.started_at = None
+        self.thread = None
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    def start(self):
+        self.started_at = time.perf_counter()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def cancel(self):
+        self.cancel_event.set()
+        self._answered.set()
+
+    def confirm(self, proceed):
+        """'confirm' 메시지에 대한 UI 의 답 (False 면 취소)"""
+        if not proceed:
+            self.cancel_event.set()
+        self._answered.set()
+
+    def files_per_second(self):
+        elapsed = time.perf_counter() - self.started_at if self.started_at else 0
+        return self.parsed / elapsed if elapsed > 0 else 0.0
+
+    def list_dir(self, path):
+        if self.dir_cache is not None:
+            return self.dir_cache.list(path)
+        return list_dir(path, self.supported_ext)
+
+    def collect_files(self):
+        """폴더별로 파일(이름순) 다음 하위 폴더(이름순)를 내려가며 지원 확장자 파일 경로를 모은다.
+
+        os.walk 와 같이 폴더 심볼릭 링크는 따라가지 않는다. 목록은 dir_cache 가 있으면 재사용한다.
+        max_depth 단계보다 깊은 폴더는 읽지 않는다.
+        """
+        files = []
+        self.dirs = []
+        stack = [(self.path, 0)]
+        while stack:
+            if self.cancelled:
+                break
+            d, depth = stack.pop()
+            try:
+                entries = self.list_dir(d)
+            except OSError:
+                continue
+            self.dirs.append(d)
+            subdirs = []
+            for _, fp, kind in entries:
+                if kind == 'file':
+                    files.append(fp)
+                elif kind == 'dir' and (self.max_depth is None or depth < self.max_depth):
+                    subdirs.append((fp, depth + 1))
+            stack.extend(reversed(subdirs))
+        return files
+
+    @staticmethod
+    def _folder_rows(aggregates):
+        rows = []
+        for d, count, size, length in aggregates:
+            try:
+                rows.append((d, os.stat(d).st_mtime_ns, count, size, length))
+            except OSError:
+                pass
+        return rows
+
+    def _run(self):
+        try:
+            files = self.collect_files()
+            self.total = len(files)
+            self.out_queue.put(('total', self, self.total))
+            if self.confirm_limit is not None and self.total > self.confirm_limit:
+                self.out_queue.put(('confirm', self, self.total))
+                self._answered.wait()
+                if self.cancelled:
+                    return
+            if self.tags_only and files:
+                self.out_queue.put(('names', self, files))
+
+            # 색인 조회: (size, mtime_ns) 가 같은 파일은 파싱 없이 재사용
+            stats = {}
+            cached = {}
+            if self.index is not None or self.inode_order:
+                for fp in files:
+                    if self.cancelled:
+                        return
+                    try:
+                        stats[fp] = os.stat(fp)
+                    except OSError:
+                        pass
+            if self.inode_order:
+                files.sort(key=lambda fp: stats[fp].st_ino if fp in stats else 0)
+            if self.index is not None:
+                cached = self.index.lookup_many(stats)
+                if not self.tags_only:
+                    # 빠른 스캔으로만 색인된 행은 스트림 정보가 없으므로 전체 스캔에서는 다시 파싱
+                    cached = {fp: data for fp, data in cached.items() if 'bitrate' in data}
+            self.cached = len(cached)
+            parsed_iter = self.engine.parse([fp for fp in files if fp not in cached], self.cancel_event,
+                                            self.tags_only, self.io_workers)
+
+            batch = []
+            new_rows = []  # 색인에 새로 기록할 (경로, stat, data)
+            folder_agg = {path_key(d): [d, 0, 0, 0.0] for d in self.dirs}  # 폴더별 직속 [경로, 곡 수, 크기, 길이]
+            last_flush = time.perf_counter()
+            try:
+                for fp in files:
+                    if self.cancelled:
+                        break
+                    data = cached.get(fp)
+                    if data is None:
+                        try:
+                            _, data = next(parsed_iter)
+                        except StopIteration:
+                            break
+                        if data is not None and fp in stats:
+                            new_rows.append((fp, stats[fp], data))
+                    self.parsed += 1
+                    if data is not None:
+                        batch.append((fp, data))
+                        agg = folder_agg.get(path_key(os.path.dirname(fp)))
+                        if agg is not None:
+                            agg[1] += 1
+                            agg[2] += stats[fp].st_size if fp in stats else 0
+                            agg[3] += data.get('length', 0.0)
+                    now = time.perf_counter()
+                    if len(batch) >= self.batch_size or (batch and now - last_flush >= self.batch_interval):
+                        self.out_queue.put(('rows', self, batch))
+                        batch = []
+                        last_flush = now
+                        if self.index is not None and new_rows:
+                            self.index.store_many(new_rows)
+                            new_rows = []
+            finally:
+                parsed_iter.close()
+                if self.index is not None:
+                    self.index.store_many(new_rows)
+            if batch:
+                self.out_queue.put(('rows', self, batch))
+            # 끝까지 스캔했으면 폴더 집계 저장 (빠른 스캔은 길이를 모르므로 FolderStatsWorker 에 맡긴다)
+            if self.index is not None and not self.cancelled and not self.tags_only:
+                self.index.store_folders(self._folder_rows(folder_agg.values()))
+        finally:
+            self.out_queue.put(('done', self, None))
+
+
+class StreamInfoLoader:
+    """빠른 스캔으로 비워 둔 스트림 정보(비트레이트·길이)를 백그라운드 스레드 하나에서 채우는 작업자.
+
+    request() 로 (행 id, 경로) 를 넣으면 순서대로 read_stream_info() 를 실행하고
+    결과를 out_queue 에 (행 id, 경로, info) 로 넣는다. info 가 None 이면 읽기 실패.
+    urgent=True 요청(화면에 보이는 행)은 대기열 맨 앞으로 간다.
+    """
+
+    def __init__(self, out_queue):
+        self.out_queue = out_queue
+        self._pending = {}          # 행 id → 경로 (삽입 순서 = 처리 순서)
+        self._cond = threading.Condition()
+        self._working = False
+        self._stopped = False
+        self.thread = None
+
+    @property
+    def busy(self):
+        with self._cond:
+            return bool(self._pending) or self._working
+
+    def request(self, items, urgent=False):
+        items = dict(items)
+        if not items:
+            return
+        with self._cond:
+            if urgent:
+                items.update((rid, fp) for rid, fp in self._pending.items() if rid not in items)
+                self._pending = items
+            else:
+                for rid, fp in items.items():
+                    self._pending.setdefault(rid, fp)
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, daemon=True)
+                self.thread.start()
+            self._cond.notify()
+
+    def clear(self):
+        """대기 중인 요청을 버린다 (폴더 변경 시)"""
+        with self._cond:
+            self._pending.clear()
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._pending.clear()
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._stopped:
+                    self._working = False
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                rid = next(iter(self._pending))
+                fp = self._pending.pop(rid)
+                self._working = True
+            try:
+                info = read_stream_info(fp)
+            except Exception:
+                info = None
+            self.out_queue.put((rid, fp, info))
+
+
+# ── 태그 쓰기 작업 ──────────────────────────────────────────
+# 쓰기 함수는 Tk 에 접근하지 않으며 (최종 경로, read_track_info 형식 data, 메모, 기록 바이트) 를 돌려준다. 실패는 예외.
+# 기록 바이트는 저장으로 실제 파일에 쓴 양이며, 바뀐 태그가 없어 저장을 생략했으면 None.
+# TagWriteJob 은 (행 id, 경로, 쓰기 함수) 목록을 받아 버튼·스크립트 어디서든 같은 방식으로 실행한다.
+# 쓰기 함수는 before_rename 키워드(파일명 변경 직전에 부를 콜백, 없으면 None)를 받는다.
+
+_RENAME_LOCK = threading.Lock()   # 이름 충돌 검사와 rename 을 워커 사이에서 원자적으로
+
+
+class CountingFile:
+    """파일 객체를 감싸 write 로 쓴 바이트 수를 센다 (mutagen save 에 넘겨 실제 기록량 측정)"""
+
+    def __init__(self, fileobj):
+        self._f = fileobj
+        self.written = 0
+
+    def write(self, data):
+        self.written += len(data)
+        return self._f.write(data)
+
+    def __getattr__(self, name):
+        return getattr(self._f, name)
+
+
+def tag_diff(audio, changes):
+    """changes({태그: 값, None 이면 삭제}) 중 파일의 현재 태그와 실제로 다른 항목만 돌려준다"""
+    diff = {}
+    for tag, val in changes.items():
+        current = audio.get(tag)
+        if val is None:
+            if current:
+                diff[tag] = None
+        elif current != [val]:
+            diff[tag] = val
+    return diff
+
+
+class PaddingPolicy:
+    """저장할 때 태그 뒤에 남길 여유 공간(padding) 정책. mutagen save(padding=...) 콜백으로 쓴다.
+
+    여유가 남아 있으면 그대로 둬 태그만 제자리에 다시 쓰게 하고 (mutagen 기본값은 많다 싶으면 줄이느라 파일 전체를 다시 쓴다),
+    모자라서 어차피 파일을 다시 써야 할 때는 이후의 작은 수정이 들어갈 만큼 reserve 바이트를 확보한다.
+    limit 를 넘는 과한 여유만 reserve 로 줄인다.
+    """
+
+    def __init__(self, reserve=16384, limit=1 << 20):
+        self.reserve = max(0, int(reserve))
+        self.limit = max(self.reserve, int(limit))
+
+    def __call__(self, info):
+        if 0 <= info.padding <= self.limit:
+            return info.padding
+        return self.reserve
+
+
+DEFAULT_PADDING = PaddingPolicy()
+
+
+def save_counted(audio, fp, padding=None):
+    """audio 를 fp 에 저장하고 실제로 쓴 바이트 수를 돌려준다.
+
+    padding: PaddingPolicy 또는 mutagen padding 콜백 (None 이면 DEFAULT_PADDING).
+    APEv2 태그는 여유 공간 개념이 없어 padding 없이 저장한다.
+    ID3 태그는 원래 버전(v2.3 / v2.4)을 유지한다 (mutagen 기본값은 v2.4 로 올려 저장).
+    """
+    kwargs = {} if isinstance(audio.tags, APEv2) else {'padding': padding or DEFAULT_PADDING}
+    with open(fp, 'rb+') as f:
+        if isinstance(audio.tags, ID3):
+            kwargs['v2_version'] = 3 if audio.tags.version[1] == 3 else 4
+        elif isinstance(audio.tags, EasyID3):  # EasyID3 는 버전을 노출하지 않으므로 헤더에서 읽는다
+            kwargs['v2_version'] = 3 if f.read(4) == b'ID3\x03' else 4
+            f.seek(0)
+        counter = CountingFile(f)
+        audio.save(counter, **kwargs)
+    return counter.written
+
+
+def open_track(fp):
+    audio = mutagen.File(fp, easy=True)
+    if audio is None:
+        raise ValueError("지원하지 않는 오디오 형식")
+    return audio
+
+
+def commit_track_tags(fp, audio, changes, new_name=None, note="", padding=None, before_rename=None):
+    """이미 연 audio 에 changes({태그: 값, None 이면 삭제}) 를 적용해 한 번 저장하고, new_name 이 주어지면 한 번 이름을 바꾼다.
+
+    현재 태그와 다른 항목만 고치며, 바뀐 항목이 없으면 저장 자체를 생략한다 (파일명 변경은 그대로 진행).
+    같은 이름의 파일이 이미 있으면 이름은 바꾸지 않는다 (태그 저장은 유지).
+    before_rename 은 이름 충돌 검사 직전에 호출된다 (TagWriteJob 이 같은 폴더의 앞선 항목을 기다리는 데 사용).
+    """
+    diff = tag_diff(audio, changes)
+    for tag, val in diff.items():
+        if val is None:
+            audio.pop(tag, None)
+        else:
+            audio[tag] = val
+    written = save_counted(audio, fp, padding) if diff else None
+    if not diff:
+        note = "변경 없음 (저장 생략)"
+    data = extract_track_info(audio)  # 저장 직후 메모리상의 태그 = 새 상태
+    if new_name and os.path.normpath(os.path.join(os.path.dirname(fp), new_name)) != os.path.normpath(fp):
+        new_fp = os.path.join(os.path.dirname(fp), new_name)
+        if before_rename is not None:
+            before_rename()
+        with _RENAME_LOCK:
+            if os.path.exists(new_fp):
+                return fp, data, f"파일명 유지: 동일 이름의 파일이 이미 존재함 -> {new_name}", written
+            os.rename(fp, new_fp)
+        return new_fp, data, f"파일명 변경: {os.path.basename(fp)} -> {new_name}", written
+    return fp, data, note, written
+
+
+def write_track_tags(fp, changes, new_name=None, note="", padding=None, before_rename=None):
+    """fp 의 태그를 changes 로 고쳐 저장하고, new_name 이 주어지면 파일명도 바꾼다 (commit_track_tags 참고)"""
+    return commit_track_tags(fp, open_track(fp), changes, new_name, note, padding, before_rename)
+
+
+def copy_artist_to_albumartist_tag(fp, artist="", padding=None, before_rename=None):
+    """앨범음악가에 가수를 복사. artist 가 비어 있으면 파일의 가수 태그를 읽어 쓴다"""
+    if not artist:
+        data = read_track_info(fp)
+        artist = data['artist'] if data else ""
+    if not artist:
+        raise ValueError("가수 정보 없음")
+    return write_track_tags(fp, {'albumartist': artist}, note=f"앨범음악가 복사 완료 (값: {artist})", padding=padding,
+                            before_rename=before_rename)
+
+
+def make_track_filename(artist, track, title, ext):
+    """규칙: 가수명 - 트랙번호(두 자리, 없으면 00) - 제목. 윈도우 파일명 금지 문자는 제거"""
+    track = track.split('/')[0].strip()
+    track_str = track.zfill(2) if track.isdigit() else "00"
+    return re.sub(r'[\\/:*?"<>|]', '', f"{artist} - {track_str} - {title}{ext}")
+
+
+def parse_title(src, artist="", keywords=()):
+    """제목 문자열에서 가수명·키워드를 지우고 앞쪽 트랙번호를 떼어 (정제된 제목, 트랙번호|None) 으로 돌려준다"""
+    clean = src
+    if artist:
+        clean = re.compile(re.escape(artist), re.IGNORECASE).sub(' ', clean)
+    for k in keywords:
+        if k.strip():
+            clean = re.compile(re.escape(k.strip()), re.IGNORECASE).sub(' ', clean)
+
+    # 숫자(트랙번호) 추출 및 제목에서 분리
+    track = None
+    m = re.match(r'^(\d+)([.\s\-_]+)', clean.strip())
+    if m:
+        track = str(int(m.group(1)))
+        clean = clean.strip()[len(m.group(0)):].strip()
+
+    # 특수문자 정제
+    clean = regex.sub(r'[^\p{Latin}\p{Hangul}\p{Han}\p{Hiragana}\p{Katakana}\d\s\(\)\[\]\.\&\']', ' ', clean).strip()
+    return clean, track
+
+
+def clean_title(title, artist="", keywords=()):
+    """일괄 정리용 보수적인 제목 정리. (제목, 트랙번호|None) - 아래 형태에 맞을 때만 고친다.
+
+    - 앞쪽 "가수 - " (가수명이 제목 맨 앞에 구분자와 함께 있을 때만)
+    - 앞쪽 트랙번호 + 구분자 ("03. ", "03 - ", "03_") - "7 Rings" 처럼 구분자 없는 숫자는 제목의 일부로 둔다
+    - 키워드가 괄호로 둘러싸였거나 독립된 단어로 있을 때 ("[MV]", "(Official Audio)")
+    대화형 제목 파싱(parse_title)과 달리 특수문자는 지우지 않는다.
+    """
+    clean = title.strip()
+    if artist:
+        clean = re.sub(r'^' + re.escape(artist.strip()) + r'\s+[-–]\s+', '', clean, flags=re.IGNORECASE)
+    track = None
+    m = re.match(r'^(\d{1,3})\s*(?:[.)_]|\s-)\s*(?=\S)', clean)
+    if m:
+        track = str(int(m.group(1)))
+        clean = clean[m.end():]
+    for k in keywords:
+        k = k.strip()
+        if not k:
+            continue
+        clean = re.sub(r'[\(\[]\s*' + re.escape(k) + r'\s*[\)\]]', ' ', clean, flags=re.IGNORECASE)
+        clean = re.sub(r'(?<!\w)' + re.escape(k) + r'(?!\w)', ' ', clean, flags=re.IGNORECASE)
+    clean = re.sub(r'\s{2,}', ' ', clean).strip(' -_')
+    if not clean:
+        return title, None  # 전부 지워지면 원래 제목 유지
+    return (clean if clean != title.strip() else title), track
+
+
+def is_broken_string(s):
+    """비정상적인 인코딩(깨진 문자)을 검출하는 정밀 로직"""
+    if not s or s == "-": return True
+    if '\ufffd' in s: return True # 유니코드 대체 문자 확인
+
+    # 1. 정상 문자군 정의 (한글, 영어, 숫자, 기본 문장부호)
+    # regex 라이브러리의 유니코드 속성 활용
+    valid_pattern = regex.compile(r'[\p{Hangul}\p{Latin}\d\s\(\)\[\]\.\&\!\?\-\_\,\'\"]+')
+    valid_chars = "".join(valid_pattern.findall(s))
+
+    # 2. 비정상 문자군 정의 (인코딩 깨짐 시 주로 나타나는 라틴 확장 기호 및 특수 기호)
+    # 사용자가 제시한 ´, °, ¸, ¾ 등 ASCII 범위를 벗어난 기호들 감시
+    broken_pattern = regex.compile(r'[^\p{Hangul}\p{ASCII}\p{Hiragana}\p{Katakana}\p{Han}]+')
+    broken_chars = "".join(broken_pattern.findall(s))
+
+    # 판별 기준 A: 전체 길이 대비 정상 문자 비율이 너무 낮음 (50% 미만)
+    if len(s) > 0:
+        valid_ratio = len(valid_chars) / len(s)
+        if valid_ratio < 0.5:
+            return True
+
+    # 판별 기준 B: 깨진 문자 기호(라틴 확장 등)가 30% 이상 포함됨
+    if len(s) > 0:
+        broken_ratio = len(broken_chars) / len(s)
+        if broken_ratio > 0.3:
+            return True
+
+    # 판별 기준 C: 특정 깨진 패턴의 연속성 (예: ´Ï°¡ 처럼 기호와 문자가 뒤섞임)
+    # 일반적인 한국어/영어 문장에서는 발생하기 힘든 조합을 체크
+    if regex.search(r'[^\x00-\x7F][^\x00-\x7F]{2,}', s):
+        # 비-ASCII 문자가 의미 없이 나열되는 경우 (정상 한글 제외 필터 필요)
+        # 한글은 \p{Hangul}로 이미 valid_chars에서 걸러지므로
+        # 남은 문자열 중 연속된 비정상 기호 확인
+        remaining = regex.sub(r'[\p{Hangul}\s\d\p{Latin}]+', '', s)
+        if len(remaining) > len(s) * 0.2:
+            return True
+
+    return False
+
+
+def repair_text(s):
+    """CP949 바이트가 Latin-1 로 읽혀 깨진 문자열(예: ´Ï°¡)을 되살린다. 복구할 수 없으면 None
+
+    Latin-1 → CP949 왕복이 성공하고 결과에 한글이 있을 때만 복구로 본다
+    (일본어·중국어·키릴·그리스 문자처럼 Latin-1 로 인코딩되지 않는 정상 문자열은 그대로 None).
+    """
+    if not s or not is_broken_string(s):
+        return None
+    try:
+        fixed = s.encode('latin-1').decode('cp949')
+    except (UnicodeEncodeError, UnicodeDecodeError):
+        return None
+    if is_broken_string(fixed) or not regex.search(r'\p{Hangul}', fixed):
+        return None
+    return fixed
+
+
+# ── 정리 파이프라인 ──────────────────────────────────────────
+# 정리 함수(tags, 경로, 키워드) → {태그: 새 값}. tags 는 앞선 정리 결과가 반영된 작업 사본이다.
+# fix_track 은 파일을 한 번 열어 고른 정리 함수를 아래 순서대로 메모리에서 적용한 뒤, 한 번 저장·한 번 이름 변경한다.
+
+FIX_TAGS = ('title', 'artist', 'albumartist', 'album', 'tracknumber', 'date', 'genre')
+# 위 키 이름으로 읽고 쓸 수 있는 태그 종류 (MP3 EasyID3, MP4, FLAC·Ogg Vorbis comment). WMA·WAV 등은 해당 없음
+EASY_TAG_TYPES = (EasyID3, EasyMP4Tags, VCommentDict)
+
+
+def _stem(fp):
+    return os.path.splitext(os.path.basename(fp))[0]
+
+
+def fix_broken_text(tags, fp, keywords):
+    """깨진 태그 문자열 복구. 되살릴 수 있는 값(repair_text)만 고치고 나머지는 그대로 둔다"""
+    out = {}
+    for tag in ('title', 'artist', 'albumartist', 'album', 'genre'):
+        fixed = repair_text(tags[tag])
+        if fixed:
+            out[tag] = fixed
+    return out
+
+
+def fix_year(tags, fp, keywords):
+    """연도를 yyyy 형식으로"""
+    m = re.search(r'\d{4}', tags['date'])
+    return {'date': m.group()} if m else {}
+
+
+def fix_title(tags, fp, keywords):
+    """제목(없으면 파일명)이 clean_title 형태에 맞을 때만 정리. 트랙번호 태그가 비어 있으면 채운다"""
+    title, track = clean_title(tags['title'] or _stem(fp), tags['artist'], keywords)
+    out = {'title': title} if title else {}
+    if track and not tags['tracknumber']:
+        out['tracknumber'] = track
+    return out
+
+
+def fix_albumartist(tags, fp, keywords):
+    """가수를 앨범음악가로 복사"""
+    return {'albumartist': tags['artist']} if tags['artist'] else {}
+
+
+# (키, 이름, 정리 함수) - 적용 순서. 'rename' 은 모든 정리가 끝난 태그로 파일명을 만든다
+TRACK_FIXERS = (
+    ('text', "깨진 문자 복구", fix_broken_text),
+    ('year', "연도 정리", fix_year),
+    ('title', "제목 파싱", fix_title),
+    ('albumartist', "가수 → 앨범음악가", fix_albumartist),
+)
+FIX_RENAME = ('rename', "파일명 변경 (가수 - 트랙 - 제목)")
+FIXERS_OFF_BY_DEFAULT = {'title', FIX_RENAME[0]}  # 결과를 미리 볼 수 없어 사용자가 직접 골라야 하는 항목
+
+
+def fix_track(fp, fixers, keywords=(), padding=None, before_rename=None):
+    """fixers(키 집합) 에 든 정리를 한 번의 열기·저장·이름 변경으로 적용. 반환 형식은 write_track_tags 와 같다"""
+    audio = open_track(fp)
+    if audio.tags is None:
+        try:
+            audio.add_tags()  # 메모리에서만 만든다 (바뀐 값이 없으면 저장하지 않음)
+        except Exception:
+            pass
+    if not isinstance(audio.tags, EASY_TAG_TYPES):
+        return fp, extract_track_info(audio), "건너뜀 (일괄 정리를 지원하지 않는 태그 형식)", None
+    tags = {tag: (audio.get(tag) or [""])[0] for tag in FIX_TAGS}
+    before = dict(tags)
+    applied = []
+    for key, label, fixer in TRACK_FIXERS:
+        if key not in fixers:
+            continue
+        updates = {tag: val for tag, val in fixer(tags, fp, keywords).items() if val != tags[tag]}
+        if updates:
+            tags.update(updates)
+            applied.append(label)
+    changes = {tag: val for tag, val in tags.items() if val != before[tag]}
+    new_name = None
+    if FIX_RENAME[0] in fixers and tags['artist'] and tags['title']:
+        new_name = make_track_filename(tags['artist'], tags['tracknumber'], tags['title'], os.path.splitext(fp)[1])
+    return commit_track_tags(fp, audio, changes, new_name, note=f"정리 완료 ({', '.join(applied)})", padding=padding,
+                             before_rename=before_rename)
+
+
+def _syncsafe(data):
+    return (data[0] << 21) | (data[1] << 14) | (data[2] << 7) | data[3]
+
+
+def id3_padding(fp):
+    """파일 앞쪽 ID3v2 태그의 여유 공간(바이트). ID3v2 태그로 시작하지 않으면 None
+
+    프레임 헤더의 크기만 따라가 첫 빈 프레임 ID(패딩 시작)까지의 거리를 잰다 (프레임 내용은 해석하지 않는다).
+    전체 비동기화(unsynchronisation)된 v2.2/v2.3 태그나 크기가 태그 밖을 가리키는 깨진 태그처럼
+    프레임을 따라갈 수 없으면 끝쪽 0 바이트 수로 추정한다 (0 으로 끝나는 마지막 프레임만큼 크게 나올 수 있음).
+    """
+    with open(fp, 'rb') as f:
+        header = f.read(10)
+        if len(header) < 10 or header[:3] != b'ID3':
+            return None
+        major, flags, size = header[3], header[5], _syncsafe(header[6:10])
+        body = f.read(size)
+    estimate = len(body) - len(body.rstrip(b'\x00'))
+    if major not in (2, 3, 4) or (flags & 0x80 and major < 4):
+        return estimate
+    pos = 0
+    if flags & 0x40 and major >= 3:   # 확장 헤더 (v2.4 는 자기 크기 포함, v2.3 은 제외)
+        if len(body) < 4:
+            return estimate
+        pos = _syncsafe(body[:4]) if major == 4 else struct.unpack('>I', body[:4])[0] + 4
+    id_len, head_len = (3, 6) if major == 2 else (4, 10)
+    while pos + head_len <= len(body):
+        if body[pos] == 0:
+            return len(body) - pos
+        raw = body[pos + id_len:pos + head_len - (0 if major == 2 else 2)]
+        if major == 2:
+            frame_size = int.from_bytes(raw, 'big')
+        elif major == 4:
+            frame_size = _syncsafe(raw)
+        else:
+            frame_size = struct.unpack('>I', raw)[0]
+        pos += head_len + frame_size
+        if pos > len(body):
+            return estimate
+    return max(0, len(body) - pos)
+
+
+def repad_track(fp, padding=None, before_rename=None):
+    """ID3v2 여유 공간이 정책의 reserve 보다 작으면 한 번 다시 써서 확보한다 (이후 작은 수정은 제자리 저장).
+
+    반환 형식은 write_track_tags 와 같다. 태그 내용도 파일명도 바꾸지 않는다 (before_rename 은 쓰이지 않음).
+    """
+    policy = padding or DEFAULT_PADDING
+    current = id3_padding(fp)
+    audio = open_track(fp)
+    data = extract_track_info(audio)
+    if current is None:
+        return fp, data, "건너뜀 (ID3v2 태그 없음)", None
+    if current >= policy.reserve:
+        return fp, data, f"여유 공간 충분 ({format_size(current)})", None
+    written = save_counted(audio, fp, lambda info: policy.reserve)
+    return fp, data, f"여유 공간 확보 ({format_size(current)} -> {format_size(policy.reserve)})", written
+
+
+class TagWriteJob:
+    """태그 쓰기 목록을 백그라운드에서 실행하고 파일별 결과를 큐로 흘려보내는 작업 단위.
+
+    items: [(행 id, 경로, 쓰기 함수), ...]  쓰기 함수(경로, before_rename=콜백) → (최종 경로, data, 메모, 기록 바이트|None)
+    out_queue 메시지:
+      ('result', job, [(행 id, 원래 경로, 최종 경로, data, 오류 문자열|None, 메모), ...])
+      ('done',   job, None)                         : 종료 (취소 포함)
+    취소는 파일 사이에서만 일어나므로 저장 중인 파일이 깨지지 않는다. 색인(index)이 있으면 결과를 바로 반영한다.
+    bytes_written 은 실제 기록량, full_bytes 는 처리한 파일 전체 크기(파일을 통째로 다시 쓰는 저장 기준),
+    skipped 는 바뀐 태그가 없어 저장을 생략한 파일 수.
+    스크립트에서는 start() 대신 run() 으로 현재 스레드에서 실행할 수 있다.
+    limit_for(경로) → (저장 장치 묶음, 동시 쓰기 제한|None) 를 주면 묶음마다 그 수까지만 동시에 쓴다 (HDD 는 1 등).
+    여러 워커일 때 결과는 끝난 순서대로 나오지만, 같은 폴더 안의 파일명 변경은 items 순서대로 일어난다.
+    collect 함수를 주면 작업 스레드에서 collect() 로 items 를 만든다 (폴더 전체를 훑는 작업용, 그동안 total 은 0).
+    """
+
+    def __init__(self, items, out_queue, index=None, workers=1, title="태그 쓰기", batch_interval=0.1, collect=None,
+                 limit_for=None):
+        self.items = list(items)
+        self.collect = collect
+        self.limit_for = limit_for
+        self.out_queue = out_queue
+        self.index = index
+        self.workers = max(1, int(workers))
+        self.title = title
+        self.batch_interval = batch_interval
+        self.cancel_event = threading.Event()
+        self.total = len(self.items)
+        self.done = 0
+        self.failed = 0
+        self.skipped = 0
+        self.bytes_written = 0
+        self.full_bytes = 0
+        self._stats_lock = threading.Lock()
+        self._turn_cond = threading.Condition()
+        self._turn_slots = []     # 순번 → (폴더, 폴더 안 순서)
+        self._turn_next = {}      # 폴더 → 앞에서부터 연속으로 끝난 항목 수
+        self._turn_done = {}      # 폴더 → 순서가 앞당겨지기 전에 먼저 끝난 항목들
+        self.groups = {}          # 저장 장치 묶음 → 동시 쓰기 제한 (실행 중 채워짐)
+        self.on_done = None       # UI 가 완료 후 실행할 콜백 (job 인자)
+        self.started_at = None
+        self.thread = None
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    @property
+    def succeeded(self):
+        return self.done - self.failed
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def files_per_second(self):
+        elapsed = time.perf_counter() - self.started_at if self.started_at else 0
+        return self.done / elapsed if elapsed > 0 else 0.0
+
+    def eta(self):
+        """남은 예상 시간(초). 아직 알 수 없으면 None"""
+        rate = self.files_per_second()
+        return (self.total - self.done) / rate if rate > 0 else None
+
+    def _prepare_turns(self):
+        counts = {}
+        for _, fp, _ in self.items:
+            d = os.path.dirname(fp)
+            self._turn_slots.append((d, counts.get(d, 0)))
+            counts[d] = counts.get(d, 0) + 1
+        self._turn_next = dict.fromkeys(counts, 0)
+        self._turn_done = {d: set() for d in counts}
+
+    def _wait_turn(self, seq):
+        """같은 폴더에서 seq 보다 앞선 항목이 모두 끝날 때까지 대기 (이름 변경 직전에 호출)"""
+        d, pos = self._turn_slots[seq]
+        with self._turn_cond:
+            self._turn_cond.wait_for(lambda: self._turn_next[d] >= pos)
+
+    def _finish_turn(self, seq):
+        d, pos = self._turn_slots[seq]
+        with self._turn_cond:
+            done = self._turn_done[d]
+            done.add(pos)
+            while self._turn_next[d] in done:
+                done.discard(self._turn_next[d])
+                self._turn_next[d] += 1
+            self._turn_cond.notify_all()
+
+    def _write(self, seq, rid, fp, op):
+        # 파일명 변경 직전에 같은 폴더의 앞선 항목을 기다려, 병렬 쓰기에서도 이름 충돌 결과가 items 순서대로 실행한 것과 같게 한다.
+        # 색인 반영까지 끝난 뒤에 차례를 넘긴다 (다음 항목이 방금 비운 이름을 쓸 수 있으므로)
+        try:
+            return self._commit(rid, fp, op, functools.partial(self._wait_turn, seq))
+        finally:
+            self._finish_turn(seq)
+
+    def _commit(self, rid, fp, op, before_rename=None):
+        try:
+            new_fp, data, note, written = op(fp, before_rename=before_rename)
+        except Exception as e:
+            return rid, fp, fp, None, str(e) or e.__class__.__name__, ""
+        try:
+            size = os.path.getsize(new_fp)
+        except OSError:
+            size = 0
+        with self._stats_lock:
+            self.full_bytes += size
+            if written is None:
+                self.skipped += 1
+            else:
+                self.bytes_written += written
+        if self.index is not None:
+            if new_fp != fp:
+                self.index.rename(fp, new_fp)
+            self.index.store(new_fp, data)
+        return rid, fp, new_fp, data, None, note
+
+    def _results(self):
+        """결과를 yield. 한 번에 workers 개까지, 저장 장치 묶음마다 그 제한까지만 진행 중.
+
+        묶음 안에서는 items 순서대로 시작하고, 묶음 사이에서는 앞 순번이 먼저인 묶음부터 채운다.
+        """
+        self._prepare_turns()
+        if self.workers <= 1:
+            for seq, item in enumerate(self.items):
+                if self.cancelled:
+                    return
+                yield self._write(seq, *item)
+            return
+        queues = {}   # 묶음 → deque[(순번, item)]
+        by_dir = {}   # 폴더 → 묶음 (장치 판별은 폴더마다 한 번)
+        for seq, item in enumerate(self.items):
+            d = os.path.dirname(item[1])
+            if d not in by_dir:
+                group, limit = self.limit_for(item[1]) if self.limit_for else (None, None)
+                by_dir[d] = group
+                self.groups.setdefault(group, min(self.workers, limit or self.workers))
+            queues.setdefault(by_dir[d], deque()).append((seq, item))
+        active = dict.fromkeys(queues, 0)
+        running = {}  # future → 묶음
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="write") as executor:
+            while True:
+                while len(running) < self.workers and not self.cancelled:
+                    ready = [g for g, q in queues.items() if q and active[g] < self.groups[g]]
+                    if not ready:
+                        break
+                    group = min(ready, key=lambda g: queues[g][0][0])
+                    seq, item = queues[group].popleft()
+                    active[group] += 1
+                    running[executor.submit(self._write, seq, *item)] = group
+                if not running:
+                    return
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    active[running.pop(future)] -= 1
+                    yield future.result()
+
+    def run(self):
+        self.started_at = time.perf_counter()
+        batch = []
+        last_flush = self.started_at
+        try:
+            if self.collect is not None:
+                for item in self.collect():
+                    if self.cancelled:
+                        break
+                    self.items.append(item)
+                self.total = len(self.items)
+            for result in self._results():
+                self.done += 1
+                if result[4] is not None:
+                    self.failed += 1
+                batch.append(result)
+                now = time.perf_counter()
+                if now - last_flush >= self.batch_interval:
+                    self.out_queue.put(('result', self, batch))
+                    batch, last_flush = [], now
+        finally:
+            if batch:
+                self.out_queue.put(('result', self, batch))
+            self.out_queue.put(('done', self, None))
+
+
+# 탐색기에서 폴더 하나를 펼칠 때 한 번에 만드는 파일 노드 수 (나머지는 '더 보기' 노드로)
+EXPLORER_FILE_PAGE = 500
+
+
+def list_dir(path, supported_ext):
+    """os.scandir 한 번으로 하위 폴더와 음악 파일을 이름순 [(이름, 경로, 종류), ...] 로 돌려준다.
+
+    종류: 'dir' (폴더) / 'link' (폴더를 가리키는 심볼릭 링크) / 'file' (음악 파일)
+    DirEntry 가 디렉터리 읽기 때 받아 둔 종류 정보를 쓰므로 항목마다 stat 을 하지 않는다.
+    폴더를 읽을 수 없으면 OSError 가 그대로 올라간다.
+    """
+    entries = []
+    with os.scandir(path) as it:
+        for e in it:
+            try:
+                if e.is_dir():
+                    kind = 'link' if e.is_symlink() else 'dir'
+                elif e.name.lower().endswith(supported_ext):
+                    kind = 'file'
+                else:
+                    continue
+            except OSError:
+                continue
+            entries.append((e.name, e.path, kind))
+    entries.sort()
+    return entries
+
+
+class DirListingCache:
+    """list_dir 결과를 폴더 경로별로 보관하는 캐시. 탐색기와 폴더 스캔(FolderScanJob)이 함께 쓴다.
+
+    폴더의 mtime 은 항목이 추가·삭제·이름 변경될 때 바뀌므로, 조회 때마다 stat 한 번으로
+    mtime_ns 를 비교해 같으면 캐시된 목록(같은 list 객체)을 그대로 돌려준다.
+    여러 스레드에서 호출되므로 잠금으로 보호하며, 오래 쓰지 않은 폴더부터 max_entries 개까지만 보관한다.
+    """
+
+    def __init__(self, supported_ext, max_entries=20000):
+        self.supported_ext = supported_ext
+        self.max_entries = max_entries
+        self._entries = {}      # path_key → (mtime_ns, 목록)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def list(self, path):
+        st = os.stat(path)
+        key = path_key(path)
+        with self._lock:
+            cached = self._entries.pop(key, None)
+            if cached is not None and cached[0] == st.st_mtime_ns:
+                self._entries[key] = cached  # 최근 사용으로 갱신
+                self.hits += 1
+                return cached[1]
+        entries = list_dir(path, self.supported_ext)
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = (st.st_mtime_ns, entries)
+            while len(self._entries) > self.max_entries:
+                del self._entries[next(iter(self._entries))]
+        return entries
+
+    def invalidate(self, path, recursive=False):
+        """mtime 해상도가 낮은 파일시스템(FAT 등) 대비: 직접 바꾼 폴더는 명시적으로 버린다"""
+        key = path_key(path)
+        with self._lock:
+            self._entries.pop(key, None)
+            if recursive:
+                prefix = os.path.join(key, "")
+                for k in [k for k in self._entries if k.startswith(prefix)]:
+                    del self._entries[k]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def dir_has_children(path):
+    """폴더에 항목이 하나라도 있는지 (첫 항목을 만나면 바로 중단). 읽기 실패는 False"""
+    try:
+        with os.scandir(path) as it:
+            for _ in it:
+                return True
+    except OSError:
+        pass
+    return False
+
+
+class DirChildProbe:
+    """탐색기 폴더 노드의 펼침 표시(+) 필요 여부를 백그라운드에서 확인하는 작업자.
+
+    submit([(노드 id, 경로), ...]) 결과는 out_queue 에 (세대, [(노드 id, 하위 항목 유무), ...]) 로
+    묶음 단위로 들어온다. cancel() 로 세대를 올리면 이전 요청은 버려진다(드라이브 변경 등).
+    """
+
+    def __init__(self, out_queue, workers=2, chunk_size=64):
+        self.out_queue = out_queue
+        self.chunk_size = chunk_size
+        self.generation = 0
+        self._pending = 0           # 아직 끝나지 않은 묶음 수
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="probe")
+
+    @property
+    def busy(self):
+        with self._lock:
+            return self._pending > 0
+
+    def submit(self, items):
+        gen = self.generation
+        for i in range(0, len(items), self.chunk_size):
+            with self._lock:
+                self._pending += 1
+            self._executor.submit(self._probe, gen, items[i:i + self.chunk_size])
+
+    def cancel(self):
+        self.generation += 1
+
+    def shutdown(self):
+        self.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _probe(self, gen, items):
+        try:
+            results = []
+            for node, fp in items:
+                if gen != self.generation:
+                    return
+                results.append((node, dir_has_children(fp)))
+            self.out_queue.put((gen, results))
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+
+def format_size(size):
+    """바이트 수를 '12.3 GB' 형식으로"""
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+
+def format_duration(seconds):
+    """초를 'h:mm:ss' 형식으로 (1시간 미만은 'm:ss')"""
+    m, s = divmod(int(seconds), 60)
+    h, m = divmod(m, 60)
+    return f"{h}:{m:02d}:{s:02d}" if h else f"{m}:{s:02d}"
+
+
+class FolderStatsWorker:
+    """탐색기 폴더 배지(하위 전체 곡 수·크기·길이)용 폴더 집계를 백그라운드에서 채우는 작업자.
+
+    폴더마다 직속 음악 파일의 집계를 TagIndex.folders 에 폴더 mtime 과 함께 저장하고,
+    합계는 TagIndex.folder_totals() 로 구한다. 저장된 mtime 이 현재와 같으면 다시 계산하지 않는다.
+    request() 로 넣은 폴더와 그 하위 폴더를 스택(LIFO)으로 방문하므로, 드라이브 전체를 훑는 중에도
+    방금 펼친 폴더가 먼저 처리된다. 갱신한 폴더 목록은 notify_interval 간격으로 out_queue 에 묶어 보낸다.
+    길이는 색인(tracks) 값을 쓰고, 색인에 없는 파일은 read_track_info() 로 읽어 색인에 저장한다
+    (스트림 정보만 빠진 행은 read_stream_info() 로 채운다). 다음 폴더 스캔은 이 색인을 그대로 재사용한다.
+    hold(이유) 가 하나라도 걸려 있으면 파일 사이에서 멈춘다 (폴더 스캔·태그 쓰기와 같은 디스크를 다투지 않도록).
+    """
+
+    def __init__(self, index, lister, out_queue, notify_interval=0.5):
+        self.index = index
+        self.lister = lister
+        self.out_queue = out_queue
+        self.notify_interval = notify_interval
+        self._stack = []
+        self._done = set()          # 이번 실행에서 확인을 마친 폴더 (path_key)
+        self._force = set()         # mtime 이 같아도 다시 계산할 폴더 (파일 내용만 바뀐 경우)
+        self._holds = set()         # 일시 정지 이유 ('scan', 'write')
+        self._cond = threading.Condition()
+        self._working = False
+        self._stopped = False
+        self.thread = None
+
+    @property
+    def busy(self):
+        with self._cond:
+            return bool(self._stack) or self._working
+
+    def request(self, paths, force=False):
+        """paths 와 하위 폴더를 확인한다. force=True 이면 paths 자신은 mtime 이 같아도 다시 계산"""
+        with self._cond:
+            if force:
+                keys = {path_key(p) for p in paths}
+                self._force |= keys
+                self._done -= keys
+            paths = [p for p in paths if path_key(p) not in self._done]
+            if not paths:
+                return
+            self._stack.extend(reversed(paths))
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, daemon=True)
+                self.thread.start()
+            self._cond.notify()
+
+    def clear(self):
+        """대기 중인 요청을 버린다 (루트 변경 시)"""
+        with self._cond:
+            self._stack.clear()
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._stack.clear()
+            self._cond.notify_all()
+
+    def hold(self, reason):
+        """reason 이 release() 될 때까지 일시 정지 (진행 중인 파일 하나는 마친다)"""
+        with self._cond:
+            self._holds.add(reason)
+
+    def release(self, reason):
+        with self._cond:
+            self._holds.discard(reason)
+            self._cond.notify_all()
+
+    def _wait_released(self):
+        """hold 가 모두 풀릴 때까지 대기. 중지되었으면 False"""
+        with self._cond:
+            self._cond.wait_for(lambda: not self._holds or self._stopped)
+            return not self._stopped
+
+    def _run(self):
+        updated = []
+        last_notify = time.perf_counter()
+        while True:
+            with self._cond:
+                if updated and (not self._stack or time.perf_counter() - last_notify >= self.notify_interval):
+                    self.out_queue.put(updated)
+                    updated, last_notify = [], time.perf_counter()
+                while (not self._stack or self._holds) and not self._stopped:
+                    self._working = False
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                folder = self._stack.pop()
+                key = path_key(folder)
+                if key in self._done:
+                    continue
+                self._done.add(key)
+                self._working = True
+            try:
+                if self._update(folder):
+                    updated.append(folder)
+            except Exception as e:
+                print(f"폴더 집계 오류 ({folder}): {e}")
+
+    def _update(self, folder):
+        """folder 를 확인하고 하위 폴더를 스택에 넣는다. 집계를 새로 저장했으면 True"""
+        try:
+            mtime = os.stat(folder).st_mtime_ns
+            entries = self.lister(folder)
+        except OSError:
+            return False
+        subdirs = [fp for _, fp, kind in entries if kind == 'dir']
+        with self._cond:
+            self._stack.extend(reversed(subdirs))
+        with self._cond:
+            forced = path_key(folder) in self._force
+            self._force.discard(path_key(folder))
+        if not forced and self.index.folder_mtime(folder) == mtime:
+            return False
+
+        stats = {}
+        for _, fp, kind in entries:
+            if kind == 'file':
+                try:
+                    stats[fp] = os.stat(fp)
+                except OSError:
+                    pass
+        cached = self.index.lookup_many(stats)
+        size = length = 0
+        parsed = []   # 색인에 새로 넣을 (경로, stat, data)
+        for fp, st in stats.items():
+            size += st.st_size
+            info = cached.get(fp)
+            if info is None or 'length' not in info:
+                if not self._wait_released():
+                    return False
+                try:
+                    if info is None:
+                        info = read_track_info(fp)
+                        if info is not None:
+                            parsed.append((fp, st, info))
+                    else:
+                        info = read_stream_info(fp)
+                        if info is not None:
+                            self.index.store_info(fp, info)
+                except Exception:
+                    info = None
+            length += info.get('length', 0.0) if info else 0.0
+        self.index.store_many(parsed)
+        self.index.store_folders([(folder, mtime, len(stats), size, length)])
+        return True
+
+
+# /proc/mounts 에서 라이브러리 루트로 보여 줄 필요가 없는 가상 파일시스템
+PSEUDO_FS_TYPES = {'proc', 'sysfs', 'devtmpfs', 'devpts', 'tmpfs', 'ramfs', 'cgroup', 'cgroup2', 'securityfs',
+                   'pstore', 'debugfs', 'tracefs', 'configfs', 'mqueue', 'hugetlbfs', 'fusectl', 'bpf', 'autofs',
+                   'binfmt_misc', 'overlay', 'squashfs', 'nsfs', 'rpc_pipefs', 'efivarfs', 'selinuxfs'}
+
+
+def windows_drive_roots():
+    """Windows: GetLogicalDrives 비트마스크의 드라이브 루트 (C:\\ ...). 다른 OS 에서는 빈 목록"""
+    if os.name != 'nt':
+        return []
+    import string
+    mask = ctypes.windll.kernel32.GetLogicalDrives()
+    return [f"{l}:\\" for i, l in enumerate(string.ascii_uppercase) if mask >> i & 1]
+
+
+def read_mounts(mounts_file="/proc/mounts"):
+    """/proc/mounts 형식 파일을 [(장치, 마운트 지점, 파일시스템), ...] 로. 읽을 수 없으면 빈 목록"""
+    mounts = []
+    try:
+        with open(mounts_file, encoding="utf-8", errors="replace") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) < 3:
+                    continue
+                # 공백 등은 \040 처럼 8진수로 이스케이프되어 있다
+                device, mount = (re.sub(r'\\([0-7]{3})', lambda m: chr(int(m.group(1), 8)), p) for p in parts[:2])
+                mounts.append((device, mount, parts[2]))
+    except OSError:
+        pass
+    return mounts
+
+
+def mount_point_roots(mounts_file="/proc/mounts"):
+    """Linux: /proc/mounts 의 실제 파일시스템 마운트 지점, macOS: / 와 /Volumes/*. 홈 폴더도 포함"""
+    if os.name == 'nt':
+        return []
+    roots = []
+    if os.path.exists(mounts_file):
+        for _, mount, fstype in read_mounts(mounts_file):
+            if fstype in PSEUDO_FS_TYPES or mount.startswith(('/proc', '/sys', '/dev', '/run', '/snap', '/boot')):
+                continue
+            roots.append(mount)
+    elif sys.platform == 'darwin':
+        roots.append("/")
+        try:
+            roots.extend(os.path.join("/Volumes", n) for n in sorted(os.listdir("/Volumes")))
+        except OSError:
+            pass
+    roots.append(os.path.expanduser("~"))
+    return roots
+
+
+# ── 저장 장치 종류별 스캔 동시성 ────────────────────────────
+# HDD 는 헤드 이동(seek) 때문에, 네트워크 공유는 왕복 지연·서버 부하 때문에 병렬 읽기가 오히려 느려진다.
+# 여기 없는 종류(ssd / unknown)는 scan_workers 설정을 그대로 쓴다. config.xml 의 scan_devices 로 루트별 지정 가능
+DEVICE_KINDS = ('ssd', 'hdd', 'network', 'unknown')
+DEVICE_SCAN_WORKERS = {'hdd': 1, 'network': 2}
+# 쓰기는 종류를 알 수 없는 장치(sysfs 가 없는 Windows·macOS 의 로컬 디스크 등)를 HDD 로 보고 하나씩 쓴다
+DEVICE_WRITE_WORKERS = {**DEVICE_SCAN_WORKERS, 'unknown': 1}
+NETWORK_FS_TYPES = {'cifs', 'smb3', 'smbfs', 'nfs', 'nfs4', 'afpfs', '9p', 'davfs', 'fuse.sshfs', 'fuse.rclone'}
+
+
+def _mount_of(path, mounts_file="/proc/mounts"):
+    """path 를 담은 가장 안쪽 마운트 (장치, 마운트 지점, 파일시스템). 없으면 None"""
+    best = None
+    for device, mount, fstype in read_mounts(mounts_file):
+        if (path == mount or path.startswith(os.path.join(mount, ""))) and (best is None or len(mount) >= len(best[1])):
+            best = (device, mount, fstype)
+    return best
+
+
+def device_root(path, mounts_file="/proc/mounts"):
+    """path 가 있는 저장 장치의 루트 (Linux: 마운트 지점, Windows: 드라이브·UNC 공유). 알 수 없으면 ''"""
+    path = os.path.abspath(path)
+    if os.name == 'nt':
+        return os.path.splitdrive(path)[0]
+    best = _mount_of(path, mounts_file)
+    return best[1] if best else ''
+
+
+def detect_device_kind(path, mounts_file="/proc/mounts", sys_block="/sys/class/block"):
+    """path 가 있는 저장 장치 종류 ('ssd' / 'hdd' / 'network' / 'unknown')
+
+    Linux 는 마운트 정보의 파일시스템·장치와 sysfs 의 queue/rotational, Windows 는 UNC 경로와
+    GetDriveTypeW(DRIVE_REMOTE) 로 판단한다. path 자체에는 접근하지 않으므로 끊긴 공유에서도 멈추지 않는다.
+    """
+    path = os.path.abspath(path)
+    if os.name == 'nt':
+        drive = os.path.splitdrive(path)[0]
+        if drive.startswith("\\\\"):
+            return 'network'
+        try:
+            if ctypes.windll.kernel32.GetDriveTypeW(drive + "\\") == 4:  # DRIVE_REMOTE
+                return 'network'
+        except Exception:
+            pass
+        return 'unknown'
+
+    best = _mount_of(path, mounts_file)
+    if best is None:
+        return 'unknown'
+    device, _, fstype = best
+    if fstype in NETWORK_FS_TYPES or device.startswith("//") or re.match(r'^[^/]+:/', device):
+        return 'network'
+    if not device.startswith("/dev/"):
+        return 'unknown'
+    # 파티션(sda1, nvme0n1p1)은 상위 디스크의 queue 를 본다. /dev/mapper/* 는 dm-N 으로 풀린다
+    sys_dev = os.path.realpath(os.path.join(sys_block, os.path.basename(os.path.realpath(device))))
+    for d in (sys_dev, os.path.dirname(sys_dev)):
+        try:
+            with open(os.path.join(d, "queue", "rotational")) as f:
+                return 'hdd' if f.read().strip() == "1" else 'ssd'
+        except OSError:
+            continue
+    return 'unknown'
+
+
+# 루트 목록 제공자: 사용자 등록 루트(인자) 다음에 OS 별 제공자 순서로 합친다
+ROOT_PROVIDERS = (windows_drive_roots, mount_point_roots)
+
+
+def enumerate_roots(configured=()):
+    """탐색기 루트 목록 (중복 제거, 순서 유지). 디스크에 접근하지 않으므로 느린 마운트가 있어도 즉시 끝난다"""
+    roots, seen = [], set()
+    for provider in (lambda: list(configured),) + ROOT_PROVIDERS:
+        try:
+            found = provider()
+        except Exception:
+            continue
+        for r in found:
+            key = path_key(r)
+            if key not in seen:
+                seen.add(key)
+                roots.append(r)
+    return roots
+
+
+class RootProbe:
+    """루트(드라이브·마운트 지점)의 응답 여부를 루트마다 별도 데몬 스레드에서 확인한다.
+
+    죽은 네트워크 마운트는 스레드가 무한정 멈출 수 있으므로 풀 대신 루트마다 스레드를 쓴다.
+    status[루트]: 'pending' → 'ok' / 'error', 제한 시간이 지나면 expire() 가 'timeout' 으로 표시한다.
+    늦게라도 응답이 오면 out_queue 의 결과로 상태가 다시 바뀐다.
+    """
+
+    def __init__(self, out_queue, timeout=3.0):
+        self.out_queue = out_queue
+        self.timeout = timeout
+        self.status = {}
+        self._started = {}
+
+    def probe(self, roots):
+        for root in roots:
+            self.status[root] = 'pending'
+            self._started[root] = time.monotonic()
+            threading.Thread(target=self._check, args=(root,), daemon=True).start()
+
+    def _check(self, root):
+        try:
+            with os.scandir(root) as it:
+                next(it, None)
+            ok = True
+        except OSError:
+            ok = False
+        self.out_queue.put((root, ok))
+
+    def expire(self):
+        """제한 시간을 넘긴 'pending' 루트를 'timeout' 으로 바꾸고 바뀐 루트 목록을 돌려준다"""
+        now = time.monotonic()
+        expired = [r for r, st in self.status.items()
+                   if st == 'pending' and now - self._started[r] > self.timeout]
+        for r in expired:
+            self.status[r] = 'timeout'
+        return expired
+
+    @property
+    def pending(self):
+        return any(st == 'pending' for st in self.status.values())
+
+
+class _InotifyBackend:
+    """Linux inotify (ctypes) 기반 변경 감지. 하위 폴더마다 watch 를 추가해 재귀 감시한다
+
+    watch 를 더 만들 수 없는 폴더(max_user_watches 한도 등)는 그 하위 트리를 _PollingBackend 로 대신 감시하고,
+    ('notice', 메시지) 이벤트로 알린다.
+    짝을 못 찾은 IN_MOVED_FROM 은 move_timeout 초 동안 다음 read() 의 IN_MOVED_TO 를 기다린 뒤에야
+    감시 범위 밖으로의 이동(삭제)으로 처리한다 (짝이 다른 읽기 버퍼에 나뉘어 와도 이름 변경으로 인식).
+    """
+
+    IN_MODIFY, IN_CLOSE_WRITE, IN_MOVED_FROM, IN_MOVED_TO = 0x2, 0x8, 0x40, 0x80
+    IN_CREATE, IN_DELETE, IN_DELETE_SELF, IN_MOVE_SELF = 0x100, 0x200, 0x400, 0x800
+    IN_Q_OVERFLOW, IN_IGNORED, IN_ISDIR = 0x4000, 0x8000, 0x40000000
+    IN_NONBLOCK, IN_CLOEXEC = 0o4000, 0o2000000
+    WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+
+    name = "inotify"
+
+    @staticmethod
+    def available():
+        if not sys.platform.startswith("linux"):
+            return False
+        try:
+            return hasattr(ctypes.CDLL(ctypes.util.find_library("c") or None), "inotify_init1")
+        except OSError:
+            return False
+
+    def __init__(self, root, lister, max_depth=None, supported_ext=(), poll_interval=2.0, sweep_interval=60.0,
+                 move_timeout=0.5):
+        self.lister = lister
+        self.root = root
+        self.max_depth = max_depth
+        self.supported_ext = supported_ext
+        self.poll_interval = poll_interval
+        self.sweep_interval = sweep_interval
+        self.fallbacks = []     # watch 를 못 만든 하위 트리의 폴링 감시
+        self._failed = []       # 다음 read() 에서 알릴 (폴더, 오류) 목록
+        self.move_timeout = move_timeout
+        self._moves = {}        # 짝을 기다리는 MOVED_FROM: cookie → (옛 경로, 폴더 여부, 기한)
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        self.fd = self.libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 실패")
+        self.dirs = {}      # watch descriptor → 폴더 경로
+        self.add_tree(root)
+
+    def add_tree(self, top):
+        """top 과 하위 폴더(max_depth 이내)에 watch 를 추가하고, 그 안의 음악 파일 경로 목록을 돌려준다"""
+        files = []
+        depth = folder_depth(top, self.root)
+        if depth is None or (self.max_depth is not None and depth > self.max_depth):
+            return files
+        stack = [(top, depth)]
+        while stack:
+            d, depth = stack.pop()
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(d), self.WATCH_MASK)
+            if wd < 0:
+                err = ctypes.get_errno()
+                if not os.path.isdir(d):
+                    continue   # 그 사이 사라진 폴더
+                self._failed.append((d, os.strerror(err)))
+                poller = _PollingBackend(self.root, self.supported_ext, self.poll_interval, self.max_depth,
+                                         self.sweep_interval, top=d)
+                self.fallbacks.append(poller)
+                files.extend(fp for found in poller.files.values() for fp in found)
+                continue
+            self.dirs[wd] = d
+            try:
+                entries = self.lister(d)
+            except OSError:
+                continue
+            for _, fp, kind in entries:
+                if kind == 'file':
+                    files.append(fp)
+                elif kind == 'dir' and (self.max_depth is None or depth < self.max_depth):
+                    stack.append((fp, depth + 1))
+        return files
+
+    def _notices(self):
+        if not self._failed:
+            return []
+        (first, reason), count = self._failed[0], len(self._failed)
+        self._failed = []
+        more = f" 외 {count - 1}개" if count > 1 else ""
+        return [('notice', f"inotify watch 추가 실패 ({reason}): {first}{more} - 해당 폴더는 폴링으로 감시합니다")]
+
+    def read(self, timeout):
+        """timeout 초까지 기다려 이벤트를 [('touch'|'mkdir'|'rmdir', 경로) / ('rename', 옛 경로, 새 경로, 폴더 여부)] 로"""
+        events = self._notices()
+        for poller in self.fallbacks:
+            events.extend(poller.read(0))
+        self.fallbacks = [p for p in self.fallbacks if p.dirs]
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if ready:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                data = b""
+            self._parse_events(data, events)
+        return events + self._expire_moves() + self._notices()
+
+    def _expire_moves(self):
+        """기한이 지나도록 짝이 없는 MOVED_FROM = 감시 범위 밖으로 이동 → 삭제로 처리"""
+        now = time.monotonic()
+        events = []
+        for cookie, (old, is_dir, deadline) in list(self._moves.items()):
+            if deadline > now:
+                continue
+            del self._moves[cookie]
+            if is_dir:
+                self._drop_tree(old)
+                events.append(('rmdir', old))
+            else:
+                events.append(('touch', old))
+        return events
+
+    def _parse_events(self, data, events):
+        moves = self._moves
+        offset = 0
+        while offset + 16 <= len(data):
+            wd, mask, cookie, length = struct.unpack_from("iIII", data, offset)
+            name = os.fsdecode(data[offset + 16:offset + 16 + length].rstrip(b"\0"))
+            offset += 16 + length
+            if mask & self.IN_Q_OVERFLOW:
+                events.append(('overflow', None))
+                continue
+            if mask & self.IN_IGNORED:
+                self.dirs.pop(wd, None)
+                continue
+            base = self.dirs.get(wd)
+            if base is None or not name:
+                continue  # DELETE_SELF / MOVE_SELF 는 상위 폴더 이벤트로 처리
+            path = os.path.join(base, name)
+            is_dir = bool(mask & self.IN_ISDIR)
+            if mask & self.IN_MOVED_FROM:
+                moves[cookie] = (path, is_dir, time.monotonic() + self.move_timeout)
+            elif mask & self.IN_MOVED_TO and cookie in moves:
+                old = moves.pop(cookie)[0]
+                if is_dir:
+                    for w, d in list(self.dirs.items()):
+                        rebased = rebase_path(d, old, path)
+                        if rebased is not None:
+                            self.dirs[w] = rebased
+                    # 아직 짝을 기다리는 항목도 옮겨진 폴더 기준 경로로 (이후 이벤트와 같은 기준)
+                    for c, (p, d, deadline) in list(moves.items()):
+                        rebased = rebase_path(p, old, path)
+                        if rebased is not None:
+                            moves[c] = (rebased, d, deadline)
+                events.append(('rename', old, path, is_dir))
+            elif is_dir and mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                events.append(('mkdir', path))
+                events.extend(('touch', fp) for fp in self.add_tree(path))
+            elif is_dir and mask & self.IN_DELETE:
+                events.append(('rmdir', path))
+            elif not is_dir:
+                events.append(('touch', path))
+
+    def _drop_tree(self, top):
+        """감시 범위 밖으로 옮겨진 폴더의 watch 제거 (그대로 두면 옮겨진 곳의 변경이 옛 경로로 보고된다)"""
+        prefix = os.path.join(top, "")
+        for wd, d in list(self.dirs.items()):
+            if d == top or d.startswith(prefix):
+                self.libc.inotify_rm_watch(self.fd, wd)
+                del self.dirs[wd]
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class _PollingBackend:
+    """inotify 를 쓸 수 없을 때의 폴링 감시.
+
+    매 주기(interval)에는 폴더 mtime 만 stat 해 항목이 추가·삭제·이름 변경된 폴더를 찾고, 그 폴더만 다시 읽는다.
+    폴더 mtime 이 바뀌지 않는 파일 내용 수정(다른 프로그램의 태그 저장)은 sweep_interval 초에 걸쳐
+    폴더 몇 개씩 돌아가며 다시 읽어 찾는다. 폴더 읽기는 os.scandir 한 번이며, Windows 에서는 파일 크기·수정
+    시각이 목록과 함께 오므로 파일마다 stat 하지 않는다.
+    top 을 주면 root 아래의 그 하위 트리만 감시한다 (inotify watch 를 더 만들 수 없을 때의 대체용).
+    """
+
+    name = "polling"
+
+    def __init__(self, root, supported_ext, interval=2.0, max_depth=None, sweep_interval=60.0, top=None):
+        self.supported_ext = supported_ext
+        self.root = root
+        self.max_depth = max_depth
+        self.interval = interval
+        self.sweep_interval = max(interval, sweep_interval)
+        self.dirs = {}      # 폴더 → mtime_ns
+        self.files = {}     # 폴더 → {음악 파일: (size, mtime_ns)}
+        self._sweep = deque()   # 아직 이번 순회에서 다시 읽지 않은 폴더
+        self.add_tree(top or root)
+        self._next_poll = time.monotonic() + interval
+
+    def _descend(self, folder):
+        """folder 의 하위 폴더도 감시 범위(max_depth) 안인지"""
+        if self.max_depth is None:
+            return True
+        depth = folder_depth(folder, self.root)
+        return depth is not None and depth < self.max_depth
+
+    def _read_dir(self, d):
+        """scandir 한 번으로 (하위 폴더 목록, {음악 파일: (size, mtime_ns)}). 심볼릭 링크 폴더는 따라가지 않는다"""
+        subdirs, files = [], {}
+        with os.scandir(d) as it:
+            for e in it:
+                try:
+                    if e.is_dir():
+                        if not e.is_symlink():
+                            subdirs.append(e.path)
+                    elif e.name.lower().endswith(self.supported_ext):
+                        st = e.stat()
+                        files[e.path] = (st.st_size, st.st_mtime_ns)
+                except OSError:
+                    continue
+        return subdirs, files
+
+    def add_tree(self, top):
+        """top 과 하위 폴더(max_depth 이내)를 감시 목록에 넣고, 그 안의 음악 파일 경로 목록을 돌려준다"""
+        found = []
+        stack = [top]
+        while stack:
+            d = stack.pop()
+            try:
+                mtime = os.stat(d).st_mtime_ns
+                subdirs, files = self._read_dir(d)
+            except OSError:
+                continue
+            self.dirs[d] = mtime
+            self.files[d] = files
+            found.extend(files)
+            if self._descend(d):
+                stack.extend(subdirs)
+        return found
+
+    def _drop_tree(self, top):
+        prefix = os.path.join(top, "")
+        for table in (self.dirs, self.files):
+            for p in [p for p in table if p == top or p.startswith(prefix)]:
+                del table[p]
+
+    def read(self, timeout):
+        wait = self._next_poll - time.monotonic()
+        if wait > 0:
+            time.sleep(min(wait, timeout))
+            return []
+        self._next_poll = time.monotonic() + self.interval
+        return self.poll()
+
+    def _refresh(self, d):
+        """폴더 하나를 다시 읽어 이전 상태와 비교한 이벤트 목록"""
+        try:
+            subdirs, files = self._read_dir(d)
+        except OSError:
+            return []   # 다음 주기의 stat 에서 삭제로 처리
+        events = []
+        old = self.files.get(d, {})
+        events.extend(('touch', fp) for fp, sig in files.items() if old.get(fp) != sig)
+        events.extend(('touch', fp) for fp in old if fp not in files)
+        self.files[d] = files
+        if self._descend(d):
+            for sub in subdirs:
+                if sub not in self.dirs:
+                    events.append(('mkdir', sub))
+                    events.extend(('touch', fp) for fp in self.add_tree(sub))
+        listed = set(subdirs)
+        for sub in [s for s in self.dirs if os.path.dirname(s) == d and s not in listed]:
+            self._drop_tree(sub)
+            events.append(('rmdir', sub))
+        return events
+
+    def poll(self):
+        events = []
+        refreshed = set()
+        # 1. 항목이 추가/삭제/이름 변경된 폴더 (폴더 mtime 변화) - 폴더만 stat
+        for d, mtime in list(self.dirs.items()):
+            if d not in self.dirs:
+                continue  # 앞에서 상위 폴더와 함께 제거됨
+            try:
+                st = os.stat(d)
+            except OSError:
+                self._drop_tree(d)
+                events.append(('rmdir', d))
+                continue
+            if st.st_mtime_ns != mtime:
+                self.dirs[d] = st.st_mtime_ns
+                events.extend(self._refresh(d))
+                refreshed.add(d)
+        # 2. 파일 내용 수정: sweep_interval 동안 모든 폴더를 한 번 돌도록 이번 주기 몫만 다시 읽는다
+        if not self._sweep:
+            self._sweep.extend(self.dirs)
+        share = -(-len(self.dirs) * self.interval // self.sweep_interval)
+        while share > 0 and self._sweep:
+            d = self._sweep.popleft()
+            if d in self.dirs and d not in refreshed:
+                events.extend(self._refresh(d))
+                share -= 1
+        return events
+
+    def close(self):
+        pass
+
+
+class FolderWatcher:
+    """그리드에 올린 폴더(스캔 범위의 하위 폴더 포함)의 외부 변경을 감지해 증분 변경 목록을 out_queue 로 보내는 감시자.
+
+    Linux 에서는 inotify, 그 밖에는 폴링을 사용한다. 이벤트는 debounce 초 동안 잠잠해지거나
+    max_delay 초가 지나면 한 묶음으로 정리되고, 건드려진 음악 파일만 다시 파싱한다.
+    out_queue 메시지: (watcher, 감시 루트, [변경, ...])
+      ('rename', 옛 경로, 새 경로, data|None) : 파일 이름 변경 (새 파일의 현재 위치에서 파싱한 결과)
+      ('rename_dir', 옛 폴더, 새 폴더)         : 폴더 이름 변경·이동
+      ('file', 경로, data|None)               : 추가·수정(data) 또는 삭제(None)
+      ('rmtree', 폴더)                        : 폴더 삭제
+      ('dir', 폴더)                           : 목록이 바뀐 폴더 (탐색기 갱신용)
+      ('rescan', 루트)                        : 이벤트 유실 → 전체 다시 스캔 필요
+      ('notice', 메시지)                      : 감시 방식 변경 등 로그로 알릴 내용
+    """
+
+    def __init__(self, supported_ext, out_queue, lister=None, debounce=0.5, max_delay=2.0, poll_interval=2.0,
+                 sweep_interval=60.0):
+        self.supported_ext = supported_ext
+        self.out_queue = out_queue
+        self.lister = lister or (lambda p: list_dir(p, supported_ext))
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.poll_interval = poll_interval
+        self.sweep_interval = sweep_interval
+        self.root = None
+        self.max_depth = None
+        self.backend_name = None
+        self._stop_event = None
+        self.thread = None
+
+    def start(self, root, max_depth=None):
+        """root 감시 시작. max_depth 는 그리드 스캔 범위와 같은 하위 폴더 단계 수 (None = 전체)"""
+        self.stop()
+        self.root = root
+        self.max_depth = max_depth
+        self._stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, args=(root, max_depth, self._stop_event), daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        if self._stop_event is not None:
+            self._stop_event.set()
+        self._stop_event = None
+        self.root = None
+
+    def _make_backend(self, root, max_depth):
+        if _InotifyBackend.available():
+            try:
+                return _InotifyBackend(root, self.lister, max_depth, self.supported_ext,
+                                       self.poll_interval, self.sweep_interval, self.debounce)
+            except OSError:
+                pass
+        return _PollingBackend(root, self.supported_ext, self.poll_interval, max_depth, self.sweep_interval)
+
+    def _run(self, root, max_depth, stop_event):
+        backend = self._make_backend(root, max_depth)
+        self.backend_name = backend.name
+        pending = []
+        first = last = 0.0
+        try:
+            while not stop_event.is_set():
+                events = backend.read(0.2)
+                now = time.monotonic()
+                if events:
+                    if not pending:
+                        first = now
+                    pending.extend(events)
+                    last = now
+                if pending and (now - last >= self.debounce or now - first >= self.max_delay):
+                    changes = self._resolve(root, pending)
+                    pending = []
+                    if changes and not stop_event.is_set():
+                        self.out_queue.put((self, root, changes))
+        finally:
+            backend.close()
+
+    def _parse(self, fp):
+        if not fp.lower().endswith(self.supported_ext) or not os.path.isfile(fp):
+            return None
+        try:
+            return read_track_info(fp)
+        except Exception:
+            return None
+
+    def _resolve(self, root, events):
+        """원시 이벤트를 정리: 같은 파일의 여러 이벤트는 한 번만, 파일 파싱은 마지막 상태 기준
+
+        이름 변경은 순서대로 내보낸다. 파일 경로는 같은 묶음에서 나중에 일어난 폴더 이름 변경까지 따라가
+        디스크의 현재 위치에서 파싱한다 (파일 이름 변경 뒤 상위 폴더도 바뀐 경우 행을 잃지 않도록).
+        """
+        if any(e[0] == 'overflow' for e in events):
+            return [('rescan', root)]
+        dir_moves = [(i, e[1], e[2]) for i, e in enumerate(events)
+                     if e[0] == 'rename' and (e[3] if len(e) > 3 else os.path.isdir(e[2]))]
+
+        dir_indices = {j for j, _, _ in dir_moves}
+
+        def current(path, i):
+            """i 번째 이벤트 시점의 path 가 묶음 끝에서 있는 위치"""
+            for j, old, new in dir_moves:
+                if j > i:
+                    path = rebase_path(path, old, new) or path
+            return path
+
+        changes, touched, dirs = [], {}, {}
+        for i, e in enumerate(events):
+            kind, path = e[0], e[1]
+            if kind == 'notice':
+                changes.append(e)
+                continue
+            dirs[path_key(os.path.dirname(path))] = os.path.dirname(path)
+            if kind == 'rename':
+                new = e[2]
+                dirs[path_key(os.path.dirname(new))] = os.path.dirname(new)
+                touched.pop(path_key(current(path, i)), None)
+                touched.pop(path_key(current(new, i)), None)
+                if i in dir_indices:
+                    changes.append(('rename_dir', path, new))
+                elif new.lower().endswith(self.supported_ext) or path.lower().endswith(self.supported_ext):
+                    changes.append(('rename', path, new, self._parse(current(new, i))))
+            elif kind == 'rmdir':
+                changes.append(('rmtree', path))
+            elif kind == 'touch' and path.lower().endswith(self.supported_ext):
+                # 'file' 변경은 이름 변경을 모두 반영한 뒤 적용되므로 최종 위치 기준
+                path = current(path, i)
+                touched[path_key(path)] = path
+        for fp in touched.values():
+            changes.append(('file', fp, self._parse(fp)))
+        changes.extend(('dir', d) for d in dirs.values())
+        return changes
+
+
+# 일괄 정리 항목·범위 선택 팝업. result = (정리 키 집합, 목록 전체 여부), 취소 시 None
+class FixerDialog(tk.Toplevel):
+    def __init__(self, parent, selected_count, total_count):
+        super().__init__(parent)
+        self.title("일괄 정리")
+        self.resizable(False, False)
+        self.result = None
+
+        tk.Label(self, text="적용할 정리 항목 (파일마다 한 번 열어 한 번 저장):",
+                 font=('Malgun Gothic', 10, 'bold')).pack(anchor="w", padx=10, pady=(10, 5))
+        self.vars = {}
+        for key, label in [(k, l) for k, l, _ in TRACK_FIXERS] + [FIX_RENAME]:
+            self.vars[key] = tk.BooleanVar(value=key not in FIXERS_OFF_BY_DEFAULT)
+            tk.Checkbutton(self, text=label, variable=self.vars[key], font=('Malgun Gothic', 9)).pack(anchor="w", padx=20)
+
+        self.var_whole = tk.BooleanVar(value=not selected_count)  # 선택이 없으면 목록 전체만 가능
+        scope = tk.Frame(self)
+        scope.pack(anchor="w", padx=10, pady=(8, 0))
+        tk.Radiobutton(scope, text=f"선택한 파일 ({selected_count}개)", variable=self.var_whole, value=False,
+                       state=tk.NORMAL if selected_count else tk.DISABLED, font=('Malgun Gothic', 9)).pack(side=tk.LEFT)
+        tk.Radiobutton(scope, text=f"목록 전체 ({total_count}개)", variable=self.var_whole, value=True,
+                       font=('Malgun Gothic', 9)).pack(side=tk.LEFT, padx=(10, 0))
+
+        btn_frame = tk.Frame(self)
+        btn_frame.pack(pady=10)
+        ttk.Button(btn_frame, text="실행", command=self.on_ok).pack(side=tk.LEFT, padx=5)
+        ttk.Button(btn_frame, text="취소", command=self.destroy).pack(side=tk.LEFT, padx=5)
+        self.grab_set()
+
+    def on_ok(self):
+        fixers = {key for key, var in self.vars.items() if var.get()}
+        if fixers:
+            self.result = (fixers, self.var_whole.get())
+        self.destroy()
 
 
 # 검색 결과 선택을 위한 별도 팝업 클래스
@@ -85,6 +2581,290 @@ class SelectionDialog(tk.Toplevel):
             self.result_data = (full_values[1], full_values[2], full_values[3], full_values[4], rel_id)
             self.destroy()
 
+class VirtualGrid(tk.Frame):
+    """화면에 보이는 줄 수만큼만 실제 Treeview 항목(슬롯)을 만들고 스크롤 시 값만 바꿔 끼우는 그리드.
+
+    행 데이터·순서·선택은 모델(TrackStore)이 가지며, 행 추가/값 변경은 모델에 한 뒤 refresh() 를 부른다.
+    ttk.Treeview 와 같은 이름의 조회 메서드(delete / item / set / get_children / selection ...)를
+    제공하므로 기존 file_grid 사용 코드를 거의 그대로 쓸 수 있다.
+    사용자가 선택을 바꾸면 이 프레임에서 <<TreeviewSelect>> 가 발생한다.
+    """
+
+    def __init__(self, master, columns, model, **kw):
+        super().__init__(master, **kw)
+        self.columns = tuple(columns)
+        self.model = model
+        self.tree = ttk.Treeview(self, columns=self.columns, show="headings", selectmode="extended", height=1)
+        self.vsb = ttk.Scrollbar(self, orient="vertical", command=self.yview)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.vsb.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.top = 0              # 첫 번째로 보이는 행의 위치
+        self.slots = []           # Treeview 실제 항목 id (화면 줄 수만큼)
+        self._attached = []       # 슬롯별 표시 여부
+        self._row_h = 20
+        self._header_h = 25
+        self._anchor = None       # Shift 범위 선택 기준 행
+        self._cursor = None       # 키보드 이동 기준 행
+        self._render_pending = False
+        self.heading_extend_command = None  # Shift+헤더 클릭 시 호출 (컬럼 이름 전달, 다중 정렬용)
+        self.render_command = None          # 화면을 다시 그린 뒤 호출 (보이는 행 지연 로딩용)
+
+        t = self.tree
+        t.bind("<Configure>", self._on_configure)
+        t.bind("<Button-1>", lambda e: self._on_click(e, "set"))
+        t.bind("<Shift-Button-1>", lambda e: self._on_click(e, "extend"))
+        t.bind("<Control-Button-1>", lambda e: self._on_click(e, "toggle"))
+        t.bind("<B1-Motion>", self._on_drag)
+        t.bind("<MouseWheel>", self._on_wheel)
+        t.bind("<Button-4>", lambda e: self._scroll_units(-3))
+        t.bind("<Button-5>", lambda e: self._scroll_units(3))
+        for key, step in (("Up", -1), ("Down", 1), ("Prior", "-page"), ("Next", "page"), ("Home", "home"), ("End", "end")):
+            t.bind(f"<{key}>", lambda e, s=step: self._on_key(s, False))
+            t.bind(f"<Shift-{key}>", lambda e, s=step: self._on_key(s, True))
+        t.bind("<Control-a>", self._select_all)
+
+    # ── Treeview 호환 API ────────────────────────────────────
+    def refresh(self):
+        """모델 변경 후 화면 갱신 예약 (여러 번 불러도 한 번만 그림)"""
+        self._schedule_render()
+
+    def delete(self, *rids):
+        before = len(self.model.selected)
+        self.model.remove(rids)
+        self._schedule_render()
+        if len(self.model.selected) != before:
+            self._notify_select()
+
+    def get_children(self, item=""):
+        return tuple(self.model.order)
+
+    def exists(self, rid):
+        return self.model.contains(rid)
+
+    def index(self, rid):
+        return self.model.index(rid)
+
+    def item(self, rid, option=None, **kw):
+        """표시 값 조회와 tags 변경만 지원 (값 변경은 모델을 통해서)"""
+        if "tags" in kw:
+            tags = kw["tags"]
+            self.model.set_tags(rid, tags if isinstance(tags, (tuple, list)) else (tags,))
+            self._schedule_render()
+            return None
+        if option == "values":
+            return self.model.row_values(rid)
+        if option == "tags":
+            return self.model.row_tags(rid)
+        return {"text": "", "values": self.model.row_values(rid), "tags": self.model.row_tags(rid)}
+
+    def set(self, rid, column):
+        return self.model.row_values(rid)[self.columns.index(column)]
+
+    def move(self, rid, parent, index):
+        self.model.move(rid, index)
+        self._schedule_render()
+
+    def reorder(self, rids):
+        """정렬된 행 id 목록을 한 번에 적용 (항목별 move() 호출 불필요)"""
+        self.model.reorder(rids)
+        self._schedule_render()
+
+    def selection(self):
+        return self.model.selection_in_order()
+
+    def selection_set(self, *rids):
+        if len(rids) == 1 and isinstance(rids[0], (tuple, list)):
+            rids = rids[0]
+        self.model.selected = {r for r in rids if self.model.contains(r)}
+        if rids:
+            self._anchor = self._cursor = rids[0]
+        self._render()
+        self._notify_select()
+
+    def see(self, rid):
+        pos = self.model.index(rid)
+        full = self._full_rows()
+        if pos < self.top:
+            self.top = pos
+        elif pos >= self.top + full:
+            self.top = pos - full + 1
+        self._render()
+
+    def identify_row(self, y):
+        slot = self.tree.identify_row(y)
+        if not slot or slot not in self.slots:
+            return ""
+        pos = self.top + self.slots.index(slot)
+        return self.model.order[pos] if pos < len(self.model.order) else ""
+
+    def heading(self, column, **kw):
+        return self.tree.heading(column, **kw)
+
+    def column(self, column, **kw):
+        return self.tree.column(column, **kw)
+
+    def tag_configure(self, tagname, **kw):
+        return self.tree.tag_configure(tagname, **kw)
+
+    def bind(self, sequence=None, func=None, add=None):
+        # 선택 이벤트는 모델이 직접 발생시키므로 프레임에, 마우스 등은 실제 Treeview 에 바인딩
+        if sequence and sequence.startswith("<<"):
+            return super().bind(sequence, func, add)
+        return self.tree.bind(sequence, func, add)
+
+    def visible_rows(self):
+        """현재 화면에 보이는 행 id 목록"""
+        return self.model.order[self.top:self.top + len(self.slots)]
+
+    # ── 스크롤 ────────────────────────────────────────────────
+    def yview(self, *args):
+        n = len(self.model)
+        if not args:
+            return (self.top / n, min(1.0, (self.top + self._full_rows()) / n)) if n else (0.0, 1.0)
+        if args[0] == "moveto":
+            self.top = int(float(args[1]) * n)
+        elif args[0] == "scroll":
+            step = int(args[1])
+            self.top += step * self._full_rows() if args[2] == "pages" else step
+        self._render()
+
+    def _on_wheel(self, event):
+        # Windows 는 120 단위, macOS 는 작은 값으로 delta 가 들어온다
+        units = -int(event.delta / 120) * 3 or (-1 if event.delta > 0 else 1)
+        return self._scroll_units(units)
+
+    def _scroll_units(self, units):
+        self.top += units
+        self._render()
+        return "break"
+
+    def _full_rows(self):
+        """완전히 보이는 줄 수"""
+        height = self.tree.winfo_height()
+        return max(1, (height - self._header_h) // max(1, self._row_h))
+
+    # ── 렌더링 ────────────────────────────────────────────────
+    def _on_configure(self, event=None):
+        self._measure()
+        visible = max(1, -(-(self.tree.winfo_height() - self._header_h) // max(1, self._row_h)))
+        while len(self.slots) < visible:
+            self.slots.append(self.tree.insert("", "end", values=()))
+            self._attached.append(True)
+        while len(self.slots) > visible:
+            self.tree.delete(self.slots.pop())
+            self._attached.pop()
+        self._render()
+
+    def _measure(self):
+        """첫 슬롯의 bbox 로 헤더 높이와 줄 높이를 측정"""
+        if self.slots and self._attached[0]:
+            bb = self.tree.bbox(self.slots[0])
+            if bb:
+                self._header_h, self._row_h = bb[1], bb[3]
+
+    def _schedule_render(self):
+        if not self._render_pending:
+            self._render_pending = True
+            self.after_idle(self._render)
+
+    def _render(self):
+        self._render_pending = False
+        m = self.model
+        n = len(m.order)
+        self.top = max(0, min(self.top, n - self._full_rows()))
+        sel_slots = []
+        for i, slot in enumerate(self.slots):
+            pos = self.top + i
+            if pos < n:
+                rid = m.order[pos]
+                self.tree.item(slot, values=m.row_values(rid), tags=m.row_tags(rid))
+                if not self._attached[i]:
+                    self.tree.move(slot, "", i)
+                    self._attached[i] = True
+                if rid in m.selected:
+                    sel_slots.append(slot)
+            elif self._attached[i]:
+                self.tree.detach(slot)
+                self._attached[i] = False
+        if tuple(sel_slots) != self.tree.selection():
+            self.tree.selection_set(sel_slots)
+        self.tree.yview_moveto(0)  # 슬롯 자체는 스크롤하지 않음
+        first, last = self.yview()
+        self.vsb.set(first, last)
+        if self.render_command:
+            self.render_command()
+
+    # ── 선택 처리 ─────────────────────────────────────────────
+    def _notify_select(self):
+        self.event_generate("<<TreeviewSelect>>", when="tail")
+
+    def _apply_click(self, rid, mode):
+        m = self.model
+        if mode == "toggle":
+            m.selected ^= {rid}
+            self._anchor = rid
+        elif mode == "extend" and m.contains(self._anchor):
+            a, b = sorted((m.index(self._anchor), m.index(rid)))
+            m.selected = set(m.order[a:b + 1])
+        else:
+            m.selected = {rid}
+            self._anchor = rid
+        self._cursor = rid
+        self._render()
+        self._notify_select()
+
+    def _on_click(self, event, mode):
+        region = self.tree.identify_region(event.x, event.y)
+        if region == "heading" and mode == "extend" and self.heading_extend_command:
+            col = self.tree.identify_column(event.x)  # '#1' 형식
+            self.heading_extend_command(self.columns[int(col[1:]) - 1])
+            return "break"
+        if region not in ("cell", "tree"):
+            return None  # 헤더 클릭(정렬)·컬럼 폭 조절은 Treeview 기본 동작
+        self.tree.focus_set()
+        rid = self.identify_row(event.y)
+        if rid:
+            self._apply_click(rid, mode)
+        return "break"
+
+    def _on_drag(self, event):
+        if self.tree.identify_region(event.x, event.y) == "separator" or not self.model.contains(self._anchor):
+            return None
+        if event.y < self._header_h:
+            self._scroll_units(-1)
+        elif event.y > self.tree.winfo_height():
+            self._scroll_units(1)
+        rid = self.identify_row(min(max(event.y, self._header_h + 1), self.tree.winfo_height() - 2))
+        if rid and rid != self._cursor:
+            self._apply_click(rid, "extend")
+        return "break"
+
+    def _on_key(self, step, extend):
+        m = self.model
+        if not m.order:
+            return "break"
+        pos = m.index(self._cursor) if m.contains(self._cursor) else self.top
+        if step == "home":
+            pos = 0
+        elif step == "end":
+            pos = len(m.order) - 1
+        elif step in ("page", "-page"):
+            pos += self._full_rows() * (1 if step == "page" else -1)
+        else:
+            pos += step
+        rid = m.order[max(0, min(pos, len(m.order) - 1))]
+        self._apply_click(rid, "extend" if extend else "set")
+        self.see(rid)
+        return "break"
+
+    def _select_all(self, event=None):
+        self.model.selected = set(self.model.order)
+        self._render()
+        self._notify_select()
+        return "break"
+
+
 class MusicTagEditorGUI:
     def __init__(self, root):
         self.root = root
@@ -101,9 +2881,107 @@ class MusicTagEditorGUI:
         self.history_dict = {k: [] for k in ["ent_title", "ent_artist", "ent_albumartist", "ent_track", "ent_album", "ent_genre", "ent_date", "ent_keywords"]}
         musicbrainzngs.set_useragent("MyMusicTagTool", "2.7", "rockguy.im@gmail.com")
         self.supported_ext = ('.mp3', '.flac', '.m4a', '.ogg', '.wma', '.wav')
-        self.full_file_paths = {}
+        # 폴더 목록 캐시 (탐색기 + 폴더 스캔 공용, 폴더 mtime 으로 검증)
+        self.dir_cache = DirListingCache(self.supported_ext)
+        self._node_listing = {}   # 탐색기 노드 id → 채울 때 사용한 목록 (변경 없으면 다시 그리지 않음)
+        self.node_by_path = {}    # 탐색기 폴더 경로(path_key) → 노드 id
+        self.tracks = TrackStore()   # 그리드 행 데이터 (행 id → Track)
         self.selected_path = ""
 
+        # 백그라운드 폴더 스캔 상태 (워커 → UI 큐)
+        self.scan_queue = queue.Queue()
+        self.scan_job = None
+        self._scan_after_id = None
+
+        # 스캔 병렬 설정 (config.xml: scan_workers / scan_pool, 0 / 빈 값 = 자동).
+        # benchmark.py scan 의 스레드·프로세스 비교에서 스레드 풀은 태그 파싱(CPU 작업)이 GIL 에 묶여 워커를 늘려도
+        # 빨라지지 않았다 (4 워커 0.88~1.01배). 그래서 자동은 프로세스 풀 + 코어 수(최대 4) 이고, 단일 코어면 순차 파싱이다.
+        # 스레드 풀을 직접 고르고 워커 수를 자동으로 두면 순차 파싱.
+        try:
+            self.scan_workers_setting = int(self.read_config_value("scan_workers", "0"))
+        except ValueError:
+            self.scan_workers_setting = 0
+        self.scan_pool_setting = self.read_config_value("scan_pool", "")
+        pool = self.scan_pool_setting if self.scan_pool_setting in ScanEngine.POOL_KINDS else 'process'
+        workers = self.scan_workers_setting
+        if workers <= 0:
+            workers = min(4, os.cpu_count() or 1) if pool == 'process' else 1
+        self.scan_engine = ScanEngine(workers, pool)
+        # 스캔 모드 (config.xml: scan_mode = full | tags). tags 는 태그만 읽고 스트림 정보는 지연 계산
+        self.scan_tags_only = self.read_config_value("scan_mode", "full") == "tags"
+        # 스캔 범위 (config.xml: scan_depth = all | 하위 폴더 단계 수) 와
+        # 확인 없이 스캔할 최대 파일 수 (scan_confirm_limit, 0 이하면 묻지 않음)
+        depth = self.read_config_value("scan_depth", "all")
+        self.scan_depth = int(depth) if depth.isdigit() else None
+        try:
+            self.scan_confirm_limit = int(self.read_config_value("scan_confirm_limit", "20000"))
+        except ValueError:
+            self.scan_confirm_limit = 20000
+        # 루트별 저장 장치 설정 (config.xml: scan_devices/device[@root, @kind, @workers]). 없으면 자동 감지
+        self.device_profiles = self.read_device_profiles()
+
+        # 스트림 정보(비트레이트·길이) 지연 계산: 보이는 행 우선, 비트전송률 정렬 시 전체
+        self.info_queue = queue.Queue()
+        self.info_loader = StreamInfoLoader(self.info_queue)
+        self._info_after_id = None
+        self._resort_after_info = False
+
+        # 태그 쓰기 작업 대기열 (TagWriteJob 을 하나씩 실행, 결과는 write_queue 로)
+        # 동시 쓰기는 write_workers 개까지, 저장 장치 루트마다 scan_devices 제한(HDD·알 수 없는 장치 1, 네트워크 2)까지
+        self.write_queue = queue.Queue()
+        self.write_job = None
+        self.write_pending = deque()
+        self._write_after_id = None
+        try:
+            self.write_workers = max(1, int(self.read_config_value("write_workers", "4")))
+        except ValueError:
+            self.write_workers = 4
+        # 저장 시 태그 뒤에 확보할 여유 공간 (config.xml: tag_padding, 바이트). 작은 수정이 파일 전체 재작성으로 번지지 않게
+        try:
+            self.padding_policy = PaddingPolicy(int(self.read_config_value("tag_padding", str(DEFAULT_PADDING.reserve))))
+        except ValueError:
+            self.padding_policy = DEFAULT_PADDING
+
+        # 탐색기 폴더 노드의 펼침 표시(+) 는 백그라운드에서 확인 후 채운다
+        self.probe_queue = queue.Queue()
+        self.dir_probe = DirChildProbe(self.probe_queue)
+        self._probe_after_id = None
+
+        # 그리드 폴더의 외부 변경 감시 (inotify / 폴링) → 바뀐 파일만 다시 파싱해 반영
+        self.fs_queue = queue.Queue()
+        self.watcher = FolderWatcher(self.supported_ext, self.fs_queue, lister=self.dir_cache.list)
+        self._fs_after_id = None
+
+        # 탐색기 루트 (드라이브 / 마운트 지점 / 등록 루트). 응답 여부는 RootProbe 가 비동기로 확인
+        self.roots = []
+        self.library_roots = []      # config.xml: library_roots/root
+        self.root_labels = {}        # 콤보박스 표시 문자열 → 루트 경로
+        self.current_root = ""
+        self.root_queue = queue.Queue()
+        self.root_probe = RootProbe(self.root_queue)
+        self._root_after_id = None
+        self._select_when_ready = None   # 확인이 끝나면 열 루트
+        self._pending_focus = None       # 루트가 열리면 펼칠 폴더 (last_folder)
+
+        # 태그 색인 (config.xml 과 같은 폴더의 SQLite 파일)
+        self.tag_index = TagIndex(os.path.join(os.path.dirname(self.config_file), "tag_index.db"))
+
+        # 탐색기 폴더 배지(곡 수·크기·길이): 색인의 폴더 집계를 바로 표시하고 FolderStatsWorker 가 갱신
+        self.stats_queue = queue.Queue()
+        self.folder_stats = FolderStatsWorker(self.tag_index, self.dir_cache.list, self.stats_queue)
+        self._stats_after_id = None
+        self._folder_counts = {}   # 폴더 노드 id → 하위 전체 곡 수 (배지를 표시한 노드만)
+        self._detached = {}        # 숨긴(음악 없는) 폴더 노드 id → 부모 노드 id
+        self.hide_empty_folders = self.read_config_value("hide_empty_folders", "0") == "1"
+        # 탐색기 파일 노드: 폴더당 EXPLORER_FILE_PAGE 개씩 표시 (또는 숨기고 그리드에만 표시)
+        self.show_file_leaves = self.read_config_value("show_file_leaves", "1") == "1"
+        self._file_limit = {}      # 폴더 노드 id → 표시 중인 파일 노드 수 ('더 보기'로 늘어남)
+        self._more_nodes = {}      # 폴더 노드 id → '더 보기' 노드 id
+
+        # 종료 시 그리드 스냅샷 (다음 실행 시 즉시 표시 후 백그라운드 검증)
+        self.snapshot_file = os.path.join(os.path.dirname(self.config_file), "grid_snapshot.json")
+        self._patch_rows = None   # 검증(patch) 스캔 중일 때 {경로: item_id}
+
         # 스타일 설정 (버튼 색상 변경을 위함)
         self.style = ttk.Style()
         self.style.theme_use('clam')  # 배경색 변경이 잘 적용되는 clam 테마 권장
@@ -117,7 +2995,7 @@ class MusicTagEditorGUI:
                        background=[('active', '#ffb3b3')])        
         
         # [추가] 현재 소팅 상태 저장 (컬럼명, 반전 여부)
-        self.current_sort = {"col": None, "reverse": False}
+        self.current_sort = {"col": None, "reverse": False, "then": []}
 
         self.current_album_art = None # 메모리 누수 방지용 참조 유지
         
@@ -127,6 +3005,9 @@ class MusicTagEditorGUI:
         # [X] 종료 프로토콜 연결
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
 
+        # 지난 종료 시점의 그리드를 먼저 그려 바로 조작 가능하게 한다
+        self.root.after_idle(self.restore_grid_snapshot)
+
         # UI가 완전히 그려진 후 세부 설정(폭, 높이 등) 복구
         self.root.after(500, self.load_config_ui_details)
 
@@ -187,6 +3068,62 @@ class MusicTagEditorGUI:
 
         return os.path.join(os.path.expanduser("~"), "config.xml")  # 최후 수단
 
+    def read_config_value(self, tag, default=""):
+        """config.xml 에서 단일 항목 값을 읽는다. 파일·항목이 없으면 default"""
+        try:
+            if os.path.exists(self.config_file):
+                elem = ET.parse(self.config_file).getroot().find(tag)
+                if elem is not None and elem.text:
+                    return elem.text.strip()
+        except Exception:
+            pass
+        return default
+
+    def read_device_profiles(self):
+        """config.xml 의 scan_devices 를 {루트: (장치 종류, 동시 읽기 수|None)} 로 읽는다"""
+        profiles = {}
+        try:
+            if os.path.exists(self.config_file):
+                for e in ET.parse(self.config_file).getroot().findall("scan_devices/device"):
+                    root = (e.get("root") or "").strip()
+                    kind = e.get("kind", "unknown")
+                    if not root:
+                        continue
+                    try:
+                        workers = int(e.get("workers", "0")) or None
+                    except ValueError:
+                        workers = None
+                    profiles[root] = (kind if kind in DEVICE_KINDS else 'unknown', workers)
+        except Exception:
+            pass
+        return profiles
+
+    def storage_profile(self, path, limits=DEVICE_SCAN_WORKERS):
+        """path 가 있는 (저장 장치 루트, 장치 종류, 동시 입출력 제한|None). 설정된 루트가 우선이고, 없으면 마운트 단위로 감지
+
+        설정에 동시 작업 수가 없으면 limits(장치 종류 → 제한) 를 따른다.
+        """
+        key = path_key(path)
+        best = None
+        for root in self.device_profiles:
+            rk = path_key(root)
+            if (key == rk or key.startswith(os.path.join(rk, ""))) and (best is None or len(rk) > len(path_key(best))):
+                best = root
+        if best is not None:
+            kind, workers = self.device_profiles[best]
+            return best, kind, workers or limits.get(kind)
+        kind = detect_device_kind(path)   # 마운트 정보·sysfs 만 읽으므로 스캔마다 호출해도 가볍다
+        return device_root(path), kind, limits.get(kind)
+
+    def scan_profile(self, path):
+        """path 스캔에 쓸 (장치 종류, 동시 읽기 제한|None)"""
+        return self.storage_profile(path)[1:]
+
+    def write_limit(self, path):
+        """TagWriteJob.limit_for: (저장 장치 루트, 동시 쓰기 제한|None). 쓰기 작업 스레드에서 폴더마다 한 번 호출"""
+        root, _, limit = self.storage_profile(path, DEVICE_WRITE_WORKERS)
+        return root, limit
+
     def load_config_start(self):
         """프로그램 시작 시 창 크기와 위치를 설정"""
         if os.path.exists(self.config_file):
@@ -229,15 +3166,24 @@ class MusicTagEditorGUI:
             # ── 폴더 트리에서 last_folder 복구 ───────────────
             lf_elem = xml_root.find("last_folder")
             last_folder = (lf_elem.text or "").strip() if lf_elem is not None else ""
-            if last_folder and os.path.isdir(last_folder):
-                self.focus_and_expand_path(last_folder)
-                self.log(f"마지막 폴더 복구: {last_folder}")
+            if last_folder and self.root_status(last_folder) == 'pending':
+                self._pending_focus = last_folder  # 루트 확인이 끝나면 on_drive_select 에서 복구
+            elif last_folder and self.root_status(last_folder) == 'ok' and os.path.isdir(last_folder):
+                t0 = time.perf_counter()
+                if self.focus_and_expand_path(last_folder):
+                    self.log(f"마지막 폴더 복구: {last_folder} ({(time.perf_counter() - t0) * 1000:.0f} ms)")
 
             # ── 그리드: last_path 폴더의 파일 목록 복구 ─────
             lp = xml_root.find("last_path")
-            if lp is not None and lp.text and os.path.isdir(lp.text):
-                self.selected_path = lp.text
-                self.refresh_grid_list(lp.text)
+            # 확인 중인 루트는 isdir 로 UI 를 막지 않고 스캔(백그라운드)에 맡긴다
+            lp_status = self.root_status(lp.text) if lp is not None and lp.text else 'error'
+            if lp_status == 'pending' or (lp_status == 'ok' and os.path.isdir(lp.text)):
+                if self.selected_path == lp.text and len(self.tracks):
+                    # 스냅샷으로 이미 표시됨 → 파일시스템과 대조하여 바뀐 행만 갱신
+                    self.refresh_grid_list(lp.text, patch=True)
+                else:
+                    self.selected_path = lp.text
+                    self.refresh_grid_list(lp.text)
 
         except Exception as e:
             print(f"Load Config Error: {e}")
@@ -289,7 +3235,7 @@ class MusicTagEditorGUI:
 
         # ── [3] 마지막 선택 드라이브 ─────────────────────────
         try:
-            drv = self.drive_combo.get() if hasattr(self, "drive_combo") else ""
+            drv = self.current_root
             ET.SubElement(root_xml, "last_drive").text = str(drv)
             _log(f"[3] last_drive: {drv}")
         except Exception:
@@ -326,23 +3272,58 @@ class MusicTagEditorGUI:
         except Exception:
             _log(f"[6] sash_right 수집 실패:\n{traceback.format_exc()}")
 
-        # ── [7] XML 파일 기록 ────────────────────────────────
+        # ── [7] 스캔 병렬 설정 ───────────────────────────────
+        try:
+            engine = getattr(self, "scan_engine", None)
+            if engine is not None:
+                ET.SubElement(root_xml, "scan_workers").text = str(self.scan_workers_setting)
+                ET.SubElement(root_xml, "scan_pool").text = self.scan_pool_setting
+                ET.SubElement(root_xml, "scan_mode").text = "tags" if self.scan_tags_only else "full"
+                ET.SubElement(root_xml, "scan_depth").text = "all" if self.scan_depth is None else str(self.scan_depth)
+                ET.SubElement(root_xml, "scan_confirm_limit").text = str(self.scan_confirm_limit)
+                ET.SubElement(root_xml, "write_workers").text = str(self.write_workers)
+                ET.SubElement(root_xml, "tag_padding").text = str(self.padding_policy.reserve)
+                devices_xml = ET.SubElement(root_xml, "scan_devices")
+                for r, (kind, workers) in self.device_profiles.items():
+                    ET.SubElement(devices_xml, "device", root=r, kind=kind, workers=str(workers or 0))
+                _log(f"[7] scan: {engine.workers} x {engine.kind}, mode={'tags' if self.scan_tags_only else 'full'}")
+        except Exception:
+            _log(f"[7] 스캔 설정 수집 실패:\n{traceback.format_exc()}")
+
+        # ── [8] 라이브러리 루트 ──────────────────────────────
+        try:
+            roots_xml = ET.SubElement(root_xml, "library_roots")
+            for r in self.library_roots:
+                ET.SubElement(roots_xml, "root").text = r
+            _log(f"[8] library_roots: {len(self.library_roots)}개")
+        except Exception:
+            _log(f"[8] 라이브러리 루트 수집 실패:\n{traceback.format_exc()}")
+
+        # ── [9] 탐색기 표시 설정 ─────────────────────────────
+        try:
+            ET.SubElement(root_xml, "hide_empty_folders").text = "1" if self.hide_empty_folders else "0"
+            ET.SubElement(root_xml, "show_file_leaves").text = "1" if self.show_file_leaves else "0"
+            _log(f"[9] hide_empty_folders: {self.hide_empty_folders}, show_file_leaves: {self.show_file_leaves}")
+        except Exception:
+            _log(f"[9] 탐색기 설정 수집 실패:\n{traceback.format_exc()}")
+
+        # ── [10] XML 파일 기록 ───────────────────────────────
         try:
             tree = ET.ElementTree(root_xml)
             if hasattr(ET, "indent"):
                 ET.indent(tree, space="  ")
             tree.write(self.config_file, encoding="utf-8", xml_declaration=True)
-            _log(f"[7] 저장 완료: {self.config_file}")
+            _log(f"[10] 저장 완료: {self.config_file}")
         except Exception:
-            _log(f"[7] tree.write 실패:\n{traceback.format_exc()}")
+            _log(f"[10] tree.write 실패:\n{traceback.format_exc()}")
             # 쓰기 권한 없는 경우 홈 디렉토리로 재시도
             try:
                 fallback = os.path.join(os.path.expanduser("~"), "MusicTagEditor_config.xml")
                 tree.write(fallback, encoding="utf-8", xml_declaration=True)
                 self.config_file = fallback
-                _log(f"[7] fallback 저장 성공: {fallback}")
+                _log(f"[10] fallback 저장 성공: {fallback}")
             except Exception:
-                _log(f"[7] fallback 저장도 실패:\n{traceback.format_exc()}")
+                _log(f"[10] fallback 저장도 실패:\n{traceback.format_exc()}")
 
     def on_closing(self):
         """프로그램 종료 처리: config 저장 후 창 파괴.
@@ -359,12 +3340,59 @@ class MusicTagEditorGUI:
             pass
 
         try:
+            self.cancel_scan()
+            self.cancel_write_jobs()
+            if self.write_job is not None and self.write_job.thread is not None:
+                self.write_job.thread.join(timeout=10)  # 저장 중인 파일은 끝까지 쓰고 종료
+            self.save_grid_snapshot()
             self.save_config()
+            self.scan_engine.shutdown()
+            self.info_loader.stop()
+            self.folder_stats.stop()
+            self.watcher.stop()
+            self.dir_probe.shutdown()
+            self.tag_index.close()
         except Exception:
             pass
         finally:
             self.root.destroy()
 
+    def save_grid_snapshot(self):
+        """현재 그리드(selected_path 의 파일 목록)를 표시 순서대로 grid_snapshot.json 에 기록"""
+        try:
+            rows = [[t.path, t.to_data()] for t in self.tracks]
+            with open(self.snapshot_file, "w", encoding="utf-8") as f:
+                json.dump({"version": 2, "root": self.selected_path, "sort": self.current_sort, "rows": rows},
+                          f, ensure_ascii=False)
+        except Exception as e:
+            print(f"Snapshot Save Error: {e}")
+
+    def restore_grid_snapshot(self):
+        """last_path 와 일치하는 스냅샷이 있으면 디스크를 읽지 않고 그리드를 바로 채운다"""
+        restored = 0
+        try:
+            last_path = self.read_config_value("last_path")
+            if last_path and os.path.exists(self.snapshot_file):
+                with open(self.snapshot_file, encoding="utf-8") as f:
+                    snap = json.load(f)
+                if snap.get("version") == 2 and snap.get("root") == last_path:
+                    self.selected_path = last_path
+                    self.current_sort.update(snap.get("sort") or {})
+                    for fp, data in snap.get("rows", []):
+                        self.tracks.add(fp, data)
+                    self.update_sort_headings()
+                    self.file_grid.refresh()
+                    restored = len(self.tracks)
+        except Exception as e:
+            print(f"Snapshot Load Error: {e}")
+
+        self.root.update_idletasks()
+        elapsed_ms = (time.perf_counter() - APP_START) * 1000
+        if restored:
+            self.log(f"스냅샷 표시: {restored}개 파일 (시작 → 첫 화면 {elapsed_ms:.0f} ms)")
+        else:
+            self.log(f"시작 → 첫 화면 {elapsed_ms:.0f} ms")
+
     # --- 개선된 온라인 검색 기능 (팝업 연동) ---
     # MusicTagEditorGUI 클래스 내부의 fetch_online_data 메서드 수정
     def fetch_online_data(self):
@@ -408,8 +3436,7 @@ class MusicTagEditorGUI:
                     # 검색 결과에서 선택된 Release ID로 이미지 다운로드 시도
                     sel = self.file_grid.selection()
                     if sel:
-                        fp = self.full_file_paths.get(sel[0])
-                        self.load_album_art(fp, rel_id)
+                        self.load_album_art(self.tracks.get(sel[0]).path, rel_id)
                     
                     self.log(f"사용자 선택 적용: {alb} | 트랙: {trk} | 연도: {dat}")
 
@@ -444,48 +3471,259 @@ class MusicTagEditorGUI:
         
         self.log(f"정보 수신: {alb_title} | 트랙: {trk_num}")
 
-    def sort_column(self, col, reverse):
+    def on_sort_heading(self, col, extend=False):
+        """헤더 클릭: 같은 컬럼이면 방향 전환, Shift+클릭이면 기존 정렬에 보조 기준으로 추가"""
+        keys = dict(self.sort_keys())
+        self.sort_column(col, not keys[col] if col in keys else False, extend)
+
+    def sort_keys(self):
+        """현재 정렬 기준 [(컬럼, 내림차순 여부), ...] (첫 항목이 1순위)"""
+        if not self.current_sort["col"]:
+            return []
+        return [(self.current_sort["col"], self.current_sort["reverse"])] + \
+            [tuple(k) for k in self.current_sort.get("then", [])]
+
+    def sort_column(self, col, reverse, extend=False):
         # 그리드의 모든 헤더를 클릭했을 때 호출되는 정렬 메서드
-        # 정렬 상태 업데이트
-        self.current_sort["col"] = col
-        self.current_sort["reverse"] = reverse
-        
-        # 모든 헤더에서 기호 제거 및 선택된 헤더에 삼각형 표시
+        # 정렬 상태 업데이트 (extend: 기존 기준을 유지하고 col 을 보조 기준으로 추가/방향 변경)
+        keys = self.sort_keys() if extend else []
+        if any(c == col for c, _ in keys):
+            keys = [(c, reverse if c == col else r) for c, r in keys]
+        else:
+            keys.append((col, reverse))
+        self.current_sort["col"], self.current_sort["reverse"] = keys[0]
+        self.current_sort["then"] = [list(k) for k in keys[1:]]
+
+        t0 = time.perf_counter()
+        self.apply_sort()
+        elapsed_ms = (time.perf_counter() - t0) * 1000
+
+        desc = ", ".join(f"[{c}] {'내림차순' if r else '오름차순'}" for c, r in keys)
+        self.log(f"정렬 완료: {desc} 기준 ({len(self.tracks)}행, {elapsed_ms:.0f} ms)")
+
+    def update_sort_headings(self):
+        """모든 헤더에서 기호 제거 및 정렬 기준 헤더에 삼각형(+다중 정렬 순번) 표시"""
+        keys = self.sort_keys()
+        marks = {c: (" ▼" if r else " ▲") + (str(i + 1) if len(keys) > 1 else "") for i, (c, r) in enumerate(keys)}
         for c in self.cols:
-            header_text = c
-            if c == col:
-                header_text += " ▲" if not reverse else " ▼"
-            self.file_grid.heading(c, text=header_text)
+            self.file_grid.heading(c, text=c + marks.get(c, ""))
 
-        # 현재 그리드의 모든 항목 가져오기 (값, 아이디)
-        l = [(self.file_grid.set(k, col), k) for k in self.file_grid.get_children('')]
-        
-        # 정렬 기준 설정 함수
-        def sort_key(item):
-            val = item[0]
-            # 1. 비트전송률 (예: '320k') 처리
-            if col == "비트전송률":
-                try: return int(re.sub(r'[^0-9]', '', val))
-                except: return 0
-            
-            # 2. 트랙 번호나 연도 등 숫자 데이터 처리
-            if val.isdigit():
-                return int(val)
-            
-            # 3. 일반 문자열 (가수명, 제목 등) - 대소문자 구분 없이 처리
-            return val.lower()
+    def apply_sort(self):
+        """현재 정렬 기준을 모델에 다시 적용 (행 추가·스캔 완료 후에도 호출)
 
-        # 데이터 정렬 실행
-        l.sort(key=sort_key, reverse=reverse)
+        컬럼별 정렬 순위(TrackStore.sort_ranks)는 캐시되고 행 추가·삭제·변경 때도 유지되므로 재정렬은 숫자 비교뿐이다.
+        다중 기준은 마지막 기준부터 안정 정렬(stable sort)을 반복해 적용한다.
+        """
+        keys = self.sort_keys()
+        self.update_sort_headings()
+        if not keys:
+            return
+        if any(GRID_SORT_FIELDS[c] in ('bitrate', 'length') for c, _ in keys):
+            self.load_all_info()
+        order = list(self.tracks.order)
+        for col, reverse in reversed(keys):
+            order.sort(key=self.tracks.sort_ranks(GRID_SORT_FIELDS[col]).__getitem__, reverse=reverse)
+
+        # 정렬된 순서를 한 번에 적용 (가상 그리드이므로 항목별 move 불필요)
+        self.file_grid.reorder(order)
+
+    def _sort_before(self, a, b, keys):
+        """정렬 기준상 Track a 가 b 보다 앞이면 True (같으면 False)"""
+        for col, reverse in keys:
+            field = GRID_SORT_FIELDS[col]
+            ka, kb = a.sort_key(field), b.sort_key(field)
+            if ka != kb:
+                return (ka > kb) if reverse else (ka < kb)
+        return False
+
+    def patch_grid_rows(self, updates):
+        """쓰기 작업이 돌려준 결과로 해당 행만 갱신한다. (폴더 재스캔 없음)
+
+        updates: [(행 id, 새 경로, 바뀐 태그 dict), ...]  dict 는 read_track_info 형식(일부 키만 가능)
+        선택·스크롤 위치는 그대로 두고, 정렬 기준 값이 바뀐 행만 이분 탐색으로 제자리에 옮긴다.
+        """
+        keys = self.sort_keys()
+        fields = [GRID_SORT_FIELDS[c] for c, _ in keys]
+        for rid, new_fp, data in updates:
+            t = self.tracks.get(rid)
+            if t is None:
+                continue
+            old_key = [t.sort_key(f) for f in fields]
+            self.tracks.update(rid, new_fp, data)
+            if keys and old_key != [t.sort_key(f) for f in fields]:
+                self._reposition_sorted_row(rid, keys)
+        self.file_grid.refresh()
 
-        # 정렬된 순서대로 트리뷰 항목 이동
-        for index, (val, k) in enumerate(l):
-            self.file_grid.move(k, '', index)
+    def _reposition_sorted_row(self, iid, keys):
+        """현재 정렬 기준에 맞는 위치로 한 행을 옮긴다 (키 비교는 O(log n) 회, Track 에 캐시된 정렬 키 사용)
 
-        # 다음 클릭 시 반대 방향으로 정렬되도록 헤더 명령 업데이트
-        self.file_grid.heading(col, command=lambda: self.sort_column(col, not reverse))
-        
-        self.log(f"정렬 완료: [{col}] 기준 {'내림차순' if reverse else '오름차순'}")
+        order 사본을 만들지 않고, 이분 탐색 중 행 자신의 자리는 건너뛴다 (i ≥ cur 이면 order[i + 1]).
+        """
+        tracks, order = self.tracks.tracks, self.tracks.order
+        cur = order.index(iid)
+        track = tracks[iid]
+        lo, hi = 0, len(order) - 1
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._sort_before(track, tracks[order[mid if mid < cur else mid + 1]], keys):
+                hi = mid
+            else:
+                lo = mid + 1
+        if lo != cur:
+            self.file_grid.move(iid, '', lo)
+
+    # ── 태그 쓰기 작업 대기열 ────────────────────────────────
+    def submit_write_job(self, job):
+        """TagWriteJob 실행 (다른 쓰기 작업이 진행 중이면 대기열에 넣는다)"""
+        if not job.total and job.collect is None:
+            return
+        if job.limit_for is None:
+            job.limit_for = self.write_limit
+        if self.write_job is not None:
+            self.write_pending.append(job)
+            self.log(f"쓰기 작업 대기: {job.title} ({f'{job.total}개 파일' if job.collect is None else '폴더 전체'}, 앞선 작업 {len(self.write_pending)}개)")
+            return
+        self.write_job = job
+        self.folder_stats.hold('write')
+        self.write_progress.config(value=0, maximum=max(job.total, 1))
+        self.lbl_write_status.config(text=f"{job.title}: 0/{job.total}")
+        self.btn_write_cancel.config(state=tk.NORMAL)
+        self.log(f"--- {job.title} 시작: {f'{job.total}개 파일' if job.collect is None else '대상 파일 찾는 중'} ---")
+        job.start()
+        if self._write_after_id is None:
+            self._write_after_id = self.root.after(50, self._drain_write_queue)
+
+    def cancel_write_jobs(self):
+        """진행 중인 쓰기 작업은 다음 파일 전에 멈추고, 대기 중인 작업은 버린다"""
+        if self.write_pending:
+            self.log(f"대기 중인 쓰기 작업 {len(self.write_pending)}개 취소")
+            self.write_pending.clear()
+        if self.write_job is not None:
+            self.write_job.cancel()
+
+    def _drain_write_queue(self):
+        """쓰기 결과를 파일별로 그리드·로그에 반영하고, 진행률·처리 속도·남은 시간을 표시"""
+        self._write_after_id = None
+        job = self.write_job
+        finished = False
+        updates = []
+        while True:
+            try:
+                kind, src, payload = self.write_queue.get_nowait()
+            except queue.Empty:
+                break
+            if src is not job:
+                continue
+            if kind == 'done':
+                finished = True
+                continue
+            for rid, fp, new_fp, data, error, note in payload:
+                name = os.path.basename(fp)
+                if error is not None:
+                    self.log(f"오류 발생 ({name}): {error}")
+                    continue
+                if note.startswith("파일명"):
+                    self.log(note)  # 이름 변경 메모에는 파일명이 들어 있다
+                else:
+                    self.log(f"{note or '저장 완료'}: {name}")
+                updates.append((rid, new_fp, data))
+        if updates:
+            self.patch_grid_rows(updates)
+        if job is None:
+            return
+
+        eta = job.eta()
+        self.write_progress.config(value=job.done, maximum=max(job.total, 1))
+        self.lbl_write_status.config(
+            text=f"{job.title}: {job.done}/{job.total} ({job.files_per_second():.1f} files/s"
+                 f"{f', 남은 시간 {format_duration(eta)}' if eta is not None and not finished else ''})")
+        if not finished:
+            self._write_after_id = self.root.after(100, self._drain_write_queue)
+            return
+
+        elapsed = time.perf_counter() - job.started_at
+        self.log(f"--- {job.title} {'취소' if job.cancelled else '완료'}: 성공 {job.succeeded}, 실패 {job.failed}"
+                 f"{f', 미처리 {job.total - job.done}' if job.done < job.total else ''} ({elapsed:.1f}초) ---")
+        if job.succeeded:
+            self.log(f"기록량: {format_size(job.bytes_written)} (전체 저장 시 {format_size(job.full_bytes)}), "
+                     f"변경 없어 저장 생략 {job.skipped}개")
+        limited = [f"{root or '?'} {n}" for root, n in job.groups.items() if n < job.workers]
+        if limited:
+            self.log(f"저장 장치별 동시 쓰기 제한: {', '.join(limited)} (전체 {job.workers})")
+        self.write_job = None
+        self.btn_write_cancel.config(state=tk.DISABLED)
+        if job.on_done is not None:
+            job.on_done(job)
+        if self.write_pending:
+            self.submit_write_job(self.write_pending.popleft())
+        else:
+            self.folder_stats.release('write')
+            self.lbl_write_status.config(text=f"{job.title} {'취소' if job.cancelled else '완료'}: "
+                                              f"{job.succeeded}/{job.total} ({elapsed:.1f}초)")
+
+    def toggle_scan_mode(self):
+        self.scan_tags_only = self.var_tags_only.get()
+        mode = "빠른 스캔(태그만, 비트레이트·길이는 나중에 계산)" if self.scan_tags_only else "전체 스캔(스트림 정보 포함)"
+        self.log(f"스캔 모드: {mode} - 다음 폴더 스캔부터 적용")
+
+    def load_visible_info(self):
+        """화면에 보이는 행 중 스트림 정보가 없는 행을 우선 계산하도록 요청 (VirtualGrid 렌더 후 호출)"""
+        rids = self.tracks.rids_without_info(self.file_grid.visible_rows())
+        if rids:
+            self.info_loader.request([(rid, self.tracks.get(rid).path) for rid in rids], urgent=True)
+            self._schedule_info_drain()
+
+    def load_all_info(self):
+        """비트전송률 정렬 시: 스트림 정보가 없는 모든 행을 백그라운드에서 계산하고 끝나면 다시 정렬"""
+        rids = self.tracks.rids_without_info()
+        if not rids:
+            return
+        self.info_loader.request([(rid, self.tracks.get(rid).path) for rid in rids])
+        if not self._resort_after_info:
+            self.log(f"비트레이트·길이 계산 중: {len(rids)}개 (완료 후 다시 정렬)")
+        self._resort_after_info = True
+        self._schedule_info_drain()
+
+    def _schedule_info_drain(self):
+        if self._info_after_id is None:
+            self._info_after_id = self.root.after(100, self._drain_info_queue)
+
+    def _drain_info_queue(self):
+        """StreamInfoLoader 결과를 모델에 반영한다. 작업이 남아 있으면 root.after 로 반복"""
+        self._info_after_id = None
+        changed = False
+        # 비트전송률로 정렬 중이면 값이 채워진 행만 제자리로 (전체 재정렬을 기다리는 중이면 그때 한 번에)
+        keys = [] if self._resort_after_info else self.sort_keys()
+        if not any(GRID_SORT_FIELDS[c] == 'bitrate' for c, _ in keys):
+            keys = []
+        deadline = time.perf_counter() + 0.05
+        while time.perf_counter() < deadline:
+            try:
+                rid, fp, info = self.info_queue.get_nowait()
+            except queue.Empty:
+                break
+            t = self.tracks.get(rid)
+            if t is None or path_key(t.path) != path_key(fp):
+                continue  # 그 사이 삭제되었거나 이름이 바뀐 행
+            if info is None:
+                # 읽기 실패: 0 으로 채워 같은 행을 반복 요청하지 않도록 한다
+                info = {'bitrate': 0, 'length': 0.0, 'sample_rate': 0, 'channels': 0}
+            else:
+                self.tag_index.store_info(fp, info)
+            old_bitrate = t.bitrate
+            self.tracks.update(rid, data=info)
+            if keys and t.bitrate != old_bitrate:
+                self._reposition_sorted_row(rid, keys)
+            changed = True
+        if changed:
+            self.file_grid.refresh()
+
+        if self.info_loader.busy or not self.info_queue.empty():
+            self._schedule_info_drain()
+        elif self._resort_after_info:
+            self._resort_after_info = False
+            self.log("비트레이트·길이 계산 완료 - 다시 정렬합니다")
+            self.apply_sort()
 
     def setup_ui(self):
         self.style = ttk.Style()
@@ -740,40 +3978,29 @@ class MusicTagEditorGUI:
             return
             
         self.log(f"텍스트 파싱 시작: '{src}'")
-        clean = src
         art = self.ent_artist.get().strip()
-        kw = self.ent_keywords.get().strip()
+        keywords = self.filter_keywords()
 
-        # 가수명 제거
-        if art: 
-            clean = re.compile(re.escape(art), re.IGNORECASE).sub(' ', clean)
+        if art:
             self.log(f"가수명('{art}') 제거 수행")
-            
-        # 키워드 제거
-        if kw:
-            for k in kw.split(';'):
-                if k.strip(): 
-                    clean = re.compile(re.escape(k.strip()), re.IGNORECASE).sub(' ', clean)
-                    self.log(f"키워드('{k.strip()}') 제거 수행")
-        
-        # 숫자(트랙번호) 추출 및 제목에서 분리
-        m = re.match(r'^(\d+)([.\s\-_]+)', clean.strip())
-        if m:
-            tr = str(int(m.group(1)))
+        for k in keywords:
+            self.log(f"키워드('{k}') 제거 수행")
+
+        clean, tr = parse_title(src, art, keywords)
+        if tr:
             self.update_field_with_compare(self.ent_track, tr)
-            clean = clean.strip()[len(m.group(0)):].strip()
             self.log(f"트랙번호 '{tr}' 추출 완료")
 
-        # 특수문자 정제
-        #clean = re.sub(r'[^a-zA-Z0-9가-힣\s\(\)\[\]\&\.\']', ' ', clean).strip()
-        clean = regex.sub(r'[^\p{Latin}\p{Hangul}\p{Han}\p{Hiragana}\p{Katakana}\d\s\(\)\[\]\.\&\']', ' ', clean).strip()
-        
         if src != clean:
             self.ent_title.delete(0, tk.END)
             self.ent_title.insert(0, clean)
             self.ent_title.config(fg="#0078D4")
             self.log(f"최종 정제 결과: '{clean}'")
 
+    def filter_keywords(self):
+        """필터링 키워드 입력칸(';' 구분) → 키워드 목록"""
+        return [k.strip() for k in self.ent_keywords.get().split(';') if k.strip()]
+
     def create_control_buttons(self):
         # 1. 상단 일괄 실행 버튼 수정
         # style="Action.TButton"을 추가하고, pady(외부 간격)를 1로 조정합니다.
@@ -795,7 +4022,8 @@ class MusicTagEditorGUI:
             ("📝 제목 파싱", self.advanced_title_parse),
             ("🌐 온라인 검색", self.fetch_online_data),
             ("📅 연도 정리", self.batch_clean_year),
-            ("👤 가수 → 앨범음악가", self.copy_artist_to_albumartist)
+            ("👤 가수 → 앨범음악가", self.copy_artist_to_albumartist),
+            ("🧰 일괄 정리", self.run_fixer_pipeline)
         ]
         
         for i, (t, c) in enumerate(btns):
@@ -805,20 +4033,53 @@ class MusicTagEditorGUI:
 
     def create_grid_area(self):
         g_f = tk.Frame(self.v_paned, bg="white"); self.v_paned.add(g_f, height=550)
-        self.cols = ("파일명", "트랙", "제목", "가수", "앨범음악가","앨범", "연도", "장르", "비트전송률")
-        self.file_grid = ttk.Treeview(g_f, columns=self.cols, show="headings", selectmode="extended")
+
+        # 스캔 진행 표시줄: [진행바 | 상태 텍스트 | 취소 버튼]
+        scan_bar = tk.Frame(g_f, bg="white")
+        scan_bar.pack(side=tk.BOTTOM, fill=tk.X, pady=(2, 0))
+        self.scan_progress = ttk.Progressbar(scan_bar, orient=tk.HORIZONTAL, mode="determinate", length=200)
+        self.scan_progress.pack(side=tk.LEFT, padx=(0, 5))
+        self.lbl_scan_status = tk.Label(scan_bar, text="", font=('Malgun Gothic', 9), bg="white", fg="#666666", anchor="w")
+        self.lbl_scan_status.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.btn_scan_cancel = ttk.Button(scan_bar, text="⏹ 스캔 취소", command=self.cancel_scan, state=tk.DISABLED)
+        self.btn_scan_cancel.pack(side=tk.RIGHT)
+        self.scope_labels = {label: depth for label, depth in SCAN_SCOPES}
+        if self.scan_depth not in self.scope_labels.values():
+            self.scope_labels[f"하위 {self.scan_depth}단계"] = self.scan_depth  # config 에 직접 적은 단계 수
+        self.scope_combo = ttk.Combobox(scan_bar, state="readonly", width=12, values=list(self.scope_labels))
+        self.scope_combo.set(self.scan_scope_label())
+        self.scope_combo.bind("<<ComboboxSelected>>", self.on_scan_scope)
+        self.scope_combo.pack(side=tk.RIGHT, padx=5)
+        tk.Label(scan_bar, text="범위:", font=('Malgun Gothic', 9), bg="white").pack(side=tk.RIGHT)
+        self.var_tags_only = tk.BooleanVar(value=self.scan_tags_only)
+        tk.Checkbutton(scan_bar, text="빠른 스캔(태그만)", variable=self.var_tags_only, command=self.toggle_scan_mode,
+                       font=('Malgun Gothic', 9), bg="white", activebackground="white").pack(side=tk.RIGHT, padx=5)
+        # 쓰기 진행 표시줄: [진행바 | 상태 텍스트 | 취소 버튼]
+        write_bar = tk.Frame(g_f, bg="white")
+        write_bar.pack(side=tk.BOTTOM, fill=tk.X, pady=(2, 0))
+        self.write_progress = ttk.Progressbar(write_bar, orient=tk.HORIZONTAL, mode="determinate", length=200)
+        self.write_progress.pack(side=tk.LEFT, padx=(0, 5))
+        self.lbl_write_status = tk.Label(write_bar, text="", font=('Malgun Gothic', 9), bg="white", fg="#666666", anchor="w")
+        self.lbl_write_status.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.btn_write_cancel = ttk.Button(write_bar, text="⏹ 쓰기 취소", command=self.cancel_write_jobs, state=tk.DISABLED)
+        self.btn_write_cancel.pack(side=tk.RIGHT)
+        self.cols = GRID_COLUMNS
+        # 가상 스크롤 그리드: 화면에 보이는 줄만 실제 항목으로 그린다 (10만 행 이상 대응)
+        self.file_grid = VirtualGrid(g_f, self.cols, self.tracks, bg="white")
         self.file_grid.tag_configure('diff', foreground='#0078D4')
+        # Shift+헤더 클릭: 보조 정렬 기준 추가 (예: 앨범 → 트랙)
+        self.file_grid.heading_extend_command = lambda c: self.on_sort_heading(c, extend=True)
+        # 화면에 보이는 행 중 스트림 정보가 없는 행은 바로 계산
+        self.file_grid.render_command = self.load_visible_info
         for c in self.cols: 
-            self.file_grid.heading(c, text=c, command=lambda _c=c: self.sort_column(_c, False))
+            self.file_grid.heading(c, text=c, command=lambda _c=c: self.on_sort_heading(_c))
             # 열별 너비 및 정렬 설정
             if c == "파일명":
                 self.file_grid.column(c, width=300, anchor="w")
             else:
                 self.file_grid.column(c, width=80, anchor="center")
         self.file_grid.column("파일명", width=300, anchor="w")
-        vsb = ttk.Scrollbar(g_f, orient="vertical", command=self.file_grid.yview)
-        self.file_grid.configure(yscrollcommand=vsb.set)
-        self.file_grid.pack(side=tk.LEFT, fill=tk.BOTH, expand=True); vsb.pack(side=tk.RIGHT, fill=tk.Y)
+        self.file_grid.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         self.file_grid.bind("<<TreeviewSelect>>", self.on_grid_click_or_select)
         self.file_grid.bind("<Button-3>", self.on_grid_right_click)
 
@@ -830,11 +4091,26 @@ class MusicTagEditorGUI:
     def create_left_widgets(self):
         tk.Label(self.left_frame, text="EXPLORER", font=('Malgun Gothic', 10, 'bold'), bg="#F3F3F3").pack(pady=10)
         self.drive_combo = ttk.Combobox(self.left_frame, state="readonly"); self.drive_combo.pack(fill=tk.X, padx=10)
-        self.drive_combo.bind("<<ComboboxSelected>>", self.on_drive_select)
-        self.dir_tree = ttk.Treeview(self.left_frame, selectmode="browse"); self.dir_tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        self.drive_combo.bind("<<ComboboxSelected>>", self.on_root_combo)
+        self.var_hide_empty = tk.BooleanVar(value=self.hide_empty_folders)
+        tk.Checkbutton(self.left_frame, text="음악 없는 폴더 숨기기", variable=self.var_hide_empty, command=self.toggle_hide_empty,
+                       font=('Malgun Gothic', 9), bg="#F3F3F3", activebackground="#F3F3F3").pack(anchor="w", padx=10)
+        self.var_file_leaves = tk.BooleanVar(value=self.show_file_leaves)
+        tk.Checkbutton(self.left_frame, text="파일 표시", variable=self.var_file_leaves, command=self.toggle_file_leaves,
+                       font=('Malgun Gothic', 9), bg="#F3F3F3", activebackground="#F3F3F3").pack(anchor="w", padx=10)
+        # values[0] 은 경로(숨김 컬럼), 나머지는 폴더 배지
+        self.dir_tree = ttk.Treeview(self.left_frame, selectmode="browse", columns=("path", "count", "size", "length"),
+                                     displaycolumns=("count", "size", "length"))
+        self.dir_tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        self.dir_tree.heading("#0", text="폴더", anchor="w")
+        for c, text, width in (("count", "곡", 50), ("size", "크기", 70), ("length", "길이", 70)):
+            self.dir_tree.heading(c, text=text)
+            self.dir_tree.column(c, width=width, anchor="e", stretch=False)
         self.dir_tree.bind("<<TreeviewOpen>>", self.on_dir_open); self.dir_tree.bind("<Double-1>", self.on_dir_double_click); self.dir_tree.bind("<Button-3>", self.on_tree_right_click)
         self.dir_tree.tag_configure('file', foreground='#0078D4') # 파일은 파란색
         self.dir_tree.tag_configure('folder', foreground='#333333') # 폴더는 검정색 
+        self.dir_tree.tag_configure('more', foreground='#888888')
+        self.dir_tree.tag_bind('more', '<Button-1>', self.on_more_click)
 
     def create_context_menus(self):
         self.file_context_menu = tk.Menu(self.root, tearoff=0)
@@ -842,18 +4118,15 @@ class MusicTagEditorGUI:
         self.dir_context_menu = tk.Menu(self.root, tearoff=0)
         self.dir_context_menu.add_command(label="✏️ 이름 바꾸기", command=self.rename_selected_folder)
         self.dir_context_menu.add_command(label="📂 폴더 삭제", command=self.delete_selected_folder)
+        self.dir_context_menu.add_command(label="📌 라이브러리 루트로 등록", command=self.add_library_root)
+        self.dir_context_menu.add_command(label="🧩 MP3 태그 여유 공간 확보", command=self.repad_selected_folder)
 
     def load_drives(self):
-        """드라이브 목록을 로드하고, config에 저장된 마지막 드라이브를 선택한다."""
-        import string
-        from ctypes import windll
-        d = [f"{l}:\\" for l, b in zip(string.ascii_uppercase,
-             bin(windll.kernel32.GetLogicalDrives())[::-1]) if b == '1']
-        self.drive_combo['values'] = d
-        if not d:
-            return
+        """루트 목록(드라이브·마운트 지점·등록 루트)을 만들고, config 의 마지막 루트를 선택한다.
 
-        # config에서 마지막 드라이브 읽기 시도
+        목록 작성은 디스크에 접근하지 않으며, 각 루트의 응답 여부는 RootProbe 가 백그라운드에서
+        확인한다. 느리거나 끊긴 네트워크 마운트가 있어도 시작이 멈추지 않는다.
+        """
         saved_drive = ""
         try:
             if os.path.exists(self.config_file):
@@ -861,45 +4134,389 @@ class MusicTagEditorGUI:
                 ld = xml_root.find("last_drive")
                 if ld is not None and ld.text:
                     saved_drive = ld.text.strip()
+                self.library_roots = [e.text.strip() for e in xml_root.findall("library_roots/root") if e.text]
         except Exception:
             pass
 
-        # 저장된 드라이브가 현재 드라이브 목록에 있으면 선택, 없으면 첫 번째
-        if saved_drive in d:
-            self.drive_combo.set(saved_drive)
-        else:
-            self.drive_combo.current(0)
+        self.roots = enumerate_roots(self.library_roots)
+        if not self.roots:
+            return
+        self.root_probe.probe(self.roots)
 
+        # 저장된 루트가 현재 목록에 있으면 선택, 없으면 첫 번째
+        self.current_root = saved_drive if saved_drive in self.roots else self.roots[0]
+        self.update_root_labels()
         self.on_drive_select(None)
+        self._schedule_root_drain()
+
+    def update_root_labels(self):
+        """콤보박스에 루트별 상태(확인 중 / 응답 없음 / 사용 불가)를 표시"""
+        suffix = {'pending': " (확인 중…)", 'timeout': " (응답 없음)", 'error': " (사용 불가)"}
+        self.root_labels = {}
+        current_label = ""
+        for r in self.roots:
+            label = r + suffix.get(self.root_probe.status.get(r), "")
+            self.root_labels[label] = r
+            if r == self.current_root:
+                current_label = label
+        self.drive_combo['values'] = list(self.root_labels)
+        if current_label:
+            self.drive_combo.set(current_label)
+
+    def root_status(self, path):
+        """path 를 포함하는 가장 깊은 루트의 확인 상태 ('ok' / 'pending' / 'timeout' / 'error'). 루트 밖이면 'ok'"""
+        key = path_key(path)
+        best = None
+        for r in self.roots:
+            rk = path_key(r)
+            if (key == rk or key.startswith(os.path.join(rk, ""))) and (best is None or len(rk) > len(path_key(best))):
+                best = r
+        return self.root_probe.status.get(best, 'ok') if best else 'ok'
+
+    def _schedule_root_drain(self, delay=100):
+        if self._root_after_id is None:
+            self._root_after_id = self.root.after(delay, self._drain_root_queue)
+
+    def _drain_root_queue(self):
+        """루트 확인 결과 반영. 응답 없는 루트가 남아 있으면 늦은 응답을 기다리며 천천히 반복"""
+        self._root_after_id = None
+        changed = False
+        while True:
+            try:
+                root, ok = self.root_queue.get_nowait()
+            except queue.Empty:
+                break
+            self.root_probe.status[root] = 'ok' if ok else 'error'
+            changed = True
+        expired = self.root_probe.expire()
+        for r in expired:
+            self.log(f"루트 응답 없음 ({self.root_probe.timeout:.0f}초 초과): {r}")
+        if changed or expired:
+            self.update_root_labels()
+            ready = self._select_when_ready
+            if ready and self.root_probe.status.get(ready) != 'pending':
+                self.on_drive_select(None)
+
+        if self.root_probe.pending:
+            self._schedule_root_drain()
+        elif 'timeout' in self.root_probe.status.values():
+            self._schedule_root_drain(1000)
+
+    def on_root_combo(self, event):
+        label = self.drive_combo.get()
+        self.current_root = self.root_labels.get(label, label)
+        self.on_drive_select(event)
+
+    def add_library_root(self):
+        """탐색기에서 선택한 폴더를 라이브러리 루트로 등록 (config.xml 에 저장)"""
+        item = self.dir_tree.selection()
+        if not item:
+            return
+        values = self.dir_tree.item(item[0], "values")
+        if not values or values[0] in self.roots:
+            return
+        path = values[0]
+        self.library_roots.append(path)
+        self.roots = enumerate_roots(self.library_roots)
+        self.root_probe.probe([path])
+        self.update_root_labels()
+        self._schedule_root_drain()
+        self.log(f"라이브러리 루트 등록: {path}")
 
     def on_drive_select(self, event):
-        d = self.drive_combo.get(); self.dir_tree.delete(*self.dir_tree.get_children())
-        self.insert_nodes(self.dir_tree.insert("", "end", text=d, values=[d]), d)
+        d = self.current_root; self.dir_tree.delete(*self.dir_tree.get_children())
+        self.dir_probe.cancel()
+        self.folder_stats.clear()
+        self._node_listing.clear()
+        self.node_by_path.clear()
+        self._folder_counts.clear()
+        self._detached.clear()
+        self._file_limit.clear()
+        self._more_nodes.clear()
+        if not d:
+            return
+
+        # 아직 확인 중이거나 응답이 없던 루트는 목록을 읽지 않는다 (UI 멈춤 방지)
+        status = self.root_probe.status.get(d, 'ok')
+        if status != 'ok':
+            if status != 'pending':
+                self.log(f"루트에 접근할 수 없습니다: {d} - 다시 확인합니다")
+                self.root_probe.probe([d])
+                self.update_root_labels()
+                self._schedule_root_drain()
+            self._select_when_ready = d
+            self.dir_tree.insert("", "end", text=f"{d} (확인 중…)")
+            return
+        self._select_when_ready = None
+
+        root_node = self.dir_tree.insert("", "end", text=d, values=[d])
+        self.node_by_path[path_key(d)] = root_node
+        self.track_folder_stats([(root_node, d)])
+        self.insert_nodes(root_node, d)
+
+        # 루트 확인을 기다리던 last_folder 복구
+        if self._pending_focus and self.focus_and_expand_path(self._pending_focus):
+            self.log(f"마지막 폴더 복구: {self._pending_focus}")
+            self._pending_focus = None
         
-    def insert_nodes(self, p, path):
+    def insert_nodes(self, p, path, entries=None):
+        """path 의 하위 폴더·음악 파일 노드를 p 아래에 만든다. (목록은 dir_cache 사용)
+
+        폴더의 펼침 표시(+)는 DirChildProbe 가 백그라운드에서 확인한 뒤 _drain_probe_queue 에서 붙인다.
+        폴더 배지는 저장된 집계로 바로 채우고, 갱신은 FolderStatsWorker 에 맡긴다.
+        파일 노드는 EXPLORER_FILE_PAGE 개까지만 만들고 나머지는 '더 보기' 노드로 남긴다.
+        """
+        folders = []
         try:
-            for n in sorted(os.listdir(path)):
-                fp = os.path.join(path, n)
+            if entries is None:
+                entries = self.dir_cache.list(path)
+            self._node_listing[p] = entries
+            for n, fp, kind in self._visible_entries(p, entries):
                 # 폴더인 경우
-                if os.path.isdir(fp):
+                if kind != 'file':
                     node = self.dir_tree.insert(p, "end", text=n, values=[fp], tags=('folder',))
-                    # 하위 항목이 있는지 확인 (더하기 기호 표시용)
-                    try:
-                        if os.listdir(fp): self.dir_tree.insert(node, "end")
-                    except: pass
+                    self.node_by_path[path_key(fp)] = node
+                    folders.append((node, fp))
                 # 음악 파일인 경우 (추가된 로직)
-                elif n.lower().endswith(self.supported_ext):
+                else:
                     self.dir_tree.insert(p, "end", text=n, values=[fp], tags=('file',))
+            self._update_more_node(p, entries)
         except Exception as e:
             self.log(f"탐색기 로드 오류: {e}")
+        if folders:
+            self.dir_probe.submit(folders)
+            self._schedule_probe_drain()
+            self.track_folder_stats(folders)
+            self._apply_empty_visibility(p)
+
+    def _schedule_probe_drain(self):
+        if self._probe_after_id is None:
+            self._probe_after_id = self.root.after(30, self._drain_probe_queue)
+
+    def _drain_probe_queue(self):
+        """하위 항목이 있는 폴더 노드에 빈 자식(펼침 표시용)을 붙인다"""
+        self._probe_after_id = None
+        while True:
+            try:
+                gen, results = self.probe_queue.get_nowait()
+            except queue.Empty:
+                break
+            if gen != self.dir_probe.generation:
+                continue
+            for node, has_children in results:
+                # 이미 펼쳐서 하위 목록을 채운 노드는 건드리지 않는다
+                if has_children and self.dir_tree.exists(node) and not self.dir_tree.get_children(node):
+                    self.dir_tree.insert(node, "end")
+        if self.dir_probe.busy or not self.probe_queue.empty():
+            self._schedule_probe_drain()
         
     def on_dir_open(self, event):
         n = self.dir_tree.focus(); p = self.dir_tree.item(n, "values")[0]
-        self.dir_tree.delete(*self.dir_tree.get_children(n)); self.insert_nodes(n, p)
+        self.populate_node(n, p)
+
+    def populate_node(self, node, path):
+        """노드의 하위 목록을 채운다. 폴더 내용이 그대로면(캐시된 같은 목록) 기존 노드를 유지"""
+        try:
+            entries = self.dir_cache.list(path)
+        except OSError as e:
+            self.log(f"탐색기 로드 오류: {e}")
+            return
+        children = self.dir_tree.get_children(node)
+        previous = self._node_listing.get(node)
+        if (children or node in self._detached.values()) and previous is entries:
+            return
+        if previous is None:
+            # 처음 펼침: 펼침 표시용 빈 자식을 지우고 새로 채운다
+            self._forget_nodes(children)
+            self.dir_tree.delete(*children)
+            self.insert_nodes(node, path, entries)
+            return
+        self._sync_children(node, entries)
+
+    def _sync_children(self, node, entries):
+        """이미 채운 노드: 바뀐 항목만 추가/삭제하여 하위 노드의 펼침 상태를 유지"""
+        for child in [c for c, parent in self._detached.items() if parent == node]:
+            del self._detached[child]
+            self.dir_tree.move(child, node, "end")
+        children = self.dir_tree.get_children(node)
+        existing = {}
+        for child in children:
+            values = self.dir_tree.item(child, "values")
+            if values:
+                existing[path_key(values[0])] = child
+        visible = self._visible_entries(node, entries)
+        wanted = {path_key(fp) for _, fp, _ in visible}
+        gone = [child for key, child in existing.items() if key not in wanted]
+        self._forget_nodes(gone)
+        self.dir_tree.delete(*gone)
+        folders = []
+        for i, (n, fp, kind) in enumerate(visible):
+            child = existing.get(path_key(fp))
+            if child is None:
+                tag = 'file' if kind == 'file' else 'folder'
+                child = self.dir_tree.insert(node, i, text=n, values=[fp], tags=(tag,))
+                if kind != 'file':
+                    self.node_by_path[path_key(fp)] = child
+                    folders.append((child, fp))
+            elif self.dir_tree.index(child) != i:
+                self.dir_tree.move(child, node, i)
+        self._node_listing[node] = entries
+        self._update_more_node(node, entries)
+        if folders:
+            self.dir_probe.submit(folders)
+            self._schedule_probe_drain()
+            self.track_folder_stats(folders)
+        self._apply_empty_visibility(node)
+
+    # ── 파일 노드 페이지 ('더 보기') ───────────────────────
+    def _visible_entries(self, node, entries):
+        """entries 중 노드로 만들 항목. 파일은 표시 한도까지만 (파일 표시를 끄면 폴더만)"""
+        limit = self._file_limit.get(node, EXPLORER_FILE_PAGE) if self.show_file_leaves else 0
+        visible = []
+        for entry in entries:
+            if entry[2] == 'file':
+                if limit <= 0:
+                    continue
+                limit -= 1
+            visible.append(entry)
+        return visible
+
+    def _update_more_node(self, node, entries):
+        """표시하지 않은 파일이 남아 있으면 node 끝에 '더 보기' 노드를 두고, 없으면 지운다"""
+        remaining = 0
+        if self.show_file_leaves:
+            remaining = sum(1 for e in entries if e[2] == 'file') - self._file_limit.get(node, EXPLORER_FILE_PAGE)
+        more = self._more_nodes.get(node)
+        if remaining > 0:
+            text = f"… 파일 {min(remaining, EXPLORER_FILE_PAGE):,}개 더 보기 (남은 {remaining:,}개)"
+            if more is None:
+                self._more_nodes[node] = self.dir_tree.insert(node, "end", text=text, tags=('more',))
+            else:
+                self.dir_tree.item(more, text=text)
+                self.dir_tree.move(more, node, "end")
+        elif more is not None:
+            del self._more_nodes[node]
+            self.dir_tree.delete(more)
+
+    def on_more_click(self, event):
+        more = self.dir_tree.identify_row(event.y)
+        parent = self.dir_tree.parent(more) if more else ""
+        if self._more_nodes.get(parent) != more or parent not in self._node_listing:
+            return
+        self._file_limit[parent] = self._file_limit.get(parent, EXPLORER_FILE_PAGE) + EXPLORER_FILE_PAGE
+        self._sync_children(parent, self._node_listing[parent])
+        return "break"  # '더 보기' 노드는 선택하지 않는다
+
+    def toggle_file_leaves(self):
+        self.show_file_leaves = self.var_file_leaves.get()
+        for node, entries in list(self._node_listing.items()):
+            if self.dir_tree.exists(node):
+                self._sync_children(node, entries)
+        self.log(f"탐색기 파일 {'표시' if self.show_file_leaves else '숨기기'}")
+
+    def _forget_nodes(self, nodes):
+        """삭제될 노드(와 하위 노드)를 경로 색인에서 제거"""
+        for node in nodes:
+            values = self.dir_tree.item(node, "values")
+            if values:
+                key = path_key(values[0])
+                if self.node_by_path.get(key) == node:
+                    del self.node_by_path[key]
+            self._node_listing.pop(node, None)
+            self._folder_counts.pop(node, None)
+            self._file_limit.pop(node, None)
+            self._more_nodes.pop(node, None)
+            for child in [c for c, parent in self._detached.items() if parent == node]:
+                del self._detached[child]
+                self._forget_nodes((child,))
+                self.dir_tree.delete(child)  # 숨긴 노드는 부모를 지워도 함께 지워지지 않는다
+            self._forget_nodes(self.dir_tree.get_children(node))
+
+    # ── 폴더 배지 (하위 전체 곡 수·크기·길이) ───────────────
+    def track_folder_stats(self, folders):
+        """[(노드 id, 경로), ...] 에 저장된 집계를 바로 표시하고, 백그라운드 확인을 요청"""
+        for node, fp in folders:
+            self.show_folder_badge(node, fp)
+        self.folder_stats.request([fp for _, fp in folders])
+        self._schedule_stats_drain()
+
+    def show_folder_badge(self, node, path):
+        """색인의 폴더 집계로 노드 배지를 채운다. 하위 전체 곡 수 (집계가 없으면 None)"""
+        totals = self.tag_index.folder_totals(path)
+        if totals is None:
+            return None
+        count, size, length = totals
+        self.dir_tree.item(node, values=[path, f"{count:,}", format_size(size), format_duration(length)])
+        self._folder_counts[node] = count
+        return count
+
+    def update_folder_badges(self, paths):
+        """paths 와 그 상위 폴더 중 트리에 있는 노드의 배지를 다시 계산하고 숨김 상태를 맞춘다"""
+        keys = set()
+        for p in paths:
+            key = path_key(p)
+            while key not in keys:
+                keys.add(key)
+                parent = os.path.dirname(key)
+                if parent == key:
+                    break
+                key = parent
+        parents = set()
+        for key in keys:
+            node = self.node_by_path.get(key)
+            if node is None or not self.dir_tree.exists(node):
+                continue
+            if self.show_folder_badge(node, self.dir_tree.item(node, "values")[0]) is not None:
+                parents.add(self._detached.get(node) or self.dir_tree.parent(node))
+        for parent in parents:
+            if parent in self._node_listing:
+                self._apply_empty_visibility(parent)
+
+    def _schedule_stats_drain(self):
+        if self._stats_after_id is None:
+            self._stats_after_id = self.root.after(200, self._drain_stats_queue)
+
+    def _drain_stats_queue(self):
+        self._stats_after_id = None
+        updated = []
+        while True:
+            try:
+                updated.extend(self.stats_queue.get_nowait())
+            except queue.Empty:
+                break
+        if updated:
+            self.update_folder_badges(updated)
+        if self.folder_stats.busy or not self.stats_queue.empty():
+            self._schedule_stats_drain()
+
+    def _apply_empty_visibility(self, node):
+        """node 의 하위 폴더 중 음악이 없는(곡 수 0) 폴더를 옵션에 따라 숨기거나 다시 보인다"""
+        hidden = [c for c, parent in self._detached.items() if parent == node]
+        if hidden:
+            for child in hidden:
+                del self._detached[child]
+            order = {path_key(fp): i for i, (_, fp, _) in enumerate(self._node_listing.get(node, ()))}
+
+            def position(child):
+                values = self.dir_tree.item(child, "values")
+                return order.get(path_key(values[0]), -1) if values else len(order)  # '더 보기'는 맨 끝
+            self.dir_tree.set_children(node, *sorted(self.dir_tree.get_children(node) + tuple(hidden), key=position))
+        if self.var_hide_empty.get():
+            for child in self.dir_tree.get_children(node):
+                if self._folder_counts.get(child) == 0:
+                    self.dir_tree.detach(child)
+                    self._detached[child] = node
+
+    def toggle_hide_empty(self):
+        self.hide_empty_folders = self.var_hide_empty.get()
+        for node in list(self._node_listing):
+            if self.dir_tree.exists(node):
+                self._apply_empty_visibility(node)
+        self.log(f"음악 없는 폴더 {'숨기기' if self.hide_empty_folders else '표시'}")
       
     def on_dir_double_click(self, event):
         n = self.dir_tree.identify_row(event.y)
-        if not n: return
+        if not n or not self.dir_tree.item(n, "values"): return  # '더 보기' 노드
         
         path = self.dir_tree.item(n, "values")[0]
         
@@ -914,65 +4531,294 @@ class MusicTagEditorGUI:
 
     def add_single_file_to_grid(self, fp):
         """단일 파일 정보를 그리드에 한 줄 추가하는 메서드"""
+        self.cancel_scan()
+        self.watcher.stop()  # 폴더 전체가 아닌 파일 하나만 표시하므로 감시하지 않음
         self.file_grid.delete(*self.file_grid.get_children())
-        self.full_file_paths.clear()
         
         try:
-            f = os.path.basename(fp)
-            audio = mutagen.File(fp, easy=True)
-            info = mutagen.File(fp).info
-            
-            # --- 트랙 번호 처리 로직 수정 ---
-            raw_track = audio.get('tracknumber', ['-'])[0]
-            clean_track = raw_track.split('/')[0] if '/' in raw_track else raw_track
-            # ------------------------------
-            
-            v = (
-                f, 
-                clean_track,
-                audio.get('title', ['-'])[0], 
-                audio.get('artist', ['-'])[0], 
-                audio.get('albumartist', ['-'])[0], 
-                audio.get('album', ['-'])[0], 
-                audio.get('date', ['-'])[0], 
-                audio.get('genre', ['-'])[0], 
-                f"{int(info.bitrate/1000)}k"
-            )
-            item_id = self.file_grid.insert("", "end", values=v)
-            self.full_file_paths[item_id] = fp
+            # 태그와 스트림 정보를 한 번의 파싱으로 읽는다
+            data = read_track_info(fp)
+            if data is None:
+                raise ValueError("지원하지 않는 오디오 형식")
+            item_id = self.tracks.add(fp, data)
             # 추가 후 즉시 선택 상태로 만들어 입력창에 반영
             self.file_grid.selection_set(item_id)
             
             # [수정] 소팅 조건 적용
-            if self.current_sort["col"]:
-                self.sort_column(self.current_sort["col"], self.current_sort["reverse"])
+            self.apply_sort()
 
         except Exception as e:
             self.log(f"파일 정보 로드 실패: {e}")
     
-    def refresh_grid_list(self, path):
-        self.file_grid.delete(*self.file_grid.get_children()); 
-        self.full_file_paths.clear()
-        
-        for r, _, files in os.walk(path):
-            for f in sorted(files):
-                if f.lower().endswith(self.supported_ext):
-                    fp = os.path.join(r, f)
-                    try:
-                        a = mutagen.File(fp, easy=True); 
-                        info = mutagen.File(fp).info
-                        # --- 트랙 번호 처리 로직 수정 ---
-                        raw_track = a.get('tracknumber', ['-'])[0]
-                        clean_track = raw_track.split('/')[0] if '/' in raw_track else raw_track
-                        # ------------------------------
-                        v = (f, clean_track, a.get('title', ['-'])[0], a.get('artist', ['-'])[0], a.get('albumartist', ['-'])[0],a.get('album', ['-'])[0], a.get('date', ['-'])[0], a.get('genre', ['-'])[0], f"{int(info.bitrate/1000)}k")
-                        self.full_file_paths[self.file_grid.insert("", "end", values=v)] = fp
-                    except: pass
-                    
+    def scan_scope_label(self):
+        return next(label for label, depth in self.scope_labels.items() if depth == self.scan_depth)
+
+    def on_scan_scope(self, event=None):
+        self.scan_depth = self.scope_labels.get(self.scope_combo.get(), None)
+        self.log(f"스캔 범위: {self.scan_scope_label()} (다음 폴더 스캔부터 적용)")
+
+    def ask_large_scan(self, path, count, estimated):
+        """파일 수가 scan_confirm_limit 를 넘는 스캔을 계속할지 묻는다"""
+        return messagebox.askyesno(
+            "대량 스캔 확인",
+            f"{path}\n\n{'약 ' if estimated else ''}{count:,}개 파일을 스캔합니다. (범위: {self.scan_scope_label()})\n"
+            f"시간이 오래 걸릴 수 있습니다. 계속하시겠습니까?")
+
+    def refresh_grid_list(self, path, patch=False):
+        """path 이하(스캔 범위 단계까지) 음악 파일을 백그라운드에서 스캔하여 그리드를 다시 채운다.
+
+        실행 중인 이전 스캔은 취소되며, 파싱 결과는 묶음 단위로 scan_queue 를 거쳐
+        _drain_scan_queue() 에서 그리드에 삽입된다. (UI 스레드는 블록되지 않음)
+        patch=True 이면 그리드를 비우지 않고 기존 행과 대조하여 바뀐 행만 고치고,
+        새 파일은 추가, 사라진 파일은 스캔 완료 시 제거한다.
+        파일 수가 scan_confirm_limit 를 넘으면 파싱 전에 확인을 받는다. 색인의 폴더 집계로 먼저 추정하고,
+        집계가 없으면 작업이 파일 목록을 모은 뒤 'confirm' 으로 묻는다. (patch 는 묻지 않음)
+        """
+        confirm_limit = self.scan_confirm_limit if self.scan_confirm_limit > 0 and not patch else None
+        if confirm_limit is not None:
+            estimate = self.tag_index.folder_count(path, self.scan_depth)
+            if estimate is not None and estimate > confirm_limit:
+                if not self.ask_large_scan(path, estimate, estimated=True):
+                    self.log(f"스캔 취소: {path} (약 {estimate:,}개 파일)")
+                    return
+                confirm_limit = None  # 이미 확인함
+
+        self.cancel_scan()
+        if patch:
+            self._patch_rows = dict(self.tracks.by_path)
+        else:
+            self._patch_rows = None
+            self.file_grid.delete(*self.file_grid.get_children())
+
+        self.info_loader.clear()
+        device, io_workers = self.scan_profile(path)
+        job = FolderScanJob(path, self.supported_ext, self.scan_queue, self.scan_engine, self.tag_index,
+                            tags_only=self.scan_tags_only, dir_cache=self.dir_cache, max_depth=self.scan_depth,
+                            confirm_limit=confirm_limit, io_workers=io_workers, inode_order=device == 'hdd')
+        if io_workers and io_workers < self.scan_engine.workers:
+            self.log(f"스캔 장치: {device} - 동시 읽기 {io_workers}개{', inode 순서' if job.inode_order else ''}")
+        self.scan_job = job
+        self.folder_stats.hold('scan')   # 배지 집계는 스캔이 끝난 뒤에 (같은 디스크를 다투지 않도록)
+        self.scan_progress.config(value=0, maximum=1)
+        self.lbl_scan_status.config(text="파일 목록 수집 중...")
+        self.btn_scan_cancel.config(state=tk.NORMAL)
+        job.start()
+        self._schedule_scan_drain()
+        self.watcher.start(path, self.scan_depth)
+        self._schedule_fs_drain()
+
+    def _schedule_scan_drain(self):
+        """큐 비우기 루프가 항상 하나만 돌도록 예약을 교체한다"""
+        if self._scan_after_id is not None:
+            self.root.after_cancel(self._scan_after_id)
+        self._scan_after_id = self.root.after(50, self._drain_scan_queue)
+
+    def cancel_scan(self):
+        """진행 중인 폴더 스캔을 취소 (워커는 다음 파일 처리 전에 종료)"""
+        job = self.scan_job
+        if job is not None and not job.cancelled:
+            job.cancel()
+            self.log(f"스캔 취소: {job.path} ({job.parsed}/{job.total})")
+        self.scan_job = None
+        self.folder_stats.release('scan')
+        self._patch_rows = None
+        if hasattr(self, "btn_scan_cancel"):
+            self.btn_scan_cancel.config(state=tk.DISABLED)
+            self.lbl_scan_status.config(text="")
+            self.scan_progress.config(value=0)
+
+    def _drain_scan_queue(self):
+        """scan_queue 에 쌓인 결과를 그리드에 반영한다. 스캔 중에는 root.after 로 반복 호출"""
+        self._scan_after_id = None
+        job = self.scan_job
+        finished = False
+        deadline = time.perf_counter() + 0.05  # 한 번에 UI 를 오래 점유하지 않도록 제한
+        while time.perf_counter() < deadline:
+            try:
+                kind, src, payload = self.scan_queue.get_nowait()
+            except queue.Empty:
+                break
+            if src is not job:
+                continue  # 취소된 이전 스캔의 잔여 메시지
+            if kind == 'total':
+                self.scan_progress.config(maximum=max(payload, 1))
+            elif kind == 'confirm':
+                if self.ask_large_scan(job.path, payload, estimated=False):
+                    job.confirm(True)
+                else:
+                    self.cancel_scan()
+                    break
+            elif kind == 'names':
+                # 빠른 스캔: 파일명만 있는 행을 먼저 올리고, 태그가 도착하면 같은 행을 채운다
+                if self._patch_rows is None:
+                    self._patch_rows = {}
+                for fp in payload:
+                    key = path_key(fp)
+                    if key not in self.tracks.by_path:
+                        rid = self.tracks.add(fp, {})
+                        self._patch_rows[key] = rid
+                        job.placeholders.add(rid)
+                self.file_grid.refresh()
+            elif kind == 'rows':
+                for fp, data in payload:
+                    rid = self._patch_rows.pop(path_key(fp), None) if self._patch_rows is not None else None
+                    if rid is None:
+                        self.tracks.add(fp, data)
+                    elif rid in job.placeholders:
+                        job.placeholders.discard(rid)
+                        self.tracks.update(rid, fp, data)
+                    else:
+                        before = self.tracks.get(rid).display_values()
+                        if self.tracks.update(rid, fp, data).display_values() != before:
+                            job.patched += 1
+                self.file_grid.refresh()
+            elif kind == 'done':
+                finished = True
+
+        if job is None or job is not self.scan_job:
+            return
+
+        self.scan_progress.config(value=job.parsed)
+        self.lbl_scan_status.config(
+            text=f"스캔 중: {job.parsed}/{job.total} ({job.files_per_second():.0f} files/s)")
+
+        if not finished:
+            self._schedule_scan_drain()
+            return
+
+        # 스캔 완료
+        self.scan_job = None
+        self.folder_stats.release('scan')
+        self.btn_scan_cancel.config(state=tk.DISABLED)
+        if self._patch_rows is not None and not job.cancelled:
+            # 검증 스캔에서 다시 보이지 않은 행 = 삭제/이동된 파일 (빠른 스캔에서는 인식 불가 파일 포함)
+            self.file_grid.delete(*self._patch_rows.values())
+            self.log(f"목록 대조: {job.patched}개 갱신, {len(self._patch_rows)}개 제거")
+        self._patch_rows = None
+        elapsed = time.perf_counter() - job.started_at
+        self.lbl_scan_status.config(
+            text=f"스캔 완료: {len(self.tracks)}개 ({elapsed:.1f}초, {job.files_per_second():.0f} files/s)")
+        self.log(f"폴더 스캔 완료: {job.path} - {len(self.tracks)}개 파일 "
+                 f"(색인 재사용 {job.cached}개), {elapsed:.1f}초")
+        if not job.cancelled and not job.tags_only:
+            self.update_folder_badges(job.dirs or [job.path])  # 스캔이 저장한 폴더 집계 반영
+
         # [수정] 데이터 로드 후 기존 소팅 조건이 있다면 재적용
-        if self.current_sort["col"]:
-            self.sort_column(self.current_sort["col"], self.current_sort["reverse"]) 
-                    
+        self.apply_sort()
+
+    def _schedule_fs_drain(self):
+        if self._fs_after_id is None:
+            self._fs_after_id = self.root.after(300, self._drain_fs_queue)
+
+    def _drain_fs_queue(self):
+        """FolderWatcher 가 보낸 변경 묶음을 반영. 스캔 중에는 스캔이 끝날 때까지 보류한다"""
+        self._fs_after_id = None
+        if self.watcher.root is None:
+            return
+        if self.scan_job is None:
+            while True:
+                try:
+                    src, root, changes = self.fs_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if src is self.watcher and root == self.watcher.root:
+                    self.apply_fs_changes(changes)
+        self._schedule_fs_drain()
+
+    def apply_fs_changes(self, changes):
+        """외부 변경(추가·삭제·이름 변경·수정)을 그리드 행과 탐색기 노드에 증분 반영한다"""
+        added = updated = renamed = 0
+        dirty = []   # 정렬 위치를 다시 잡을 행
+        gone = set()   # 지울 행 (끝에 VirtualGrid.delete 한 번으로)
+        moved_dirs = []   # 이 묶음에서 반영한 폴더 이름 변경 (옛 폴더, 새 폴더)
+        touched = set()   # 폴더 집계를 다시 계산할 폴더
+        for change in changes:
+            kind = change[0]
+            if kind == 'notice':
+                self.log(f"폴더 감시: {change[1]}")
+                continue
+            if kind == 'rescan':
+                self.log("폴더 감시: 변경 이벤트 유실 - 목록을 다시 대조합니다")
+                self.refresh_grid_list(self.selected_path, patch=True)
+                return
+            if kind == 'rename_dir':
+                _, old, new = change
+                node = self.node_by_path.get(path_key(old))
+                if node is not None:
+                    self.dir_tree.item(node, text=os.path.basename(new))
+                    self._rebase_nodes(node, old, new)
+                renamed += self.tracks.rename_tree(old, new)
+                self.tag_index.rename_tree(old, new)
+                moved_dirs.append((old, new))
+                continue
+            if kind == 'rename':
+                _, old, new, data = change
+                if self.tracks.find(old) is None:
+                    # 이 묶음에서 먼저 반영한 폴더 이름 변경으로 행이 이미 옮겨졌을 수 있다
+                    for moved_from, moved_to in moved_dirs:
+                        old = rebase_path(old, moved_from, moved_to) or old
+                self.tag_index.rename(old, new)
+                touched.update((os.path.dirname(old), os.path.dirname(new)))
+                rid = self.tracks.find(old) or self.tracks.find(new)
+                if data is None:
+                    if rid is not None:
+                        gone.add(rid)
+                elif rid is not None:
+                    t = self.tracks.get(rid)
+                    before = (t.path, t.display_values())
+                    self.tracks.update(rid, new, data)
+                    if (t.path, t.display_values()) != before:  # 이 프로그램이 직접 바꾼 경우는 이미 반영됨
+                        dirty.append(rid)
+                        renamed += 1
+                else:
+                    dirty.append(self.tracks.add(new, data))
+                    added += 1
+            elif kind == 'rmtree':
+                folder = change[1]
+                gone.update(t.rid for t in self.tracks if rebase_path(t.path, folder, folder) is not None)
+                self.tag_index.remove_tree(folder)
+                touched.add(os.path.dirname(folder))
+            elif kind == 'file':
+                _, fp, data = change
+                touched.add(os.path.dirname(fp))
+                rid = self.tracks.find(fp)
+                if data is None:
+                    if rid is not None:
+                        gone.add(rid)
+                    self.tag_index.remove(fp)
+                    continue
+                self.tag_index.store(fp, data)
+                if rid is None:
+                    dirty.append(self.tracks.add(fp, data))
+                    added += 1
+                else:
+                    gone.discard(rid)   # 지운 폴더가 같은 묶음 안에서 다시 생긴 경우
+                    before = self.tracks.get(rid).display_values()
+                    if self.tracks.update(rid, None, data).display_values() != before:
+                        dirty.append(rid)
+                        updated += 1
+            elif kind == 'dir':
+                touched.add(change[1])
+                node = self.node_by_path.get(path_key(change[1]))
+                if node is not None and node in self._node_listing:
+                    self.populate_node(node, change[1])
+
+        removed = len(gone)
+        if gone:
+            self.file_grid.delete(*gone)
+        if touched:
+            self.folder_stats.request(touched, force=True)
+            self._schedule_stats_drain()
+
+        keys = self.sort_keys()
+        if keys:
+            for rid in dirty:
+                if self.tracks.contains(rid):
+                    self._reposition_sorted_row(rid, keys)
+        self.file_grid.refresh()
+        if added or updated or renamed or removed:
+            self.log(f"폴더 변경 반영: 추가 {added}, 갱신 {updated}, 이름 변경 {renamed}, 삭제 {removed}")
+
     def set_null_value(self, target_entry): target_entry.delete(0, tk.END); target_entry.insert(0, "Null"); target_entry.config(fg="#D13438")
     
     def update_field_with_compare(self, ew, nv):
@@ -987,9 +4833,10 @@ class MusicTagEditorGUI:
         sel = self.file_grid.selection()
         if not sel: return
         
-        # 그리드에서 선택된 행의 값들 가져오기
-        v = self.file_grid.item(sel[0], "values")
-        fp = self.full_file_paths.get(sel[0])  # 선택된 아이템의 실제 경로 가져오기
+        # 모델(TrackStore)에서 선택된 행의 값들 가져오기
+        t = self.tracks.get(sel[0])
+        v = t.display_values()
+        fp = t.path  # 선택된 아이템의 실제 경로
         
         # 파일 경로 레이블 업데이트 ---
         if fp:
@@ -1001,46 +4848,6 @@ class MusicTagEditorGUI:
         raw_title = v[2].strip()
         file_name_only = os.path.splitext(v[0])[0]  
         
-        # 깨진 문자열 판별 함수 (정규식 활용)
-        def is_broken_string(s):
-            """비정상적인 인코딩(깨진 문자)을 검출하는 정밀 로직"""
-            if not s or s == "-": return True
-            if '\ufffd' in s: return True # 유니코드 대체 문자 확인
-            
-            # 1. 정상 문자군 정의 (한글, 영어, 숫자, 기본 문장부호)
-            # regex 라이브러리의 유니코드 속성 활용
-            valid_pattern = regex.compile(r'[\p{Hangul}\p{Latin}\d\s\(\)\[\]\.\&\!\?\-\_\,\'\"]+')
-            valid_chars = "".join(valid_pattern.findall(s))
-            
-            # 2. 비정상 문자군 정의 (인코딩 깨짐 시 주로 나타나는 라틴 확장 기호 및 특수 기호)
-            # 사용자가 제시한 ´, °, ¸, ¾ 등 ASCII 범위를 벗어난 기호들 감시
-            broken_pattern = regex.compile(r'[^\p{Hangul}\p{ASCII}\p{Hiragana}\p{Katakana}\p{Han}]+')
-            broken_chars = "".join(broken_pattern.findall(s))
-            
-            # 판별 기준 A: 전체 길이 대비 정상 문자 비율이 너무 낮음 (50% 미만)
-            if len(s) > 0:
-                valid_ratio = len(valid_chars) / len(s)
-                if valid_ratio < 0.5:
-                    return True
-            
-            # 판별 기준 B: 깨진 문자 기호(라틴 확장 등)가 30% 이상 포함됨
-            if len(s) > 0:
-                broken_ratio = len(broken_chars) / len(s)
-                if broken_ratio > 0.3:
-                    return True
-                    
-            # 판별 기준 C: 특정 깨진 패턴의 연속성 (예: ´Ï°¡ 처럼 기호와 문자가 뒤섞임)
-            # 일반적인 한국어/영어 문장에서는 발생하기 힘든 조합을 체크
-            if regex.search(r'[^\x00-\x7F][^\x00-\x7F]{2,}', s):
-                # 비-ASCII 문자가 의미 없이 나열되는 경우 (정상 한글 제외 필터 필요)
-                # 한글은 \p{Hangul}로 이미 valid_chars에서 걸러지므로 
-                # 남은 문자열 중 연속된 비정상 기호 확인
-                remaining = regex.sub(r'[\p{Hangul}\s\d\p{Latin}]+', '', s)
-                if len(remaining) > len(s) * 0.2:
-                    return True
-
-            return False
-        
         if is_broken_string(raw_title):
             display_title = file_name_only
             self.log(f"⚠️ 깨진 타이틀 감지: '{raw_title[:15]}...' -> 파일명으로 대체 표시")
@@ -1079,7 +4886,7 @@ class MusicTagEditorGUI:
             self.file_context_menu.post(event.x_root, event.y_root)
     def on_tree_right_click(self, event):
         item = self.dir_tree.identify_row(event.y)
-        if item: self.dir_tree.selection_set(item); self.dir_context_menu.post(event.x_root, event.y_root)
+        if item and self.dir_tree.item(item, "values"): self.dir_tree.selection_set(item); self.dir_context_menu.post(event.x_root, event.y_root)
 
     def delete_selected_files(self):
         targets = self.file_grid.selection()
@@ -1087,22 +4894,23 @@ class MusicTagEditorGUI:
             return
             
         if messagebox.askyesno("삭제", f"선택한 {len(targets)}개의 파일을 실제 저장소에서 삭제하시겠습니까?"):
-            deleted_count = 0
+            deleted = []   # 그리드에서는 끝에 한 번에 지운다 (행마다 지우면 표시 순서를 매번 다시 만든다)
             for i in targets:
-                fp = self.full_file_paths.get(i)
+                fp = self.tracks.get(i).path
                 if fp and os.path.exists(fp):
                     try:
                         filename = os.path.basename(fp)
                         os.remove(fp)
+                        self.tag_index.remove(fp)
                         # 삭제 성공 로그 기록
                         self.log(f"파일 삭제 완료: {filename}")
-                        self.file_grid.delete(i)
-                        deleted_count += 1
+                        deleted.append(i)
                     except Exception as e:
                         self.log(f"파일 삭제 실패 ({filename}): {e}")
             
-            if deleted_count > 0:
-                self.log(f"--- 총 {deleted_count}개의 파일이 삭제되었습니다 ---")
+            if deleted:
+                self.file_grid.delete(*deleted)
+                self.log(f"--- 총 {len(deleted)}개의 파일이 삭제되었습니다 ---")
                 
     def delete_selected_folder(self):
         item = self.dir_tree.selection()
@@ -1110,19 +4918,45 @@ class MusicTagEditorGUI:
             return
             
         tp = self.dir_tree.item(item[0], "values")[0]
-        # 루트 디렉토리 삭제 방지 (길이가 3 이하인 경우 예: C:\)
-        if len(tp) > 3:
+        # 루트 디렉토리 삭제 방지 (길이가 3 이하인 경우 예: C:\, 탐색기 루트·마운트 지점)
+        if len(tp) > 3 and tp not in self.roots:
             if messagebox.askyesno("삭제", f"폴더와 그 내부 파일이 모두 삭제됩니다.\n경로: {tp}\n삭제하시겠습니까?"):
                 try:
                     shutil.rmtree(tp)
+                    self.tag_index.remove_tree(tp)
+                    self.dir_cache.invalidate(tp, recursive=True)
+                    self.dir_cache.invalidate(os.path.dirname(tp))
                     # 폴더 삭제 로그 기록
                     self.log(f"폴더 삭제 완료: {tp}")
+                    self._forget_nodes(item)
                     self.dir_tree.delete(item[0])
+                    self.update_folder_badges([os.path.dirname(tp)])
                     # 그리드 초기화 (삭제된 폴더 내 파일을 보고 있었을 경우 대비)
                     self.file_grid.delete(*self.file_grid.get_children())
                 except Exception as e:
                     self.log(f"폴더 삭제 오류: {e}")
                     
+    def repad_selected_folder(self):
+        """선택한 폴더(하위 포함)의 MP3 중 ID3v2 여유 공간이 모자란 파일만 한 번 다시 써서 확보 (백그라운드)"""
+        item = self.dir_tree.selection()
+        if not item: return
+        folder = self.dir_tree.item(item[0], "values")[0]
+        policy = self.padding_policy
+        if not messagebox.askyesno("여유 공간 확보",
+                                   f"폴더 안의 MP3 중 태그 여유 공간이 {format_size(policy.reserve)} 보다 작은 파일을 다시 씁니다.\n"
+                                   f"(이후 태그 수정은 파일 전체를 다시 쓰지 않고 제자리에 저장됩니다)\n경로: {folder}"):
+            return
+
+        def collect():
+            for dirpath, dirnames, filenames in os.walk(folder):
+                dirnames.sort()
+                for name in sorted(filenames):
+                    if name.lower().endswith('.mp3'):
+                        yield (None, os.path.join(dirpath, name), functools.partial(repad_track, padding=policy))
+
+        self.submit_write_job(TagWriteJob([], self.write_queue, self.tag_index, self.write_workers,
+                                          title="여유 공간 확보", collect=collect))
+
     def rename_selected_folder(self):
         item = self.dir_tree.selection()
         if not item: return
@@ -1145,62 +4979,95 @@ class MusicTagEditorGUI:
             new_path = os.path.join(parent_dir, new_name)
             try:
                 os.rename(old_path, new_path)
+                self.tag_index.rename_tree(old_path, new_path)
+                self.dir_cache.invalidate(old_path, recursive=True)
+                self.dir_cache.invalidate(parent_dir)
                 self.log(f"폴더명 변경 완료: {old_name} -> {new_name}")
                 
-                # [에러 해결 핵심] 트리를 완전히 새로 고친 후 타겟 폴더 탐색
-                self.refresh_and_expand_target_only(new_path)
+                # 드라이브 전체를 다시 읽지 않고 트리·그리드·선택 경로를 제자리에서 고친다
+                self.apply_folder_rename(item[0], old_path, new_path)
                 
             except Exception as e:
                 self.log(f"폴더명 변경 오류: {e}")
                 messagebox.showerror("오류", f"이름을 바꿀 수 없습니다: {e}")
 
-    def refresh_and_expand_target_only(self, target_path):
-        """트리를 재로드하고 이름이 변경된 해당 폴더만 정확히 확장함"""
-        # 1. 트리 초기화 및 드라이브부터 다시 로드 (무효화된 인덱스 정리)
-        self.on_drive_select(None)
-        
-        # 2. 변경된 폴더 경로로 가는 길목만 찾아 확장 (비동기적 처리 방지를 위해 약간의 지연 권장하나 직접 호출)
-        self.root.update_idletasks() # UI 강제 업데이트로 노드 생성 보장
-        self.focus_and_expand_path(target_path)
+    def apply_folder_rename(self, node, old_path, new_path):
+        """폴더 이름 변경 결과를 메모리 상태에 반영 (경로 접두어 치환만, 디스크 재스캔 없음)"""
+        job = self.scan_job
+        if job is not None and rebase_path(job.path, old_path, new_path) is not None:
+            self.cancel_scan()  # 옛 경로를 읽고 있던 스캔은 의미가 없음
+
+        self.dir_tree.item(node, text=os.path.basename(new_path))
+        self._rebase_nodes(node, old_path, new_path)
+
+        moved = self.tracks.rename_tree(old_path, new_path)
+        if moved:
+            self.file_grid.refresh()
+        if self.selected_path:
+            self.selected_path = rebase_path(self.selected_path, old_path, new_path) or self.selected_path
+        # 감시 루트 자체(또는 그 상위 폴더)가 바뀌었으면 새 경로로 다시 감시 (옛 루트의 대기 중인 변경은 버려진다)
+        watched = self.watcher.root and rebase_path(self.watcher.root, old_path, new_path)
+        if watched:
+            self.watcher.start(watched, self.watcher.max_depth)
+
+        self.dir_tree.selection_set(node)
+        self.dir_tree.focus(node)
+        self.dir_tree.see(node)
+
+    def _rebase_nodes(self, node, old_path, new_path):
+        """node 와 로드된 하위 노드의 경로 값·경로 색인을 접두어 치환"""
+        values = self.dir_tree.item(node, "values")
+        if values:
+            rebased = rebase_path(values[0], old_path, new_path)
+            if rebased is not None:
+                old_key = path_key(values[0])
+                if self.node_by_path.get(old_key) == node:
+                    del self.node_by_path[old_key]
+                self.node_by_path[path_key(rebased)] = node
+                self.dir_tree.item(node, values=[rebased, *values[1:]])
+        # 캐시된 목록은 옛 경로를 담고 있으므로 다음 펼침 때 다시 채운다
+        self._node_listing.pop(node, None)
+        for child in self.dir_tree.get_children(node):
+            self._rebase_nodes(child, old_path, new_path)
 
     def focus_and_expand_path(self, target_path):
-        """트리 노드를 순회하며 타겟 경로만 확장"""
+        """경로 색인(node_by_path)으로 타겟 경로에 이르는 노드만 펼쳐 선택한다.
+
+        이미 트리에 있는 가장 깊은 상위 폴더에서 시작해 경로 구성 요소를 한 단계씩 내려가며,
+        단계마다 해당 폴더 목록만 한 번 읽는다(dir_cache). 'Adam' 과 'Adam Levine' 같은 접두어 오인이 없다.
+        찾으면 True.
+        """
         target_path = os.path.normpath(target_path)
-        
-        def search_node(parent):
-            for child in self.dir_tree.get_children(parent):
-                node_values = self.dir_tree.item(child, "values")
-                if not node_values: continue
-                
-                node_path = os.path.normpath(node_values[0])
-                
-                # 현재 노드가 타겟 경로의 일부이거나 타겟 자체인 경우
-                if target_path.startswith(node_path):
-                    # 자식 노드들을 먼저 로드하기 위해 확장 (on_dir_open의 기능 수행)
-                    self.dir_tree.item(child, open=True)
-                    self.on_dir_open_manual(child) # 수동으로 하위 노드 생성 유도
-                    
-                    # 정확히 일치하는 폴더를 찾은 경우
-                    if node_path == target_path:
-                        self.dir_tree.selection_set(child)
-                        self.dir_tree.focus(child)
-                        self.dir_tree.see(child)
-                        return True
-                    
-                    # 하위 단계 탐색 계속
-                    if search_node(child):
-                        return True
-            return False
 
-        search_node('') # 루트부터 탐색 시작
+        # 1. 트리에 이미 로드된 가장 가까운 상위 폴더 찾기
+        base, rest = target_path, []
+        while path_key(base) not in self.node_by_path:
+            parent, name = os.path.split(base)
+            if parent == base or not name:
+                return False  # 현재 드라이브 트리 밖의 경로
+            rest.append(name)
+            base = parent
+
+        # 2. 경로 구성 요소를 따라 한 단계씩 펼치기
+        node = self.node_by_path[path_key(base)]
+        for name in reversed(rest):
+            self.dir_tree.item(node, open=True)
+            self.on_dir_open_manual(node)
+            base = os.path.join(base, name)
+            node = self.node_by_path.get(path_key(base))
+            if node is None:
+                return False  # 목록에 없는 폴더 (삭제되었거나 접근 불가)
+
+        self.dir_tree.selection_set(node)
+        self.dir_tree.focus(node)
+        self.dir_tree.see(node)
+        return True
 
     def on_dir_open_manual(self, item_id):
         """이벤트 없이 수동으로 노드를 확장할 때 하위 목록을 로드하는 헬퍼"""
         values = self.dir_tree.item(item_id, "values")
         if values:
-            path = values[0]
-            self.dir_tree.delete(*self.dir_tree.get_children(item_id))
-            self.insert_nodes(item_id, path)
+            self.populate_node(item_id, values[0])
          
     def get_unique_filename(self, folder, filename):
         """파일명이 중복될 경우 (1), (2) 등을 붙여 고유한 이름을 생성"""
@@ -1224,18 +5091,18 @@ class MusicTagEditorGUI:
 
         success_count = 0
         skip_count = 0
+        updates = []  # 이름이 바뀐 행만 그리드에 반영
         self.log("--- 일괄 파일명 생성 프로세스 시작 ---")
 
         for item_id in items:
-            fp = self.full_file_paths.get(item_id)
+            t = self.tracks.get(item_id)
+            fp = t.path
             if not fp or not os.path.exists(fp): continue
 
-            # 그리드 값 추출 (v[1]:트랙, v[2]:제목, v[3]:가수)
-            v = self.file_grid.item(item_id, "values")
-            
-            raw_track = v[1].strip()
-            raw_title = v[2].strip()
-            raw_artist = v[3].strip()
+            # 모델 값 추출 (트랙 / 제목 / 가수)
+            raw_track = t.track_text.strip()
+            raw_title = t.title.strip()
+            raw_artist = t.artist.strip()
 
             # --- [핵심 수정: 정보 검증 로직] ---
             # 가수명이나 제목이 비어있거나, 초기값('-')이거나, "NULL"인 경우 건너뜀
@@ -1246,14 +5113,8 @@ class MusicTagEditorGUI:
                 continue
             # ----------------------------------
 
-            # 트랙 번호 처리 (숫자일 경우 두 자리 01, 02... 아니면 00)
-            track_str = raw_track.zfill(2) if raw_track.isdigit() else "00"
-            
-            ext = os.path.splitext(fp)[1]
-            # 새 파일명 조립
-            new_name_base = f"{raw_artist} - {track_str} - {raw_title}{ext}"
-            # 윈도우 파일명 금지 문자 제거
-            new_name_base = re.sub(r'[\\/:*?"<>|]', '', new_name_base)
+            # 새 파일명 조립 (트랙 번호는 두 자리 01, 02... 아니면 00, 윈도우 파일명 금지 문자 제거)
+            new_name_base = make_track_filename(raw_artist, raw_track, raw_title, os.path.splitext(fp)[1])
             
             dir_name = os.path.dirname(fp)
             current_name = os.path.basename(fp)
@@ -1269,16 +5130,17 @@ class MusicTagEditorGUI:
 
             try:
                 os.rename(fp, final_path)
+                self.tag_index.rename(fp, final_path)
                 # 데이터 딕셔너리 및 그리드 정보 갱신
-                self.full_file_paths[item_id] = final_path
+                updates.append((item_id, final_path, None))
                 success_count += 1
                 self.log(f"변경 완료: {current_name} -> {final_name}")
 
             except Exception as e:
                 self.log(f"오류 발생 ({current_name}): {e}")
 
-        # 결과 보고
-        self.refresh_grid_list(self.selected_path)
+        # 결과 보고 (바뀐 행만 갱신)
+        self.patch_grid_rows(updates)
         self.log(f"--- 작업 종료: 성공 {success_count}, 건너뜀 {skip_count} ---")
         messagebox.showinfo("완료", f"파일명 변경이 완료되었습니다.\n(성공: {success_count}, 건너뜀: {skip_count})")
     
@@ -1302,82 +5164,51 @@ class MusicTagEditorGUI:
         # 입력창에서 현재 입력된 정보 가져오기
         raw = {k: getattr(self, k).get().strip() for k in ["ent_title", "ent_artist", "ent_albumartist", "ent_track", "ent_album", "ent_genre", "ent_date"]}
         
-        success_count = 0
+        mapping = {'title': 'ent_title', 'artist': 'ent_artist', 'albumartist': 'ent_albumartist', 'album': 'ent_album', 
+                   'tracknumber': 'ent_track', 'date': 'ent_date', 'genre': 'ent_genre'}
+
+        # [데이터 분리 처리]
+        raw_track = raw['ent_track']
+        tag_track = ""    # 파일 내부 태그용 (정수형 문자열: 1)
+        file_track = "00" # 파일 이름용 (두 자리 문자열: 01)
+
+        # 복수 선택 시 트랙 번호는 태그에 쓰지 않음
+        if len(targets) > 1:
+            tag_track = "" # 빈 값으로 설정하여 기존 태그 유지 또는 무시
+        elif raw_track.isdigit():
+            track_int = int(raw_track)
+            tag_track = str(track_int)          # "01" -> "1"
+            file_track = str(track_int).zfill(2) # "1" -> "01"
+
+        changes = {}  # 태그 → 값 (None 이면 삭제)
+        for tag, key in mapping.items():
+            val = tag_track if tag == 'tracknumber' else raw[key]
+            if val.upper() == "NULL":
+                changes[tag] = None
+            elif val:
+                changes[tag] = val
+
+        # 가수명이나 제목 중 하나라도 비어있거나 "NULL"인 경우 파일명 변경을 수행하지 않음
+        rename = current_artist and current_title and \
+            current_artist.upper() != "NULL" and current_title.upper() != "NULL"
+        if not rename:
+            self.log(f"파일명 유지: 정보 부족 (가수: '{current_artist}', 제목: '{current_title}')")
+
+        # 1. 태그 수정 및 저장, 2. 파일명 변경은 쓰기 작업(백그라운드)에서 파일별로 실행
+        items = []
         for item_id in targets:
-            fp = self.full_file_paths.get(item_id)
+            fp = self.tracks.get(item_id).path
             if not fp or not os.path.exists(fp): continue
-            
-            try:
-                # 1. 태그 수정 및 저장
-                audio = mutagen.File(fp, easy=True)
-                mapping = {'title': 'ent_title', 'artist': 'ent_artist', 'albumartist': 'ent_albumartist', 'album': 'ent_album', 
-                           'tracknumber': 'ent_track', 'date': 'ent_date', 'genre': 'ent_genre'}
-                
-                # [데이터 분리 처리]
-                raw_track = raw['ent_track']
-                tag_track = ""    # 파일 내부 태그용 (정수형 문자열: 1)
-                file_track = "00" # 파일 이름용 (두 자리 문자열: 01)
-                
-                # 복수 선택 시 트랙 번호는 태그에 쓰지 않음
-                if len(targets) > 1:
-                    tag_track = "" # 빈 값으로 설정하여 기존 태그 유지 또는 무시
-                elif raw_track.isdigit():
-                    track_int = int(raw_track)
-                    tag_track = str(track_int)          # "01" -> "1"
-                    file_track = str(track_int).zfill(2) # "1" -> "01"
-                    
-                for tag, key in mapping.items():
-                    if tag == 'tracknumber':
-                        val = tag_track
-                    else:
-                        val = raw[key]
-                        
-                    if val.upper() == "NULL": 
-                        audio.pop(tag, None)
-                    elif val: 
-                        # 트랙번호는 정수형태로 정제하여 저장
-                        audio[tag] = val
-                
-                audio.save()
-                
-                # 2. 파일명 일치 여부 확인 및 변경 로직
-                # 가수명이나 제목 중 하나라도 비어있거나 "NULL"인 경우 파일명 변경을 수행하지 않음
-                if not current_artist or not current_title or \
-                   current_artist.upper() == "NULL" or current_title.upper() == "NULL":
-                    self.log(f"파일명 유지: 정보 부족 (가수: '{current_artist}', 제목: '{current_title}')")
-                    success_count += 1
-                    continue # 다음 파일로 넘어감
-
-                # 정보가 모두 있을 경우에만 실행되는 파일명 변경 로직
-                dir_name = os.path.dirname(fp)
+            new_filename = None
+            if rename:
+                # 규칙: 가수명 - 트랙번호 - 제목 (파일명에는 두 자리 file_track 사용)
                 ext = os.path.splitext(fp)[1]
-                
-                # 규칙: 가수명 - 트랙번호 - 제목
-                # 값이 비어있을 경우를 대비해 기본값 설정
                 new_artist = raw['ent_artist'] if raw['ent_artist'] else "Unknown"
                 new_title = raw['ent_title'] if raw['ent_title'] else "Untitled"
-                
-                # 파일명에는 두 자리(file_track) 사용
-                new_filename = f"{new_artist} - {file_track} - {new_title}{ext}"
-                new_filename = re.sub(r'[\\/:*?"<>|]', '', new_filename)
-                new_fp = os.path.join(dir_name, new_filename)                
-                
-                # 현재 파일명과 다를 경우에만 이름 변경 실행
-                if os.path.normpath(fp) != os.path.normpath(new_fp):
-                    # 만약 동일한 이름의 파일이 이미 존재한다면 충돌 방지
-                    if os.path.exists(new_fp):
-                        self.log(f"중단: 동일 이름의 파일이 이미 존재함 -> {new_filename}")
-                    else:
-                        os.rename(fp, new_fp)
-                        self.log(f"파일명 변경: {os.path.basename(fp)} -> {new_filename}")
-                        # 내부 경로 데이터 갱신
-                        self.full_file_paths[item_id] = new_fp
-                else:
-                    self.log(f"태그 수정 완료 (파일명 일치): {new_filename}")
-                
-                success_count += 1
-            except Exception as e:
-                self.log(f"오류 발생 ({os.path.basename(fp)}): {e}")
+                new_filename = make_track_filename(new_artist, file_track, new_title, ext)
+            items.append((item_id, fp, functools.partial(write_track_tags, changes=changes, new_name=new_filename,
+                                                         note="태그 수정 완료", padding=self.padding_policy)))
+        self.submit_write_job(TagWriteJob(items, self.write_queue, self.tag_index, self.write_workers, title="태그 수정"))
 
         # 작업 완료 후 입력된 값들을 히스토리에 저장 ---
         for vn in ["ent_title", "ent_artist", "ent_albumartist", "ent_track", "ent_album", "ent_genre", "ent_date"]:
@@ -1385,31 +5216,25 @@ class MusicTagEditorGUI:
             if val and val.upper() != "NULL":
                 self.update_history(vn, val)
 
-        # 작업 완료 후 목록 새로고침
-        self.refresh_grid_list(self.selected_path)
-        # messagebox.showinfo("완료", f"{success_count}개의 파일 처리가 완료되었습니다.")
-        self.log(f"--- 작업 완료: 총 {success_count}개의 파일 처리됨 ---")
-
     def batch_clean_year(self):
-        """그리드 내 모든 파일의 연도를 yyyy 형식으로 일괄 정리"""
-        items = self.file_grid.get_children()
-        if not items:
+        """그리드 내 모든 파일의 연도를 yyyy 형식으로 일괄 정리 (쓰기는 백그라운드 작업)"""
+        items_all = self.file_grid.get_children()
+        if not items_all:
             messagebox.showwarning("알림", "처리할 파일이 목록에 없습니다.")
             return
 
         if not messagebox.askyesno("확인", "목록에 있는 모든 파일의 연도를 'yyyy' 형식으로 정리하시겠습니까?"):
             return
 
-        self.log("--- 연도 일괄 정리 시작 ---")
-        success_count = 0
-        
-        for item_id in items:
-            fp = self.full_file_paths.get(item_id)
+        unchanged = 0
+        items = []
+        for item_id in items_all:
+            t = self.tracks.get(item_id)
+            fp = t.path
             if not fp or not os.path.exists(fp): continue
             
-            # 그리드에서 현재 연도 값 가져오기 (index 6: 연도)
-            v = self.file_grid.item(item_id, "values")
-            raw_date = v[6].strip()
+            # 모델에서 현재 연도(원본 date 문자열) 가져오기
+            raw_date = t.date.strip()
             
             # 정규표현식으로 숫자 4자리 추출 (yyyy)
             match = re.search(r'\d{4}', raw_date)
@@ -1418,97 +5243,83 @@ class MusicTagEditorGUI:
                 
                 # 현재 값이 이미 4자리 연도와 같다면 파일 수정 건너뜀 (성능 최적화)
                 if raw_date == clean_year:
-                    success_count += 1
+                    unchanged += 1
                     continue
-                
-                try:
-                    # 실제 파일 태그 수정
-                    audio = mutagen.File(fp, easy=True)
-                    if audio is not None:
-                        audio['date'] = clean_year
-                        audio.save()
-                        
-                        # UI 그리드 갱신
-                        new_values = list(v)
-                        new_values[6] = clean_year
-                        self.file_grid.item(item_id, values=new_values)
-                        
-                        self.log(f"연도 수정 완료: {os.path.basename(fp)} ({raw_date} -> {clean_year})")
-                        success_count += 1
-                except Exception as e:
-                    self.log(f"오류 발생 ({os.path.basename(fp)}): {e}")
+                items.append((item_id, fp, functools.partial(write_track_tags, changes={'date': clean_year},
+                                                             note=f"연도 수정 완료 ({raw_date} -> {clean_year})",
+                                                             padding=self.padding_policy)))
             else:
                 self.log(f"건너뜀 (유효한 연도 없음): {os.path.basename(fp)} - {raw_date}")
 
-        self.log(f"--- 작업 완료: 총 {success_count}개의 파일 연도 정리됨 ---")
-        messagebox.showinfo("완료", f"연도 정리가 완료되었습니다.\n(처리된 파일: {success_count}개)")
+        def report(job):
+            messagebox.showinfo("완료", f"연도 정리가 완료되었습니다.\n(처리된 파일: {unchanged + job.succeeded}개)")
+
+        job = TagWriteJob(items, self.write_queue, self.tag_index, self.write_workers, title="연도 일괄 정리")
+        job.on_done = report
+        if items:
+            self.submit_write_job(job)
+        else:
+            report(job)
 
     def copy_artist_to_albumartist(self):
-        """가수 정보를 앨범음악가로 복사 (MP3 프레임 오류 및 모든 포맷 대응)"""
+        """가수 정보를 앨범음악가로 복사 (MP3 는 EasyID3 경유, 쓰기는 백그라운드 작업)"""
         selected_items = self.file_grid.selection()
         if not selected_items:
             messagebox.showwarning("알림", "정보를 복사할 음악을 리스트에서 선택해 주세요.")
             return
 
-        success_count = 0
+        items = []
         for item_id in selected_items:
-            fp = self.full_file_paths.get(item_id)
+            t = self.tracks.get(item_id)
+            fp = t.path
             if not fp or not os.path.exists(fp): continue
 
-            grid_values = self.file_grid.item(item_id, "values")
-            grid_artist = grid_values[3].strip() if len(grid_values) > 3 else ""
-
-            try:
-                # 1. 가수 정보 확보 (그리드 우선 참조로 안정성 확보)
-                artist_val = grid_artist if grid_artist and grid_artist != "-" else ""
-                
-                # 만약 그리드에 정보가 없다면 파일 태그 직접 읽기 시도
-                if not artist_val:
-                    audio_read = mutagen.File(fp)
-                    if audio_read and 'artist' in audio_read and audio_read['artist']:
-                        artist_val = audio_read['artist'][0]
-
-                if artist_val:
-                    self.log(f"복사 시도: {os.path.basename(fp)} (값: {artist_val})")
-                    
-                    # [핵심 수정] 파일 확장자에 따른 분기 처리
-                    if fp.lower().endswith('.mp3'):
-                        # MP3는 EasyID3를 통해 프레임 에러를 방지 (문자열로 직접 입력)
-                        from mutagen.easyid3 import EasyID3
-                        audio = EasyID3(fp)
-                        audio['albumartist'] = artist_val  # 리스트가 아닌 문자열로 전달
-                        audio.save()
-                    else:
-                        # FLAC, OGG 등은 Vorbis Comment 표준에 따라 리스트 형식 사용
-                        audio = mutagen.File(fp)
-                        audio['albumartist'] = [artist_val]
-                        audio.save()
-
-                    # UI 즉시 업데이트
-                    new_values = list(grid_values)
-                    new_values[4] = artist_val
-                    self.file_grid.item(item_id, values=new_values)
-                    
-                    self.log(f"복사 완료: {os.path.basename(fp)}")
-                    success_count += 1
-                else:
-                    self.log(f"정보 없음: {os.path.basename(fp)}")
-
-            except Exception as e:
-                self.log(f"복사 오류({os.path.basename(fp)}): {e}")
+            # 가수 정보는 그리드 값 우선, 없으면 쓰기 작업에서 파일 태그를 직접 읽는다
+            grid_artist = t.artist.strip()
+            artist_val = grid_artist if grid_artist and grid_artist != "-" else ""
+            items.append((item_id, fp, functools.partial(copy_artist_to_albumartist_tag, artist=artist_val,
+                                                         padding=self.padding_policy)))
+
+        job = TagWriteJob(items, self.write_queue, self.tag_index, self.write_workers, title="앨범음악가 복사")
+        if len(selected_items) == 1:
+            job.on_done = lambda _job: self.on_grid_click_or_select()
+        self.submit_write_job(job)
+
+    def run_fixer_pipeline(self):
+        """고른 정리(깨진 문자·연도·제목·앨범음악가·파일명)를 파일마다 한 번의 열기·저장·이름 변경으로 적용"""
+        all_items = self.file_grid.get_children()
+        if not all_items:
+            messagebox.showwarning("알림", "처리할 파일이 목록에 없습니다.")
+            return
+        selected = self.file_grid.selection()
+        dialog = FixerDialog(self.root, len(selected), len(all_items))
+        self.root.wait_window(dialog)
+        if not dialog.result:
+            return
+        fixers, whole_list = dialog.result
+        targets = all_items if whole_list or not selected else selected
 
-        if success_count > 0:
-            self.log(f"--- 작업 완료: {success_count}개 파일 처리됨 ---")
-            if len(selected_items) == 1:
-                self.on_grid_click_or_select()
+        keywords = self.filter_keywords()
+        items = []
+        for item_id in targets:
+            fp = self.tracks.get(item_id).path
+            if not fp or not os.path.exists(fp): continue
+            items.append((item_id, fp, functools.partial(fix_track, fixers=fixers, keywords=keywords,
+                                                         padding=self.padding_policy)))
+        names = [label for key, label, _ in TRACK_FIXERS if key in fixers]
+        if FIX_RENAME[0] in fixers:
+            names.append(FIX_RENAME[1])
+        self.log(f"일괄 정리 항목: {', '.join(names)}")
+        self.submit_write_job(TagWriteJob(items, self.write_queue, self.tag_index, self.write_workers, title="일괄 정리"))
 
     def load_filename_to_title(self):
         sel = self.file_grid.selection()
         if sel: 
-            f = os.path.splitext(self.file_grid.item(sel[0], "values")[0])[0]
+            f = os.path.splitext(self.tracks.get(sel[0]).filename)[0]
             self.ent_title.delete(0, tk.END); self.ent_title.insert(0, f)
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # PyInstaller 빌드에서 프로세스 풀 사용 시 필요
     root = tk.Tk()
     MusicTagEditorGUI(root)
     root.mainloop()
\ No newline at end of file
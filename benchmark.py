@@ -0,0 +1,390 @@
+"""MusicTagEditor 성능 측정 스크립트
+
+합성(synthetic) 음악 라이브러리를 임시 폴더에 만들어 각 엔진의 처리 속도를 측정한다.
+grid 측정(화면 필요)을 제외하면 GUI 없이 MusicTagEditor 모듈의 엔진 클래스만 사용한다.
+
+사용 예:
+    python benchmark.py scan --files 3000 --workers 1,2,4,8
+    python benchmark.py scan --files 3000 --workers 1,2,4 --pool process --keep
+    python benchmark.py scan --files 3000 --workers 1 --tags-only
+    python benchmark.py sort --rows 50000
+    python benchmark.py device --dir /mnt/usb/Music --workers 1,2,4,8 --order both
+    python benchmark.py padding --files 200 --edits 8 --padding 16384
+    python benchmark.py grid --rows 100000 --compare 20000   (화면(DISPLAY) 필요)
+"""
+import os
+import sys
+import time
+import shutil
+import struct
+import argparse
+import tempfile
+import tracemalloc
+
+from mutagen.id3 import ID3, TIT2, TPE1, TPE2, TALB, TRCK, TDRC, TCON
+from mutagen.flac import FLAC
+
+import MusicTagEditor as mte
+
+
+# MPEG-1 Layer III, 128kbps, 44.1kHz, 스테레오 프레임 헤더 (프레임 길이 417바이트)
+_MP3_FRAME = bytes([0xFF, 0xFB, 0x90, 0x64]) + b"\0" * (417 - 4)
+
+
+def _flac_streaminfo(sample_rate=44100, channels=2, bps=16, total_samples=44100 * 30):
+    """오디오 프레임 없이 메타데이터만 있는 최소 FLAC 헤더"""
+    packed = (sample_rate << 44) | ((channels - 1) << 41) | ((bps - 1) << 36) | total_samples
+    info = struct.pack(">HH", 4096, 4096) + b"\0\0\0" + b"\0\0\0" + packed.to_bytes(8, "big") + b"\0" * 16
+    # 마지막 블록 플래그(0x80) + 블록 타입 0(STREAMINFO) + 길이 34
+    return b"fLaC" + bytes([0x80]) + len(info).to_bytes(3, "big") + info
+
+
+def make_synthetic_library(root, count, frames_per_mp3=300, files_per_album=12):
+    """root 아래에 가수/앨범/트랙 구조의 합성 라이브러리를 만든다. 생성한 파일 경로 목록 반환
+
+    대부분은 ID3 태그가 달린 MP3(프레임 스캔 필요), 일부는 Vorbis comment 가 달린 FLAC.
+    """
+    paths = []
+    for i in range(count):
+        artist = f"Artist {i // (files_per_album * 5):03d}"
+        album = f"Album {i // files_per_album:04d}"
+        track = i % files_per_album + 1
+        folder = os.path.join(root, artist, album)
+        os.makedirs(folder, exist_ok=True)
+        title = f"Song {i:05d}"
+        if i % 10 == 9:
+            fp = os.path.join(folder, f"{artist} - {track:02d} - {title}.flac")
+            with open(fp, "wb") as f:
+                f.write(_flac_streaminfo())
+            audio = FLAC(fp)
+            audio["title"], audio["artist"], audio["albumartist"] = title, artist, artist
+            audio["album"], audio["tracknumber"], audio["date"], audio["genre"] = album, str(track), "2001", "Rock"
+            audio.save()
+        else:
+            fp = os.path.join(folder, f"{artist} - {track:02d} - {title}.mp3")
+            with open(fp, "wb") as f:
+                f.write(_MP3_FRAME * frames_per_mp3)
+            tags = ID3()
+            for frame in (TIT2(encoding=3, text=title), TPE1(encoding=3, text=artist), TPE2(encoding=3, text=artist),
+                          TALB(encoding=3, text=album), TRCK(encoding=3, text=f"{track}/{files_per_album}"),
+                          TDRC(encoding=3, text="2001"), TCON(encoding=3, text="Pop")):
+                tags.add(frame)
+            tags.save(fp)
+        paths.append(fp)
+    return paths
+
+
+def _collect(root):
+    job = mte.FolderScanJob(root, (".mp3", ".flac", ".m4a", ".ogg", ".wma", ".wav"), None)
+    return job.collect_files()
+
+
+def bench_scan(args):
+    """워커 수별 파싱 속도를 풀 종류(스레드 / 프로세스)마다 측정해 나란히 보여 주고, 가장 빠른 설정을 추천한다.
+
+    워커 1 은 풀 없이 순차 파싱하므로 두 풀 종류의 공통 기준(speedup 1.00x)으로 한 번만 잰다.
+    측정 전에 전체를 한 번 읽어 OS 캐시를 채우고(첫 측정만 불리하지 않도록), 각 설정은 --repeat 회 중 최솟값을 쓴다.
+    """
+    root = args.dir or tempfile.mkdtemp(prefix="mte_bench_")
+    pools = mte.ScanEngine.POOL_KINDS if args.pool == "both" else (args.pool,)
+    try:
+        if not args.dir:
+            t0 = time.perf_counter()
+            make_synthetic_library(root, args.files)
+            print(f"합성 라이브러리 생성: {args.files}개 ({time.perf_counter() - t0:.1f}s) -> {root}")
+        files = _collect(root)
+        print(f"스캔 대상: {len(files)}개, 풀 종류: {', '.join(pools)}, CPU {os.cpu_count()}개, "
+              f"{'태그만' if args.tags_only else '전체(스트림 정보 포함)'}")
+        for _ in mte.ScanEngine(1).parse(files, tags_only=args.tags_only):
+            pass
+        print(f"{'workers':>8} {'pool':>8} {'seconds':>9} {'files/s':>9} {'speedup':>8}")
+
+        baseline_time = None
+        baseline_order = None
+        best = None   # (초, 워커 수, 풀 종류)
+        for workers in [int(w) for w in args.workers.split(",")]:
+            for pool in (pools[:1] if workers <= 1 else pools):
+                engine = mte.ScanEngine(workers, pool)
+                try:
+                    # 풀 기동 비용은 측정에서 제외 (앱에서는 풀을 재사용)
+                    list(engine.parse(files[:workers * engine.chunk_size], tags_only=args.tags_only))
+                    elapsed = None
+                    for _ in range(max(1, args.repeat)):
+                        t0 = time.perf_counter()
+                        results = list(engine.parse(files, tags_only=args.tags_only))
+                        run = time.perf_counter() - t0
+                        elapsed = run if elapsed is None else min(elapsed, run)
+                finally:
+                    engine.shutdown()
+
+                order = [fp for fp, _ in results]
+                if baseline_order is None:
+                    baseline_order, baseline_time = order, elapsed
+                elif order != baseline_order:
+                    print("  !! 결과 순서가 기준(첫 측정)과 다릅니다")
+                label = pool if workers > 1 else "-"
+                print(f"{workers:>8} {label:>8} {elapsed:>9.2f} {len(files) / elapsed:>9.0f} {baseline_time / elapsed:>7.2f}x")
+                if best is None or elapsed < best[0]:
+                    best = (elapsed, workers, pool)
+
+        # 측정 오차 수준(10%) 이하의 이득이면 순차 파싱을 권한다
+        if best is None:
+            return
+        if best[1] > 1 and baseline_time / best[0] >= 1.10:
+            print(f"추천: scan_pool={best[2]}, scan_workers={best[1]} ({baseline_time / best[0]:.2f}x)")
+        else:
+            print("추천: scan_workers=1 (병렬 파싱으로 빨라지지 않음)")
+    finally:
+        if not args.dir and not args.keep:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+def bench_device(args):
+    """실제 장치(HDD·네트워크 공유 등)에서 동시 읽기 수·읽기 순서별 files/s 측정
+
+    OS 페이지 캐시의 영향을 줄이기 위해 측정마다 서로 다른 파일 묶음을 읽는다.
+    결과 중 가장 빠른 설정을 config.xml 의 scan_devices/device 에 적으면 된다.
+    """
+    root = args.dir
+    files = _collect(root)
+    levels = [int(w) for w in args.workers.split(",")]
+    orders = ("listing", "inode") if args.order == "both" else (args.order,)
+    per_run = args.files_per_level or len(files) // (len(levels) * len(orders))
+    kind = mte.detect_device_kind(root)
+    print(f"장치: {root} -> {kind} (자동 설정: 동시 읽기 {mte.DEVICE_SCAN_WORKERS.get(kind) or 'scan_workers'})")
+    print(f"스캔 대상: {len(files)}개, 측정당 {per_run}개 ({'태그만' if args.tags_only else '전체'})")
+    if per_run < 50:
+        print("  !! 측정당 파일 수가 너무 적습니다. --files-per-level 을 줄이거나 더 큰 폴더를 지정하세요")
+        return
+    print(f"{'workers':>8} {'order':>8} {'seconds':>9} {'files/s':>9} {'MB/s':>7}")
+
+    engine = mte.ScanEngine(max(levels), args.pool)
+    best = None
+    offset = 0
+    try:
+        for order in orders:
+            for workers in levels:
+                batch = files[offset:offset + per_run]
+                offset += per_run
+                if len(batch) < per_run:
+                    batch = files[:per_run]
+                    print("  !! 파일이 모자라 앞쪽 파일을 다시 읽습니다 (캐시 영향 있음)")
+                t0 = time.perf_counter()
+                stats = {fp: os.stat(fp) for fp in batch}
+                if order == "inode":
+                    batch = sorted(batch, key=lambda fp: stats[fp].st_ino)
+                for _ in engine.parse(batch, tags_only=args.tags_only, workers=workers):
+                    pass
+                elapsed = time.perf_counter() - t0
+                size = sum(st.st_size for st in stats.values()) / 1024 / 1024
+                rate = len(batch) / elapsed
+                print(f"{workers:>8} {order:>8} {elapsed:>9.2f} {rate:>9.0f} {size / elapsed:>7.1f}")
+                if best is None or rate > best[0]:
+                    best = (rate, workers, order)
+    finally:
+        engine.shutdown()
+    print(f"가장 빠른 설정: 동시 읽기 {best[1]}, {best[2]} 순서 ({best[0]:.0f} files/s)")
+    print(f'  config.xml 예: <scan_devices><device root="{root}" kind="{kind}" workers="{best[1]}" /></scan_devices>')
+
+
+def _edit_rounds(files, rounds, grow, padding):
+    """run_process 같은 작은 태그 수정을 rounds 번 반복. (재작성 수, 기록 바이트) 반환
+
+    매 회 앨범명이 grow 바이트씩 길어져 태그가 조금씩 자란다. 저장 전후 파일 크기가 달라지면 파일 전체 재작성으로 센다.
+    """
+    rewrites = written = 0
+    for r in range(rounds):
+        for fp in files:
+            audio = mte.open_track(fp)
+            audio["album"] = f"Album edit {r:02d} " + "+" * (grow * (r + 1))
+            audio["genre"] = f"Genre {r}"
+            size = os.path.getsize(fp)
+            written += mte.save_counted(audio, fp, padding)
+            rewrites += os.path.getsize(fp) != size
+    return rewrites, written
+
+
+def bench_padding(args):
+    """태그 여유 공간 정책 전(mutagen 기본)·후(PaddingPolicy + 여유 공간 확보) 의 재작성 수·기록량 비교
+
+    합성 MP3 의 처음 여유 공간은 --initial-padding 값을 번갈아 쓴다
+    (0: 리핑 직후처럼 여유 없음, 65536: 다른 프로그램이 크게 잡아 둔 여유 → mutagen 기본값은 줄이느라 재작성).
+    """
+    root = tempfile.mkdtemp(prefix="mte_bench_")
+    try:
+        src = os.path.join(root, "src")
+        make_synthetic_library(src, args.files, frames_per_mp3=args.frames)
+        initial = [int(p) for p in args.initial_padding.split(",")]
+        mp3s = [fp for fp in _collect(src) if fp.endswith(".mp3")]
+        for i, fp in enumerate(mp3s):
+            ID3(fp).save(fp, padding=lambda info, p=initial[i % len(initial)]: p)
+        total = sum(os.path.getsize(fp) for fp in mp3s)
+        print(f"MP3 {len(mp3s)}개 ({mte.format_size(total)}), 처음 여유 공간 {args.initial_padding}, "
+              f"파일당 작은 수정 {args.edits}회 (회당 +{args.grow} 바이트), 정책 여유 공간 {mte.format_size(args.padding)}")
+        print(f"{'':>14} {'rewrites':>9} {'written':>10} {'seconds':>8}")
+
+        for label, padding, repad in (("mutagen 기본", lambda info: info.get_default_padding(), False),
+                                      ("정책 적용", mte.PaddingPolicy(args.padding), True)):
+            lib = os.path.join(root, "after" if repad else "before")
+            shutil.copytree(src, lib)
+            files = [fp for fp in _collect(lib) if fp.endswith(".mp3")]
+            rewrites = written = 0
+            t0 = time.perf_counter()
+            if repad:
+                for fp in files:
+                    size = os.path.getsize(fp)
+                    written += mte.repad_track(fp, padding)[3] or 0
+                    rewrites += os.path.getsize(fp) != size
+                elapsed = time.perf_counter() - t0
+                print(f"{'  여유 공간 확보':>14} {rewrites:>9} {mte.format_size(written):>10} {elapsed:>8.2f}")
+            edit_rewrites, edit_written = _edit_rounds(files, args.edits, args.grow, padding)
+            rewrites += edit_rewrites
+            written += edit_written
+            print(f"{label:>14} {rewrites:>9} {mte.format_size(written):>10} {time.perf_counter() - t0:>8.2f}")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def synthetic_grid_rows(count):
+    """(경로, read_track_info() 형식 dict) 모양의 합성 행"""
+    for i in range(count):
+        artist = f"Artist {i % 997}"
+        path = os.path.join("/music", artist, f"Album {i // 12}", f"{artist} - {i % 12 + 1:02d} - Song {i:06d}.mp3")
+        yield path, {'title': f"Song {i:06d}", 'artist': artist, 'albumartist': artist, 'album': f"Album {i // 12}",
+                     'tracknumber': f"{i % 12 + 1}/12", 'date': str(1970 + i % 50), 'genre': "Pop",
+                     'bitrate': (128, 192, 256, 320)[i % 4] * 1000, 'length': 180.0 + i % 120,
+                     'sample_rate': 44100, 'channels': 2}
+
+
+def _timed(label, func):
+    t0 = time.perf_counter()
+    result = func()
+    print(f"  {label:<28} {(time.perf_counter() - t0) * 1000:>9.1f} ms")
+    return result
+
+
+def bench_sort(args):
+    """TrackStore 컬럼 정렬: 첫 정렬(키·순위 계산) / 재정렬(캐시 사용) / 다중 컬럼 정렬"""
+    store = mte.TrackStore()
+    for fp, data in synthetic_grid_rows(args.rows):
+        store.add(fp, data)
+    print(f"TrackStore 정렬: {args.rows}행")
+
+    def sort_by(*keys):
+        order = list(store.order)
+        for col, reverse in reversed(keys):
+            order.sort(key=store.sort_ranks(mte.GRID_SORT_FIELDS[col]).__getitem__, reverse=reverse)
+        store.reorder(order)
+
+    for col in mte.GRID_COLUMNS:
+        _timed(f"{col} (첫 정렬)", lambda: sort_by((col, False)))
+        _timed(f"{col} (재정렬, 내림차순)", lambda: sort_by((col, True)))
+    _timed("앨범 → 트랙 (다중 컬럼)", lambda: sort_by(("앨범", False), ("트랙", False)))
+    t = store.get(store.order[0])
+    store.update(t.rid, data={'title': t.title + " (edit)"})
+    _timed("한 행 수정 후 제목 재정렬", lambda: sort_by(("제목", False)))
+
+
+def bench_grid(args):
+    import tkinter as tk
+    from tkinter import ttk
+
+    cols = mte.GRID_COLUMNS
+    root = tk.Tk()
+    root.geometry("1200x700")
+    try:
+        rows = list(synthetic_grid_rows(args.rows))
+        print(f"VirtualGrid: {args.rows}행")
+        tracemalloc.start()
+        store = mte.TrackStore()
+        grid = mte.VirtualGrid(root, cols, store)
+        grid.pack(fill=tk.BOTH, expand=True)
+        root.update()
+        _timed("TrackStore.add", lambda: ([store.add(fp, data) for fp, data in rows], grid.refresh()))
+        _timed("첫 화면 렌더", root.update)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"  {'메모리 최대(모델+위젯)':<28} {peak / 1024 / 1024:>9.1f} MB")
+
+        def scroll_middle():
+            grid.yview("moveto", 0.5)
+            root.update_idletasks()
+        _timed("중간으로 스크롤", scroll_middle)
+
+        def sort_title():
+            tracks = store.tracks
+            order = sorted(store.order, key=lambda k: tracks[k].title.lower(), reverse=True)
+            grid.reorder(order)
+            root.update_idletasks()
+        _timed("제목 정렬 (내림차순)", sort_title)
+        _timed("전체 선택 + selection()", lambda: (grid._select_all(), grid.selection()))
+        _timed("전체 삭제", lambda: (grid.delete(*grid.get_children()), root.update_idletasks()))
+        grid.destroy()
+
+        if args.compare:
+            print(f"ttk.Treeview (비교): {args.compare}행")
+            tree = ttk.Treeview(root, columns=cols, show="headings")
+            tree.pack(fill=tk.BOTH, expand=True)
+            values = [mte.Track(None, fp, data).display_values() for fp, data in rows[:args.compare]]
+            items = _timed("insert", lambda: [tree.insert("", "end", values=v) for v in values])
+            _timed("첫 화면 렌더", root.update)
+
+            def sort_moves():
+                order = sorted(items, key=lambda k: str(tree.set(k, "제목")).lower(), reverse=True)
+                for idx, k in enumerate(order):
+                    tree.move(k, "", idx)
+                root.update_idletasks()
+            _timed("제목 정렬 (set+move)", sort_moves)
+            _timed("전체 삭제", lambda: (tree.delete(*tree.get_children()), root.update_idletasks()))
+    finally:
+        root.destroy()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="MusicTagEditor benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_scan = sub.add_parser("scan", help="워커 수에 따른 태그 파싱 속도 측정")
+    p_scan.add_argument("--files", type=int, default=3000, help="합성 라이브러리 파일 수")
+    p_scan.add_argument("--workers", default="1,2,4,8", help="측정할 워커 수 목록 (쉼표 구분)")
+    p_scan.add_argument("--pool", choices=mte.ScanEngine.POOL_KINDS + ("both",), default="both",
+                        help="측정할 풀 종류 (both 면 스레드·프로세스를 나란히)")
+    p_scan.add_argument("--dir", help="합성 라이브러리 대신 측정할 실제 폴더")
+    p_scan.add_argument("--keep", action="store_true", help="생성한 합성 라이브러리를 지우지 않음")
+    p_scan.add_argument("--tags-only", action="store_true", help="태그 블록만 읽는 빠른 스캔 모드로 측정")
+    p_scan.add_argument("--repeat", type=int, default=3, help="설정마다 반복 측정 횟수 (최솟값 사용)")
+    p_scan.set_defaults(func=bench_scan)
+
+    p_dev = sub.add_parser("device", help="실제 장치에서 동시 읽기 수·읽기 순서별 스캔 속도 측정")
+    p_dev.add_argument("--dir", required=True, help="측정할 폴더 (측정할 장치 위의 음악 폴더)")
+    p_dev.add_argument("--workers", default="1,2,4,8", help="측정할 동시 읽기 수 목록 (쉼표 구분)")
+    p_dev.add_argument("--order", choices=("listing", "inode", "both"), default="both", help="파일 읽기 순서")
+    p_dev.add_argument("--files-per-level", type=int, default=0, help="측정당 파일 수 (0 이면 폴더를 나눠 사용)")
+    p_dev.add_argument("--pool", choices=mte.ScanEngine.POOL_KINDS, default="thread")
+    p_dev.add_argument("--tags-only", action="store_true", help="태그 블록만 읽는 빠른 스캔 모드로 측정")
+    p_dev.set_defaults(func=bench_device)
+
+    p_pad = sub.add_parser("padding", help="태그 여유 공간 정책 전후의 파일 재작성 수·기록량 비교")
+    p_pad.add_argument("--files", type=int, default=200, help="합성 라이브러리 파일 수 (MP3 만 측정)")
+    p_pad.add_argument("--edits", type=int, default=8, help="파일당 작은 태그 수정 횟수")
+    p_pad.add_argument("--padding", type=int, default=mte.DEFAULT_PADDING.reserve, help="정책의 여유 공간 (바이트)")
+    p_pad.add_argument("--grow", type=int, default=200, help="수정할 때마다 늘어나는 태그 크기 (바이트)")
+    p_pad.add_argument("--initial-padding", default="0,65536", help="합성 MP3 의 처음 여유 공간 목록 (쉼표 구분, 번갈아 사용)")
+    p_pad.add_argument("--frames", type=int, default=2400, help="합성 MP3 프레임 수 (2400 이면 약 1 MB)")
+    p_pad.set_defaults(func=bench_padding)
+
+    p_sort = sub.add_parser("sort", help="그리드 컬럼 정렬(natural / 다중 컬럼) 속도 측정")
+    p_sort.add_argument("--rows", type=int, default=50000, help="TrackStore 에 넣을 합성 행 수")
+    p_sort.set_defaults(func=bench_sort)
+
+    p_grid = sub.add_parser("grid", help="가상 스크롤 그리드 대량 행 처리 측정 (화면 필요)")
+    p_grid.add_argument("--rows", type=int, default=100000, help="VirtualGrid 에 넣을 합성 행 수")
+    p_grid.add_argument("--compare", type=int, default=0, help="비교용 ttk.Treeview 행 수 (0 이면 생략)")
+    p_grid.set_defaults(func=bench_grid)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()